@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Capture buffer for the Whisper Dictation Tool
+A preallocated int16 arena that replaces the list-of-bytes + b''.join pattern.
+"""
+
+import threading
+
+import numpy as np
+
+
+class CaptureBuffer:
+    """Growable int16 sample arena with an optional fixed-size ring mode.
+
+    In the default (growable) mode appends are amortized O(1): the arena
+    doubles when full, so a 10-minute recording costs a handful of
+    reallocations instead of one bytes object per chunk. view() returns a
+    zero-copy NumPy view of everything captured so far, which the decoder,
+    VAD and WAV writer can all read without building another full copy.
+
+    In ring mode (ring_seconds set) the capacity is fixed and the oldest
+    samples are overwritten once it is full.
+    """
+
+    def __init__(self, rate=16000, initial_seconds=60.0, ring_seconds=None):
+        self.rate = rate
+        self.ring = ring_seconds is not None
+        seconds = ring_seconds if self.ring else initial_seconds
+        self._data = np.empty(max(1, int(seconds * rate)), dtype=np.int16)
+        self._length = 0  # Valid samples (capped at capacity in ring mode)
+        self._write_pos = 0  # Next write index (ring mode)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return self._length
+
+    @property
+    def capacity(self):
+        return len(self._data)
+
+    @property
+    def seconds(self):
+        """Duration of the buffered audio in seconds"""
+        return self._length / self.rate
+
+    def append(self, data):
+        """Append int16 PCM (bytes or an int16 array)"""
+        samples = np.frombuffer(data, dtype=np.int16) if isinstance(data, (bytes, bytearray, memoryview)) else data
+        with self._lock:
+            if self.ring:
+                self._append_ring(samples)
+            else:
+                self._append_growable(samples)
+
+    def _append_growable(self, samples):
+        end = self._length + len(samples)
+        if end > len(self._data):
+            new_capacity = max(end, 2 * len(self._data))
+            grown = np.empty(new_capacity, dtype=np.int16)
+            grown[:self._length] = self._data[:self._length]
+            self._data = grown
+        self._data[self._length:end] = samples
+        self._length = end
+
+    def _append_ring(self, samples):
+        capacity = len(self._data)
+        if len(samples) >= capacity:
+            # Only the newest `capacity` samples survive
+            self._data[:] = samples[-capacity:]
+            self._write_pos = 0
+            self._length = capacity
+            return
+        first = min(len(samples), capacity - self._write_pos)
+        self._data[self._write_pos:self._write_pos + first] = samples[:first]
+        self._data[:len(samples) - first] = samples[first:]
+        self._write_pos = (self._write_pos + len(samples)) % capacity
+        self._length = min(capacity, self._length + len(samples))
+
+    def view(self):
+        """Return the buffered samples in capture order.
+
+        This is a zero-copy view except for a ring buffer that has wrapped,
+        where the two halves have to be stitched together.
+        """
+        with self._lock:
+            data, length, write_pos = self._data, self._length, self._write_pos
+        if not self.ring or length < len(data) or write_pos == 0:
+            return data[:length]
+        return np.concatenate((data[write_pos:], data[:write_pos]))
+
+    def tail(self, num_samples):
+        """Return the most recent num_samples samples"""
+        samples = self.view()
+        return samples[max(0, len(samples) - num_samples):]
+
+    def as_float32(self, start=0, end=None):
+        """Return samples[start:end] as the float32 array Whisper expects"""
+        audio = self.view()[start:end].astype(np.float32)
+        audio *= 1.0 / 32768.0  # In place, so no second float32 copy
+        return audio
+
+    def as_bytes(self):
+        """Return a bytes-like view for the WAV writer"""
+        return memoryview(self.view()).cast('B')
+
+    def discard(self, num_samples):
+        """Drop the oldest num_samples samples, keeping the arena (growable mode only)"""
+        if self.ring:
+            raise ValueError("discard() is not supported in ring mode")
+        with self._lock:
+            num_samples = min(num_samples, self._length)
+            remaining = self._length - num_samples
+            self._data[:remaining] = self._data[num_samples:self._length]
+            self._length = remaining
+
+    def clear(self):
+        """Forget all samples but keep the allocated arena"""
+        with self._lock:
+            self._length = 0
+            self._write_pos = 0
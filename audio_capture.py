@@ -0,0 +1,437 @@
+#!/usr/bin/env python3
+"""
+Audio capture engine for the Whisper Dictation Tool
+Runs the PyAudio input stream in callback mode: PortAudio's thread only hands
+each block to a queue, so a busy capture thread can fall behind without the
+device dropping frames. The stream is opened at the device's native rate and
+resampled to 16 kHz with a streaming polyphase filter in NumPy instead of
+relying on ALSA/PortAudio resampling. Overruns reported by the device are
+counted rather than ignored.
+"""
+
+import math
+import queue
+import threading
+import time
+
+import numpy as np
+
+from audio_buffer import CaptureBuffer
+
+# pyaudio.paContinue / pyaudio.paInputOverflow (pyaudio itself is imported lazily by the GUI)
+PA_CONTINUE = 0
+PA_INPUT_OVERFLOW = 0x2
+
+
+def lowpass_filter(up, down, half_width=10, beta=5.0, cutoff=0.9):
+    """Kaiser-windowed sinc anti-aliasing filter for resampling by up/down.
+
+    cutoff is a fraction of the lower Nyquist frequency; keeping it under 1
+    puts the transition band below Nyquist, so little aliases into the top
+    of Whisper's 0-8 kHz mel range.
+    """
+    max_rate = max(up, down)
+    half_len = half_width * max_rate
+    n = np.arange(-half_len, half_len + 1)
+    h = np.sinc(cutoff * n / max_rate) * np.kaiser(2 * half_len + 1, beta)
+    return h * (up / h.sum())  # Unity DC gain after zero-stuffing
+
+
+class PolyphaseResampler:
+    """Streaming rational resampler (int16 in, int16 out).
+
+    Equivalent to zero-stuffing by `up`, low-pass filtering and keeping
+    every `down`-th sample, but only the filter taps that meet non-zero
+    input are evaluated: the filter is split into `up` phases and each
+    block of outputs is one gather plus one einsum. The tail of each block
+    is carried over, so feeding audio in chunks gives the same samples as
+    resampling it in one go. Output is aligned with the input (the filter
+    delay is compensated), so the last outputs wait for input that follows;
+    flush() at the end of the stream returns them.
+    """
+
+    def __init__(self, in_rate, out_rate=16000):
+        g = math.gcd(int(in_rate), int(out_rate))
+        self.up = int(out_rate) // g
+        self.down = int(in_rate) // g
+        self.passthrough = self.up == self.down
+        if self.passthrough:
+            return
+        h = lowpass_filter(self.up, self.down)
+        delay = (len(h) - 1) // 2
+        taps = -(-len(h) // self.up)
+        h = np.concatenate((h, np.zeros(taps * self.up - len(h))))
+        # phases[p, j] multiplies input sample (i - taps + 1 + j) for an output at phase p
+        self.phases = h.reshape(taps, self.up).T[:, ::-1].astype(np.float32)
+        self.taps = taps
+        self.delay = delay
+        self._reset()
+
+    def _reset(self):
+        self._history = np.zeros(self.taps - 1, dtype=np.float32)
+        self._pos = self.delay  # Next output, in up-sampled units from the start of the next block
+        self._consumed = 0  # Input samples since the start of the stream
+        self._produced = 0  # Output samples since the start of the stream
+
+    def process(self, samples):
+        """Resample the next block of int16 samples; returns int16"""
+        if self.passthrough:
+            return samples
+        block = samples.astype(np.float32)
+        self._consumed += len(block)
+        end = len(block) * self.up
+        if self._pos >= end:
+            count = 0
+        else:
+            count = -(-(end - self._pos) // self.down)
+        padded = np.concatenate((self._history, block))
+        self._history = padded[len(padded) - (self.taps - 1):]
+        if count == 0:
+            self._pos -= end
+            return np.zeros(0, dtype=np.int16)
+
+        positions = self._pos + np.arange(count) * self.down
+        windows = np.lib.stride_tricks.sliding_window_view(padded, self.taps)[positions // self.up]
+        out = np.einsum("nk,nk->n", self.phases[positions % self.up], windows)
+        self._pos += count * self.down - end
+        self._produced += count
+        return np.clip(np.rint(out), -32768, 32767).astype(np.int16)
+
+    def flush(self):
+        """End the stream: the outputs still held back by the filter delay (as if silence followed).
+
+        The resampler then starts a new stream.
+        """
+        if self.passthrough:
+            return np.zeros(0, dtype=np.int16)
+        remaining = -(-self._consumed * self.up // self.down) - self._produced
+        # taps input samples reach well past the delay, which is about taps / 2
+        out = self.process(np.zeros(self.taps, dtype=np.int16))[:max(0, remaining)]
+        self._reset()
+        return out
+
+
+def resample(samples, in_rate, out_rate=16000):
+    """Resample a whole int16 recording"""
+    resampler = PolyphaseResampler(in_rate, out_rate)
+    return np.concatenate((resampler.process(samples), resampler.flush()))
+
+
+def native_rate(audio, device_index=None):
+    """The input device's default sample rate"""
+    if device_index is None:
+        info = audio.get_default_input_device_info()
+    else:
+        info = audio.get_device_info_by_index(device_index)
+    return int(info["defaultSampleRate"])
+
+
+class AudioCapture:
+    """Callback-mode input stream delivering 16 kHz int16 blocks.
+
+    start() opens the stream; read() returns everything captured since the
+    last call (resampled), waiting up to timeout for the first block; stop()
+    closes the stream and returns what was still queued plus the resampler's
+    tail. overruns counts
+    blocks PortAudio flagged as input overflow. on_thread_start, if given, is
+    called once on PortAudio's callback thread (e.g. to pin it to a core).
+    """
+
+    def __init__(self, audio, format, rate=16000, chunk=1024, channels=1, device_index=None,
+                 use_native_rate=True, on_thread_start=None):
+        self.audio = audio
+        self.format = format
+        self.rate = rate
+        self.chunk = chunk
+        self.channels = channels
+        self.device_index = device_index
+        self.use_native_rate = use_native_rate
+        self.on_thread_start = on_thread_start
+        self._thread_started = on_thread_start is None
+        self.device_rate = rate
+        self.stream = None
+        self.overruns = 0
+        self.blocks = 0
+        self._queue = queue.SimpleQueue()  # put() is reentrant and never blocks the audio thread
+        self._resampler = None
+
+    def _callback(self, in_data, frame_count, time_info, status):
+        # PortAudio's thread: no locks, no allocation beyond the queue entry
+        if not self._thread_started:
+            self._thread_started = True
+            self.on_thread_start()
+        self._queue.put(in_data)
+        self.blocks += 1
+        if status & PA_INPUT_OVERFLOW:
+            self.overruns += 1
+        return None, PA_CONTINUE
+
+    def _open(self, rate):
+        return self.audio.open(
+            format=self.format,
+            channels=self.channels,
+            rate=rate,
+            input=True,
+            input_device_index=self.device_index,
+            frames_per_buffer=max(1, self.chunk * rate // self.rate),  # Same block duration at any rate
+            stream_callback=self._callback,
+        )
+
+    def start(self):
+        """Open and start the stream; returns it"""
+        rate = self.rate
+        if self.use_native_rate:
+            try:
+                rate = native_rate(self.audio, self.device_index)
+            except Exception:
+                pass
+        try:
+            self.stream = self._open(rate)
+        except Exception:
+            if rate == self.rate:
+                raise
+            print(f"⚠️  Could not open the microphone at {rate} Hz, letting the driver resample")
+            rate = self.rate
+            self.stream = self._open(rate)
+        self.device_rate = rate
+        self._resampler = PolyphaseResampler(rate, self.rate)
+        self.stream.start_stream()
+        return self.stream
+
+    def _drain(self, first):
+        blocks = [first]
+        while True:
+            try:
+                blocks.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        samples = np.frombuffer(b"".join(blocks), dtype=np.int16)
+        if self.channels > 1:
+            samples = samples.reshape(-1, self.channels).mean(axis=1).astype(np.int16)
+        return self._resampler.process(samples)
+
+    def read(self, timeout=0.1):
+        """Resampled int16 samples captured since the last call (may be empty)"""
+        try:
+            first = self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return np.zeros(0, dtype=np.int16)
+        return self._drain(first)
+
+    def stop(self):
+        """Stop and close the stream; returns the samples still queued, including the resampler's tail"""
+        if self.stream:
+            try:
+                self.stream.stop_stream()
+                self.stream.close()
+            except Exception:
+                pass
+            self.stream = None
+        try:
+            samples = self._drain(self._queue.get_nowait())
+        except queue.Empty:
+            samples = np.zeros(0, dtype=np.int16)
+        if self._resampler is None:
+            return samples
+        return np.concatenate((samples, self._resampler.flush()))
+
+
+class ArmedCapture:
+    """Keeps the input stream open between recordings, with a pre-roll ring.
+
+    While idle, the last ring_seconds of audio sit in a CaptureBuffer ring,
+    so a recording starts without opening the device and can include what
+    was said just before the hotkey. The stream disarms itself after
+    idle_timeout seconds without a recording, or when idle capture costs
+    more than cpu_budget of one core, and then calls on_disarm(reason).
+    """
+
+    CHECK_INTERVAL = 5.0  # Seconds between idle-timeout / CPU-budget checks
+
+    def __init__(self, capture, ring_seconds=2.0, idle_timeout=600.0, cpu_budget=0.02, on_disarm=None):
+        self.capture = capture
+        self.ring = CaptureBuffer(rate=capture.rate, ring_seconds=ring_seconds)
+        self.idle_timeout = idle_timeout
+        self.cpu_budget = cpu_budget
+        self.on_disarm = on_disarm
+        self.sink = None
+        self.idle_cpu = None  # Fraction of a core used while idle, at the last check
+        self.disarm_reason = None
+        self._lock = threading.Lock()
+        self._flush = None  # Event end() waits on until queued audio reached the sink
+        self._start_overruns = 0
+        self._last_active = time.monotonic()
+        self._running = False
+        self._thread = None
+
+    @property
+    def armed(self):
+        return self._running
+
+    def arm(self):
+        """Open the stream and start filling the ring; returns self"""
+        self.capture.start()
+        self.disarm_reason = None
+        self._last_active = time.monotonic()
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def begin(self, sink, preroll_seconds=0.5):
+        """Route audio to sink(samples), starting with the last preroll_seconds; returns the pre-roll length"""
+        with self._lock:
+            preroll = self.ring.tail(int(preroll_seconds * self.ring.rate)).copy()
+            self.ring.clear()
+            sink(preroll)  # Under the lock, so it lands before any newer block
+            self.sink = sink
+            self._start_overruns = self.capture.overruns
+            self._last_active = time.monotonic()
+        return len(preroll) / self.ring.rate
+
+    def end(self, timeout=1.0):
+        """Deliver everything captured so far, then go back to the ring; returns overruns while recording"""
+        flushed = threading.Event()
+        with self._lock:
+            self._flush = flushed
+        flushed.wait(timeout)
+        with self._lock:
+            self.sink = None
+            self._flush = None
+            self._last_active = time.monotonic()
+            return self.capture.overruns - self._start_overruns
+
+    def disarm(self, reason="closed"):
+        """Stop the background reader and close the stream"""
+        self.disarm_reason = reason
+        self._running = False
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=1.0)
+
+    def _run(self):
+        if self.capture.on_thread_start:
+            self.capture.on_thread_start()  # The reader is capture work too
+        check_wall, check_cpu = time.monotonic(), time.thread_time()
+        while self._running:
+            flush = self._flush  # Snapshot first: the read below then covers all audio up to end()
+            samples = self.capture.read(timeout=0.05)
+            with self._lock:
+                if self.sink:
+                    self.sink(samples)
+                else:
+                    self.ring.append(samples)
+            if flush:
+                flush.set()
+
+            now = time.monotonic()
+            if now - check_wall < self.CHECK_INTERVAL:
+                continue
+            # Only windows with no recording in them count against the budget
+            idle = self.sink is None and self._last_active <= check_wall
+            cpu = (time.thread_time() - check_cpu) / (now - check_wall)
+            check_wall, check_cpu = now, time.thread_time()
+            if not idle:
+                continue
+            self.idle_cpu = cpu
+            if now - self._last_active > self.idle_timeout:
+                self.disarm_reason = "idle"
+            elif cpu > self.cpu_budget:
+                self.disarm_reason = "cpu budget"
+            else:
+                continue
+            self._running = False
+
+        self.capture.stop()
+        if self.on_disarm:
+            self.on_disarm(self.disarm_reason)
+
+
+class StubStream:
+    """Callback-mode input stream that plays back samples from a thread"""
+
+    def __init__(self, samples, frames_per_buffer, rate, callback, realtime=False, overflow_every=None,
+                 buffer_blocks=None):
+        self.samples = samples
+        self.frames_per_buffer = frames_per_buffer
+        self.rate = rate
+        self.callback = callback
+        self.realtime = realtime
+        self.overflow_every = overflow_every
+        self.buffer_blocks = buffer_blocks
+        self.finished = threading.Event()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        block_seconds = self.frames_per_buffer / self.rate
+        due = time.monotonic()
+        for i, pos in enumerate(range(0, len(self.samples), self.frames_per_buffer)):
+            if self._stop.is_set():
+                return
+            status = PA_INPUT_OVERFLOW if self.overflow_every and (i + 1) % self.overflow_every == 0 else 0
+            if self.realtime:
+                due += block_seconds
+                late = time.monotonic() - due
+                if late < 0:
+                    time.sleep(-late)
+                elif self.buffer_blocks and late > self.buffer_blocks * block_seconds:
+                    # This thread wasn't scheduled in time: the device buffer wrapped
+                    status = PA_INPUT_OVERFLOW
+                    due = time.monotonic()
+            self.callback(self.samples[pos:pos + self.frames_per_buffer].tobytes(),
+                          self.frames_per_buffer, {}, status)
+        self.finished.set()
+
+    def start_stream(self):
+        self._thread.start()
+
+    def stop_stream(self):
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+
+    def is_active(self):
+        return self._thread.is_alive()
+
+    def close(self):
+        pass
+
+
+class StubAudio:
+    """Stands in for pyaudio.PyAudio: a mono input device at `rate` playing next_samples.
+
+    Samples must already be at the device rate. overflow_every flags every
+    Nth block as an input overflow, to exercise overrun accounting. With
+    realtime and buffer_blocks, a block delivered more than buffer_blocks
+    block periods late (the callback thread was starved of CPU) is flagged
+    as an overflow, as a real device would report.
+    """
+
+    def __init__(self, rate=48000, realtime=False, overflow_every=None, buffer_blocks=None):
+        self.rate = rate
+        self.realtime = realtime
+        self.overflow_every = overflow_every
+        self.buffer_blocks = buffer_blocks
+        self.next_samples = np.zeros(0, dtype=np.int16)
+        self.opened = threading.Event()
+        self.stream = None
+
+    def get_default_input_device_info(self):
+        return {"index": 0, "name": "stub", "maxInputChannels": 1, "defaultSampleRate": float(self.rate)}
+
+    def get_device_info_by_index(self, index):
+        return self.get_default_input_device_info()
+
+    def get_sample_size(self, format):
+        return 2
+
+    def open(self, rate, frames_per_buffer=1024, stream_callback=None, **kwargs):
+        if rate != self.rate:
+            raise OSError(f"Invalid sample rate {rate} (stub device runs at {self.rate} Hz)")
+        self.stream = StubStream(self.next_samples, frames_per_buffer, rate, stream_callback,
+                                 self.realtime, self.overflow_every, self.buffer_blocks)
+        self.opened.set()
+        return self.stream
+
+    def terminate(self):
+        pass
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Batched decoding for the Whisper Dictation Tool
+Decodes many short clips (up to 30 s each) in one pass: their mel windows
+are stacked into a single encoder batch and the decoder runs greedy search
+on all of them at once, dropping each sequence from the batch as soon as it
+emits end-of-text. BatchTranscriber adds dynamic batching: clips submitted
+from any thread are collected until max_batch are pending or max_wait_ms
+has passed since the first one.
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+# whisper.audio constants (whisper itself is imported lazily)
+SAMPLE_RATE = 16000
+HOP_LENGTH = 160
+N_SAMPLES = 30 * SAMPLE_RATE
+N_FRAMES = N_SAMPLES // HOP_LENGTH
+
+COMPRESSION_RATIO_THRESHOLD = 2.4  # Same thresholds transcribe() uses for its fallback
+LOGPROB_THRESHOLD = -1.0
+
+
+def _pruned_task_class():
+    import torch
+    from whisper.decoding import DecodingTask
+
+    class PrunedDecodingTask(DecodingTask):
+        """DecodingTask whose greedy loop stops computing finished sequences.
+
+        Stock decode() keeps running the decoder on every row until the
+        last one ends. Here finished rows only get EOT appended; the
+        decoder runs on the active rows, with the self- and cross-attention
+        key/value caches cut down to them.
+        """
+
+        def _prune_cache(self, keep):
+            # rearrange_kv_cache() leaves cross-attention alone (beams share their audio)
+            blocks = self.model.decoder.blocks
+            modules = [m for b in blocks for m in (b.attn.key, b.attn.value, b.cross_attn.key, b.cross_attn.value)]
+            cache = self.inference.kv_cache
+            for module in modules:
+                if module in cache:
+                    cache[module] = cache[module][keep].detach()
+
+        def _main_loop(self, audio_features, tokens):
+            n_batch = tokens.shape[0]
+            sum_logprobs = torch.zeros(n_batch, device=audio_features.device)
+            no_speech_probs = [float("nan")] * n_batch
+            active = None  # Row indices still decoding; None while that's all of them
+
+            try:
+                for i in range(self.sample_len):
+                    current = tokens if active is None else tokens[active]
+                    logits = self.inference.logits(current, audio_features)
+
+                    if i == 0 and self.tokenizer.no_speech is not None:
+                        probs_at_sot = logits[:, self.sot_index].float().softmax(dim=-1)
+                        no_speech_probs = probs_at_sot[:, self.tokenizer.no_speech].tolist()
+
+                    logits = logits[:, -1]
+                    if active is not None:
+                        # Finished rows' logits are ignored by the update (they always get EOT)
+                        full = logits.new_zeros(n_batch, logits.shape[-1])
+                        full[active] = logits
+                        logits = full
+                    for logit_filter in self.logit_filters:
+                        logit_filter.apply(logits, tokens)
+
+                    tokens, completed = self.decoder.update(tokens, logits, sum_logprobs)
+                    if completed or tokens.shape[-1] > self.n_ctx:
+                        break
+
+                    rows = torch.arange(n_batch, device=tokens.device) if active is None else active
+                    running = tokens[rows, -1] != self.tokenizer.eot
+                    if not running.all():
+                        self._prune_cache(running)
+                        audio_features = audio_features[running]
+                        active = rows[running]
+            finally:
+                self.inference.cleanup_caching()
+
+            return tokens, sum_logprobs, no_speech_probs
+
+    return PrunedDecodingTask
+
+
+_task_class = None
+
+
+def decode_batch(model, mel, options):
+    """whisper.decode() for a (batch, n_mels, 3000) mel; greedy options use the pruned loop"""
+    global _task_class
+    import whisper
+
+    greedy = options.temperature == 0 and not options.beam_size
+    if not greedy:
+        return whisper.decode(model, mel, options)
+    if _task_class is None:
+        _task_class = _pruned_task_class()
+    import torch
+    with torch.no_grad():
+        return _task_class(model, options).run(mel)
+
+
+def _decoding_options(options, fp16):
+    """Greedy DecodingOptions for transcribe()-style options (first temperature only)"""
+    import whisper
+
+    temperature = options.get("temperature", 0.0)
+    if isinstance(temperature, (list, tuple)):
+        temperature = temperature[0]
+    return whisper.DecodingOptions(
+        task=options.get("task", "transcribe"),
+        language=options.get("language"),
+        temperature=temperature,
+        prompt=options.get("initial_prompt"),
+        suppress_tokens=options.get("suppress_tokens", "-1"),
+        without_timestamps=True,
+        fp16=fp16,
+    )
+
+
+def transcribe_batch(model, clips, **options):
+    """Transcribe float32 16 kHz clips of at most 30 s each in one batch.
+
+    Returns one transcribe()-shaped result per clip, in order. Clips whose
+    batched decode fails the quality checks (or that are longer than 30 s)
+    are re-run through the standard transcribe(), which has the full
+    temperature fallback.
+    """
+    import torch
+    from whisper.audio import log_mel_spectrogram, pad_or_trim
+
+    results = [None] * len(clips)
+    batch = [i for i, audio in enumerate(clips) if len(audio) <= N_SAMPLES]
+    if batch:
+        fp16 = options.get("fp16", True) and model.device.type != "cpu"
+        mels = []
+        for i in batch:
+            # Same window transcribe() decodes first: mel of the padded audio, content frames, zero-padded
+            mel = log_mel_spectrogram(clips[i], model.dims.n_mels, padding=N_SAMPLES)
+            mels.append(pad_or_trim(mel[:, :len(clips[i]) // HOP_LENGTH], N_FRAMES))
+        mel = torch.stack(mels).to(model.device).to(torch.float16 if fp16 else torch.float32)
+        decoded = decode_batch(model, mel, _decoding_options(options, fp16))
+        for i, result in zip(batch, decoded):
+            if (result.compression_ratio > COMPRESSION_RATIO_THRESHOLD
+                    or result.avg_logprob < LOGPROB_THRESHOLD):
+                continue
+            results[i] = {
+                "text": result.text,
+                "segments": [{
+                    "id": 0, "seek": 0, "start": 0.0, "end": len(clips[i]) / SAMPLE_RATE,
+                    "text": result.text, "tokens": result.tokens, "temperature": result.temperature,
+                    "avg_logprob": result.avg_logprob, "compression_ratio": result.compression_ratio,
+                    "no_speech_prob": result.no_speech_prob,
+                }],
+                "language": result.language,
+                "batch_size": len(batch),
+            }
+    for i, audio in enumerate(clips):
+        if results[i] is None:
+            results[i] = model.transcribe(audio, **options)
+    return results
+
+
+class BatchTranscriber:
+    """Dynamic batcher: submit() clips from any thread, decoded max_batch at a time.
+
+    A batch is decoded as soon as max_batch clips are pending, or
+    max_wait_ms after its first clip arrived, whichever comes first.
+    """
+
+    def __init__(self, model, max_batch=8, max_wait_ms=50, **options):
+        self.model = model
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self.options = options
+        self.batches = 0
+        self._pending = queue.Queue()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, audio):
+        """Queue a float32 clip; returns a Future of its transcribe()-shaped result"""
+        future = Future()
+        self._pending.put((audio, future))
+        return future
+
+    def transcribe(self, audio):
+        return self.submit(audio).result()
+
+    def close(self):
+        self._pending.put(None)
+        self._thread.join()
+
+    def _collect(self):
+        first = self._pending.get()
+        if first is None:
+            return None
+        jobs = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(jobs) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                job = self._pending.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if job is None:
+                self._pending.put(None)  # Finish this batch, then stop
+                break
+            jobs.append(job)
+        return jobs
+
+    def _run(self):
+        while True:
+            jobs = self._collect()
+            if jobs is None:
+                return
+            try:
+                results = transcribe_batch(self.model, [audio for audio, _ in jobs], **self.options)
+            except Exception as e:
+                for _, future in jobs:
+                    future.set_exception(e)
+                continue
+            self.batches += 1
+            for (_, future), result in zip(jobs, results):
+                future.set_result(result)
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Batch file transcription for the Whisper Dictation Tool
+Transcribes a folder of recordings with a pool of worker processes, each of
+which loads the model once. Longest files are scheduled first so the pool
+doesn't end up waiting on one big file at the end. With --batch-size, each
+worker decodes groups of similar-length short files (up to 30 s) in one
+batched forward pass (batch_decode.py).
+
+Usage: whisper --batch DIR/ [--jobs N] [--batch-size B] [--model small] [--engine whisper]
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+from engines import ENGINES, create_engine, physical_cpu_count
+from chinese_converter import convert_to_simplified
+
+AUDIO_EXTENSIONS = {".wav", ".mp3", ".m4a", ".flac", ".ogg", ".opus", ".webm",
+                    ".aac", ".wma", ".mp4", ".mkv", ".mov"}
+SEGMENT_FIELDS = ("id", "start", "end", "text", "avg_logprob", "no_speech_prob")
+MAX_BATCH_SAMPLES = 30 * 16000  # One Whisper window
+
+_worker_engine = None
+_worker_options = None
+
+
+def find_audio_files(directory):
+    """Return audio files under directory, largest (≈ longest) first"""
+    files = []
+    for root, _, names in os.walk(directory):
+        for name in names:
+            if os.path.splitext(name)[1].lower() in AUDIO_EXTENSIONS:
+                path = os.path.join(root, name)
+                files.append((os.path.getsize(path), path))
+    files.sort(reverse=True)
+    return [path for _, path in files]
+
+
+def _init_worker(model_size, engine_name, threads, options):
+    """Load the model once per worker process"""
+    global _worker_engine, _worker_options
+    import torch
+    torch.set_num_threads(threads)
+    engine = create_engine(engine_name, model_size)
+    if hasattr(engine, "num_threads"):
+        engine.num_threads = threads
+    _worker_engine = engine.load()
+    _worker_options = options
+
+
+def _file_result(path, result, load_seconds):
+    return {
+        "file": path,
+        "text": convert_to_simplified(result["text"].strip()),
+        "language": result.get("language"),
+        "segments": [
+            dict({k: seg.get(k) for k in SEGMENT_FIELDS},
+                 text=convert_to_simplified(seg.get("text", "")))
+            for seg in result.get("segments", [])
+        ],
+        "audio_seconds": result["audio_seconds"],
+        "load_seconds": load_seconds,
+        "decode_seconds": result["timings"]["transcribe"],
+        "rtf": result["rtf"],
+    }
+
+
+def _empty_result(path, load_seconds):
+    """Result for a file with no audio samples, which is not decoded"""
+    return {"file": path, "text": "", "language": None, "segments": [], "audio_seconds": 0.0,
+            "load_seconds": load_seconds, "decode_seconds": 0.0, "rtf": None}
+
+
+def _transcribe_file(path):
+    """Worker: decode one file; errors are returned, not raised, so the batch continues"""
+    import whisper
+    try:
+        start = time.perf_counter()
+        audio = whisper.load_audio(path)
+        load_seconds = time.perf_counter() - start
+        if not len(audio):
+            return _empty_result(path, load_seconds)
+        result = _worker_engine.transcribe(audio, **_worker_options)
+        return _file_result(path, result, load_seconds)
+    except Exception as e:
+        return {"file": path, "error": f"{type(e).__name__}: {e}"}
+
+
+def _transcribe_group(paths):
+    """Worker: decode a group of files in one batch; files over 30 s are decoded one by one"""
+    import whisper
+    loaded, results = [], []
+    for path in paths:
+        try:
+            start = time.perf_counter()
+            audio = whisper.load_audio(path)
+            load_seconds = time.perf_counter() - start
+        except Exception as e:
+            results.append({"file": path, "error": f"{type(e).__name__}: {e}"})
+            continue
+        if len(audio):
+            loaded.append((path, audio, load_seconds))
+        else:
+            results.append(_empty_result(path, load_seconds))
+    short = [item for item in loaded if len(item[1]) <= MAX_BATCH_SAMPLES]
+    if short:
+        try:
+            decoded = _worker_engine.transcribe_batch([audio for _, audio, _ in short], **_worker_options)
+            results.extend(_file_result(path, result, load_seconds)
+                           for (path, _, load_seconds), result in zip(short, decoded))
+        except Exception as e:
+            results.extend({"file": path, "error": f"{type(e).__name__}: {e}"} for path, _, _ in short)
+    for path, audio, load_seconds in loaded:
+        if len(audio) > MAX_BATCH_SAMPLES:
+            try:
+                result = _worker_engine.transcribe(audio, **_worker_options)
+                results.append(_file_result(path, result, load_seconds))
+            except Exception as e:
+                results.append({"file": path, "error": f"{type(e).__name__}: {e}"})
+    return results
+
+
+def write_outputs(result, input_dir, output_dir, formats):
+    """Write <name>.txt / <name>.json mirroring the input folder layout"""
+    relative = os.path.relpath(result["file"], input_dir)
+    base = os.path.join(output_dir, os.path.splitext(relative)[0])
+    os.makedirs(os.path.dirname(base), exist_ok=True)
+    if "txt" in formats:
+        with open(base + ".txt", "w", encoding="utf-8") as fh:
+            fh.write(result["text"] + "\n")
+    if "json" in formats:
+        with open(base + ".json", "w", encoding="utf-8") as fh:
+            json.dump(result, fh, ensure_ascii=False, indent=2)
+
+
+def run_batch(input_dir, output_dir=None, jobs=None, model_size="small", engine="whisper",
+              formats=("txt", "json"), language=None, batch_size=1):
+    """Transcribe every audio file in input_dir; returns the per-file results"""
+    files = find_audio_files(input_dir)
+    if not files:
+        print(f"No audio files found in {input_dir}")
+        return []
+
+    output_dir = output_dir or input_dir
+    jobs = max(1, min(jobs or 1, len(files)))
+    threads = max(1, physical_cpu_count() // jobs)
+    options = {"task": "transcribe", "language": language}
+
+    batch_size = max(1, batch_size)
+    # Files are sorted by size, so neighbours have similar lengths (and decode lengths)
+    groups = [files[i:i + batch_size] for i in range(0, len(files), batch_size)]
+
+    print(f"📂 {len(files)} files, {jobs} workers × {threads} threads (Model: {model_size}, engine: {engine}"
+          + (f", batches of {batch_size})" if batch_size > 1 else ")"))
+    results = []
+    start = time.perf_counter()
+    # spawn: each worker imports torch fresh instead of inheriting a forked parent
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(jobs, initializer=_init_worker,
+                      initargs=(model_size, engine, threads, options)) as pool:
+        if batch_size > 1:
+            done = (result for group in pool.imap_unordered(_transcribe_group, groups) for result in group)
+        else:
+            done = pool.imap_unordered(_transcribe_file, files)
+        for i, result in enumerate(done, 1):
+            results.append(result)
+            if "error" in result:
+                print(f"[{i}/{len(files)}] ❌ {result['file']}: {result['error']}")
+                continue
+            write_outputs(result, input_dir, output_dir, formats)
+            rtf = f"{result['rtf']:.2f}" if result["rtf"] is not None else "n/a"
+            print(f"[{i}/{len(files)}] ✅ {result['file']} ({result['audio_seconds']:.0f}s audio, RTF {rtf})")
+    wall_seconds = time.perf_counter() - start
+
+    print_summary(results, wall_seconds)
+    return results
+
+
+def print_summary(results, wall_seconds):
+    done = [r for r in results if "error" not in r]
+    audio_seconds = sum(r["audio_seconds"] for r in done)
+    print()
+    print("📊 Batch summary")
+    print(f"  Files:      {len(done)} transcribed, {len(results) - len(done)} failed")
+    print(f"  Audio:      {audio_seconds / 3600:.2f} h")
+    print(f"  Wall clock: {wall_seconds / 3600:.2f} h ({wall_seconds:.0f}s)")
+    if wall_seconds > 0:
+        print(f"  Throughput: {audio_seconds / wall_seconds:.1f} audio hours per wall-clock hour")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Transcribe a folder of recordings in parallel")
+    parser.add_argument("directory", help="Folder of audio files (searched recursively)")
+    parser.add_argument("--jobs", "-j", type=int, default=1, help="Number of worker processes")
+    parser.add_argument("--batch-size", "-b", type=int, default=1,
+                        help="Decode up to this many short (≤30 s) files per batched forward pass")
+    parser.add_argument("--model", default="small", help="Whisper model size")
+    parser.add_argument("--engine", default="whisper", choices=sorted(ENGINES), help="Inference engine")
+    parser.add_argument("--output-dir", "-o", default=None, help="Where to write results (default: next to inputs)")
+    parser.add_argument("--format", choices=("txt", "json", "both"), default="both", help="Output format")
+    parser.add_argument("--language", default=None, help="Skip language detection (e.g. zh, en)")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.directory):
+        print(f"Error: {args.directory} is not a directory", file=sys.stderr)
+        sys.exit(1)
+    formats = ("txt", "json") if args.format == "both" else (args.format,)
+    run_batch(args.directory, args.output_dir, args.jobs, args.model, args.engine, formats, args.language,
+              args.batch_size)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Benchmark: throughput of batched vs. one-by-one decoding of short clips
+Before: every clip goes through engine.transcribe() on its own. After: the
+clips are submitted to a batch_decode.BatchTranscriber, which stacks up to
+--batch-size of them into one encoder batch and decodes them together,
+dropping each sequence once it ends. Reports clips per second per batch size
+and how many batched transcripts match the one-by-one ones.
+
+Usage:
+    python benchmarks/bench_batch_decode.py --model base --clips 32 --batch-size 1 2 4 8 16
+    python benchmarks/bench_batch_decode.py --wav-dir voice_notes/ --engine whisper-int8
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from bench_pipeline import RATE, load_wav, synthetic_utterance
+
+
+def _clips(args):
+    if args.wav_dir:
+        names = sorted(n for n in os.listdir(args.wav_dir) if n.lower().endswith(".wav"))
+        samples = [load_wav(os.path.join(args.wav_dir, n)) for n in names]
+    else:
+        rng = np.random.default_rng(0)
+        samples = [synthetic_utterance(rng.uniform(args.min_seconds, args.max_seconds), seed=i)
+                   for i in range(args.clips)]
+    return [s.astype(np.float32) / 32768.0 for s in samples if len(s) <= 30 * RATE]
+
+
+def main():
+    from batch_decode import BatchTranscriber
+    from engines import ENGINES, create_engine
+
+    parser = argparse.ArgumentParser(description="Compare batched and one-by-one decoding of short clips")
+    parser.add_argument("--model", default="small", help="Whisper model size")
+    parser.add_argument("--engine", default="whisper", choices=sorted(ENGINES), help="Inference engine")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--wav-dir", help="Folder of 16 kHz mono WAV clips (≤30 s each)")
+    source.add_argument("--clips", type=int, default=32, help="Number of synthetic clips")
+    parser.add_argument("--min-seconds", type=float, default=2.0, help="Shortest synthetic clip")
+    parser.add_argument("--max-seconds", type=float, default=10.0, help="Longest synthetic clip")
+    parser.add_argument("--batch-size", nargs="+", type=int, default=[1, 2, 4, 8, 16], help="Batch sizes to time")
+    parser.add_argument("--max-wait-ms", type=float, default=50, help="BatchTranscriber collection window")
+    parser.add_argument("--language", default="en", help="Decoding language (none: detect per clip)")
+    args = parser.parse_args()
+
+    clips = _clips(args)
+    engine = create_engine(args.engine, args.model).load()
+    language = None if args.language.lower() == "none" else args.language
+    options = {"task": "transcribe", "language": language}
+    if args.engine == "whisper-int8" or engine.model.device.type == "cpu":
+        options["fp16"] = False
+    audio_seconds = sum(len(c) for c in clips) / RATE
+
+    print(f"🧪 Batched decoding (Model: {args.model}, engine: {args.engine}, "
+          f"{len(clips)} clips, {audio_seconds:.0f}s audio, max wait {args.max_wait_ms:g} ms)")
+    engine.transcribe(clips[0], **options)  # Warm-up
+    start = time.perf_counter()
+    reference = [engine.transcribe(clip, **options)["text"].strip() for clip in clips]
+    sequential = time.perf_counter() - start
+
+    print("=" * 64)
+    print(f"{'batch':>6} {'batches':>8} {'seconds':>8} {'clips/s':>8} {'speedup':>8} {'same text':>10}")
+    print("-" * 64)
+    print(f"{'none':>6} {len(clips):>8} {sequential:>8.2f} {len(clips) / sequential:>8.2f} {'1.0x':>8} "
+          f"{len(clips):>5}/{len(clips)}")
+    for batch_size in args.batch_size:
+        batcher = BatchTranscriber(engine.model, max_batch=batch_size, max_wait_ms=args.max_wait_ms, **options)
+        batcher.transcribe(clips[0])  # Warm-up
+        batcher.batches = 0
+        start = time.perf_counter()
+        futures = [batcher.submit(clip) for clip in clips]
+        texts = [future.result()["text"].strip() for future in futures]
+        elapsed = time.perf_counter() - start
+        batches = batcher.batches
+        batcher.close()
+        same = sum(a == b for a, b in zip(texts, reference))
+        print(f"{batch_size:>6} {batches:>8} {elapsed:>8.2f} {len(clips) / elapsed:>8.2f} "
+              f"{sequential / elapsed:>7.1f}x {same:>5}/{len(clips)}")
+
+
+if __name__ == "__main__":
+    main()
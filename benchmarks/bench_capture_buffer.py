@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: list-of-bytes capture vs. CaptureBuffer arena
+Simulates a 10-minute recording (16 kHz mono int16, 1024-sample chunks) and
+reports allocations, peak traced memory and peak RSS for each approach.
+Each approach runs in its own subprocess so RSS numbers don't mix.
+"""
+
+import os
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+RATE = 16000
+CHUNK = 1024
+SECONDS = 600
+
+
+def _chunks():
+    """Yield fresh bytes objects like PyAudio's stream.read() does"""
+    rng = np.random.default_rng(0)
+    block = rng.integers(-3000, 3000, size=CHUNK * 64, dtype=np.int16)
+    for i in range(SECONDS * RATE // CHUNK):
+        start = (i % 64) * CHUNK
+        yield block[start:start + CHUNK].tobytes()
+
+
+def _live_blocks():
+    """Number of live traced allocations right now"""
+    return sum(stat.count for stat in tracemalloc.take_snapshot().statistics('filename'))
+
+
+def run_list():
+    frames = []
+    for data in _chunks():
+        frames.append(data)
+    blocks = _live_blocks()
+    # What stop_recording used to do: join, then convert for Whisper
+    joined = b''.join(frames)
+    audio = np.frombuffer(joined, dtype=np.int16).astype(np.float32) / 32768.0
+    return len(audio), blocks
+
+
+def run_arena():
+    from audio_buffer import CaptureBuffer
+    buffer = CaptureBuffer(rate=RATE)
+    for data in _chunks():
+        buffer.append(data)
+    blocks = _live_blocks()
+    audio = buffer.as_float32()
+    return len(audio), blocks
+
+
+APPROACHES = {"list": run_list, "arena": run_arena}
+
+
+def measure(name):
+    """Run one approach in this process and print a result line"""
+    fn = APPROACHES[name]
+    tracemalloc.start()
+    start = time.perf_counter()
+    samples, blocks = fn()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    max_rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(f"{name}\t{samples}\t{elapsed:.3f}\t{peak / 1e6:.1f}\t{blocks}\t{max_rss_kb / 1024:.1f}")
+
+
+def main():
+    if len(sys.argv) > 1:
+        measure(sys.argv[1])
+        return
+
+    print(f"🧪 Capture buffer benchmark ({SECONDS // 60} min @ {RATE} Hz, {CHUNK}-sample chunks)")
+    print("=" * 72)
+    print(f"{'approach':<10}{'time (s)':>10}{'peak traced (MB)':>18}{'blocks at stop':>16}{'peak RSS (MB)':>16}")
+    for name in APPROACHES:
+        out = subprocess.run([sys.executable, __file__, name], capture_output=True, text=True, check=True)
+        _, _, elapsed, peak, blocks, rss = out.stdout.strip().split("\t")
+        print(f"{name:<10}{elapsed:>10}{peak:>18}{blocks:>16}{rss:>16}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Traditional -> Simplified conversion throughput
+Compares chinese_converter's single-pass converter with the old per-entry
+str.replace loop over the original table, on about a million characters of
+mixed Chinese/English text and per call on a dictation-sized transcript.
+
+Usage:
+    python benchmarks/bench_conversion.py
+    python benchmarks/bench_conversion.py --chars 5000000 --calls 20000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from chinese_converter import get_converter
+
+SAMPLE_TEXTS = [
+    "你好，這是繁體中文測試。",
+    "Hello, this is English text.",
+    "混合語言測試：Hello 世界！",
+    "繁體字：現說聽嗎學記這個裡邊為麼會來從對錯時間鐘請謝",
+    "簡體字：现说听吗学记这个里边为么会来从对错时间钟请谢",
+    "The quick brown fox 說了很多話。",
+]
+
+# The conversion table the GUI used before chinese_converter (from the original dictation.py),
+# verbatim: identity pairs and repeated keys included, so the loop below does the same work
+LEGACY_CHINESE_MAP = {
+    '現': '现', '說': '说', '聽': '听', '嗎': '吗', '學': '学', '記': '记',
+    '這': '这', '個': '个', '裡': '里', '邊': '边', '為': '为', '麼': '么',
+    '會': '会', '來': '来', '從': '从', '對': '对', '錯': '错',
+    '時': '时', '間': '间', '鐘': '钟', '請': '请', '謝': '谢',
+    '話': '话', '試': '试', '檢': '检', '體': '体', '還': '还', '是': '是',
+    '你': '你', '我': '我', '在': '在', '中': '中', '文': '文', '能': '能',
+    '懂': '懂', '到': '到', '去': '去', '來': '来', '到': '到', '得': '得',
+    '一': '一', '二': '二', '三': '三', '四': '四', '五': '五', '六': '六',
+    '七': '七', '八': '八', '九': '九', '十': '十', '百': '百', '千': '千',
+    '萬': '万', '億': '亿', '第': '第', '次': '次', '回': '回', '遍': '遍',
+    '種': '种', '類': '类', '樣': '样', '種': '种', '類': '类', '樣': '样',
+    '東': '东', '西': '西', '南': '南', '北': '北', '上': '上', '下': '下',
+    '左': '左', '右': '右', '前': '前', '後': '后', '內': '内', '外': '外',
+    '大': '大', '小': '小', '高': '高', '低': '低', '長': '长', '短': '短',
+    '寬': '宽', '窄': '窄', '厚': '厚', '薄': '薄', '重': '重', '輕': '轻',
+    '快': '快', '慢': '慢', '新': '新', '舊': '旧', '好': '好', '壞': '坏',
+    '美': '美', '醜': '丑', '熱': '热', '冷': '冷', '暖': '暖', '涼': '凉',
+    '乾': '干', '濕': '湿', '亮': '亮', '暗': '暗', '強': '强', '弱': '弱',
+    '多': '多', '少': '少', '全': '全', '半': '半', '整': '整', '零': '零',
+    '單': '单', '雙': '双', '幾': '几', '些': '些', '每': '每', '各': '各',
+    '別': '别', '另': '另', '其': '其', '他': '他', '她': '她', '它': '它',
+    '們': '们', '的': '的', '地': '地', '得': '得', '了': '了', '着': '着',
+    '過': '过', '來': '来', '去': '去', '到': '到', '在': '在', '有': '有',
+    '沒': '没', '不': '不', '很': '很', '太': '太', '更': '更', '最': '最',
+    '比': '比', '和': '和', '與': '与', '或': '或', '但': '但', '而': '而',
+    '因': '因', '為': '为', '所': '所', '以': '以', '把': '把', '被': '被',
+    '給': '给', '讓': '让', '叫': '叫', '使': '使', '要': '要', '想': '想',
+    '覺': '觉', '知': '知', '道': '道', '看': '看', '見': '见', '聞': '闻',
+    '聽': '听', '說': '说', '講': '讲', '談': '谈', '問': '问', '答': '答',
+    '寫': '写', '讀': '读', '教': '教', '學': '学', '習': '习', '練': '练',
+    '工': '工', '作': '作', '做': '做', '辦': '办', '理': '理', '管': '管',
+    '幫': '帮', '助': '助', '支': '支', '持': '持', '保': '保', '護': '护',
+    '愛': '爱', '喜': '喜', '歡': '欢', '討': '讨', '厭': '厌', '恨': '恨',
+    '怕': '怕', '擔': '担', '心': '心', '擔': '担', '憂': '忧', '愁': '愁',
+    '樂': '乐', '笑': '笑', '哭': '哭', '怒': '怒', '氣': '气', '急': '急',
+    '忙': '忙', '閒': '闲', '累': '累', '困': '困', '睡': '睡', '醒': '醒',
+    '吃': '吃', '喝': '喝', '穿': '穿', '戴': '戴', '住': '住', '行': '行',
+    '走': '走', '跑': '跑', '跳': '跳', '坐': '坐', '站': '站', '躺': '躺',
+    '買': '买', '賣': '卖', '送': '送', '收': '收', '借': '借', '還': '还',
+    '開': '开', '關': '关', '進': '进', '出': '出', '入': '入', '離': '离',
+    '回': '回', '來': '来', '去': '去', '到': '到', '從': '从', '向': '向',
+    '往': '往', '朝': '朝', '對': '对', '面': '面', '背': '背', '側': '侧',
+    '正': '正', '反': '反', '直': '直', '彎': '弯', '平': '平', '斜': '斜',
+    '圓': '圆', '方': '方', '尖': '尖', '鈍': '钝', '軟': '软', '硬': '硬',
+    '滑': '滑', '粗': '粗', '細': '细', '光': '光', '亮': '亮', '暗': '暗',
+    '清': '清', '濁': '浊', '香': '香', '臭': '臭', '甜': '甜', '苦': '苦',
+    '酸': '酸', '辣': '辣', '鹹': '咸', '淡': '淡', '濃': '浓', '稀': '稀',
+    '深': '深', '淺': '浅', '遠': '远', '近': '近', '早': '早', '晚': '晚',
+    '遲': '迟', '快': '快', '慢': '慢', '久': '久', '短': '短', '長': '长',
+    '新': '新', '舊': '旧', '老': '老', '少': '少', '年': '年', '月': '月',
+    '日': '日', '時': '时', '分': '分', '秒': '秒', '週': '周', '期': '期',
+    '季': '季', '節': '节', '春': '春', '夏': '夏', '秋': '秋', '冬': '冬',
+    '今': '今', '昨': '昨', '明': '明', '後': '后', '前': '前', '當': '当',
+    '現': '现', '過': '过', '將': '将', '要': '要', '會': '会', '能': '能',
+    '可': '可', '應': '应', '該': '该', '必': '必', '須': '须', '需': '需',
+    '要': '要', '想': '想', '願': '愿', '希': '希', '望': '望', '期': '期',
+    '待': '待', '等': '等', '候': '候', '等': '等', '待': '待', '候': '候'
+}
+
+
+def legacy_convert(text, chinese_map=LEGACY_CHINESE_MAP):
+    """The old per-entry str.replace loop, kept as the benchmark baseline"""
+    converted_text = text
+    for traditional, simplified in chinese_map.items():
+        converted_text = converted_text.replace(traditional, simplified)
+    return converted_text
+
+
+def benchmark(converter, target_chars=1_000_000, calls=10_000):
+    """Compare throughput of the compiled converter against the legacy loop"""
+    sample = " ".join(SAMPLE_TEXTS)
+    text = sample * (target_chars // len(sample) + 1)
+
+    start = time.perf_counter()
+    legacy = legacy_convert(text)
+    legacy_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    compiled = converter.convert(text)
+    compiled_time = time.perf_counter() - start
+
+    mb = len(text.encode("utf-8")) / 1e6
+    print(f"📊 Benchmark on {len(text):,} chars of mixed Chinese/English text")
+    print(f"  Legacy loop ({len(LEGACY_CHINESE_MAP)} replaces): {legacy_time * 1000:8.1f} ms  ({mb / legacy_time:6.1f} MB/s)")
+    print(f"  Compiled converter:        {compiled_time * 1000:8.1f} ms  ({mb / compiled_time:6.1f} MB/s)")
+    print(f"  Speedup: {legacy_time / compiled_time:.1f}x")
+    print(f"  Same output: {'Yes' if legacy == compiled else 'No'}")
+
+    # Typical dictation transcripts are short, so per-call overhead matters too
+    start = time.perf_counter()
+    for _ in range(calls):
+        legacy_convert(sample)
+    legacy_call = (time.perf_counter() - start) / calls
+    start = time.perf_counter()
+    for _ in range(calls):
+        converter.convert(sample)
+    compiled_call = (time.perf_counter() - start) / calls
+    print(f"📊 Per-transcript cost ({len(sample)} chars)")
+    print(f"  Legacy loop:        {legacy_call * 1e6:6.1f} µs")
+    print(f"  Compiled converter: {compiled_call * 1e6:6.1f} µs")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Traditional -> Simplified conversion")
+    parser.add_argument("--chars", type=int, default=1_000_000, help="Length of the bulk text")
+    parser.add_argument("--calls", type=int, default=10_000, help="Calls for the per-transcript timing")
+    args = parser.parse_args()
+    benchmark(get_converter(), args.chars, args.calls)
+
+
+if __name__ == "__main__":
+    main()
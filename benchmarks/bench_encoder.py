@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Whisper encoder time vs. clip length, full 30 s window vs. buckets
+Before: every clip is padded to 3000 mel frames. After: the clip is encoded
+on the smallest short_clip bucket that holds it (clips too long for any
+bucket keep the full window). Also checks that the variable-length encoder
+gives identical output on a full window.
+
+Usage:
+    python benchmarks/bench_encoder.py --model small --seconds 1 2 4 8 12 20 30
+    python benchmarks/bench_encoder.py --model base --engine whisper-int8 --buckets 4 8 16
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+
+def _time_encoder(model, mel, repeat):
+    import torch
+    with torch.no_grad():
+        model.encoder(mel)  # Warm-up for this shape
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            model.encoder(mel)
+            times.append(time.perf_counter() - start)
+    return float(np.median(times))
+
+
+def main():
+    import torch
+    from engines import ENGINES, create_engine
+    from short_clip import DEFAULT_BUCKETS, SAMPLE_RATE, bucket_frames, enable_variable_length
+
+    parser = argparse.ArgumentParser(description="Time the Whisper encoder per clip length, before and after bucketing")
+    parser.add_argument("--model", default="small", help="Whisper model size")
+    parser.add_argument("--engine", default="whisper", choices=sorted(ENGINES), help="Inference engine")
+    parser.add_argument("--seconds", nargs="+", type=float, default=[1, 2, 4, 6, 8, 12, 16, 20, 30],
+                        help="Clip lengths to time")
+    parser.add_argument("--buckets", nargs="+", type=float, default=list(DEFAULT_BUCKETS),
+                        help="Bucket lengths in seconds")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per shape (median is shown)")
+    args = parser.parse_args()
+
+    model = create_engine(args.engine, args.model).load().model
+    n_mels = model.dims.n_mels
+    full = torch.randn(1, n_mels, 3000)
+
+    with torch.no_grad():
+        before = model.encoder(full)
+        enable_variable_length(model)
+        after = model.encoder(full)
+    print(f"🧪 Encoder timing (Model: {args.model}, engine: {args.engine}, "
+          f"{torch.get_num_threads()} threads, buckets: {', '.join(f'{b:g}s' for b in args.buckets)})")
+    print(f"Full-window output identical after patching: {'Yes' if torch.equal(before, after) else 'No'}")
+    print("=" * 64)
+    print(f"{'clip':>6} {'frames':>7} {'before (ms)':>12} {'after (ms)':>11} {'speedup':>8}")
+    print("-" * 64)
+
+    full_time = _time_encoder(model, full, args.repeat)
+    timed = {3000: full_time}
+    for seconds in args.seconds:
+        frames = bucket_frames(int(seconds * SAMPLE_RATE), args.buckets) or 3000
+        if frames not in timed:
+            timed[frames] = _time_encoder(model, full[:, :, :frames], args.repeat)
+        print(f"{seconds:>5g}s {frames:>7} {full_time * 1000:>12.1f} {timed[frames] * 1000:>11.1f} "
+              f"{full_time / timed[frames]:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Benchmark: single-pass vs. parallel long-form decoding
+Transcribes one long recording with the engine's own transcribe() and with
+ParallelDecoder at several worker counts, and reports wall time, RTF and
+speedup. Every variant gets one untimed warm-up pass first, so model loading
+and worker start-up are not counted.
+
+Usage:
+    python benchmarks/bench_parallel_decode.py --synthetic 20 --model small --jobs 2 4 8
+    python benchmarks/bench_parallel_decode.py --wav lecture.wav --jobs 4 8 16
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from bench_pipeline import RATE, load_wav, synthetic_utterance
+
+
+def _timed(transcribe, audio, options, repeat):
+    transcribe(audio, **options)  # Warm-up
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = transcribe(audio, **options)
+        times.append(time.perf_counter() - start)
+    return float(np.median(times)), result
+
+
+def main():
+    from decoding_profiles import PROFILES, decode_options
+    from engines import ENGINES, create_engine
+    from parallel_decode import ParallelDecoder
+
+    parser = argparse.ArgumentParser(description="Compare single-pass and parallel decoding of a long recording")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--wav", help="16 kHz mono WAV recording")
+    source.add_argument("--synthetic", type=float, metavar="MINUTES", help="Voice-like test audio (default: 10)")
+    parser.add_argument("--model", default="small", help="Whisper model size")
+    parser.add_argument("--engine", default="whisper", choices=sorted(ENGINES), help="Inference engine")
+    parser.add_argument("--profile", default="balanced", choices=sorted(PROFILES), help="Decoding profile")
+    parser.add_argument("--jobs", nargs="+", type=int, default=[2, 4, 8], help="Worker counts to compare")
+    parser.add_argument("--repeat", type=int, default=1, help="Timed passes per variant (median is shown)")
+    args = parser.parse_args()
+
+    samples = load_wav(args.wav) if args.wav else synthetic_utterance((args.synthetic or 10) * 60)
+    audio = samples.astype(np.float32) / 32768.0
+    audio_seconds = len(audio) / RATE
+    options = decode_options(args.profile, language="zh")  # Fixed language: same work for every variant
+
+    print(f"🧪 {audio_seconds / 60:.1f} min of audio (Model: {args.model}, engine: {args.engine}, "
+          f"profile: {args.profile})")
+    print("=" * 72)
+    print(f"{'variant':<16} {'chunks':>7} {'wall s':>9} {'RTF':>7} {'speedup':>8}")
+    print("-" * 72)
+
+    engine = create_engine(args.engine, args.model).load()
+    baseline, _ = _timed(engine.transcribe, audio, options, args.repeat)
+    print(f"{'single pass':<16} {'-':>7} {baseline:>9.2f} {baseline / audio_seconds:>7.3f} {1.0:>7.2f}x")
+    del engine
+
+    for jobs in args.jobs:
+        decoder = ParallelDecoder(args.model, args.engine, jobs=jobs)
+        decoder.start()
+        try:
+            elapsed, result = _timed(decoder.transcribe, audio, options, args.repeat)
+        finally:
+            decoder.close()
+        print(f"{f'{jobs} workers':<16} {result['chunks']:>7} {elapsed:>9.2f} "
+              f"{elapsed / audio_seconds:>7.3f} {baseline / elapsed:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+"""
+Headless replay benchmark for the full dictation pipeline
+Drives IntegratedDictationGUI's capture -> queue -> VAD -> transcribe ->
+convert -> type path without a microphone or display: recordings are replayed
+from WAV files (or synthetic audio) through a stub callback-mode microphone
+(audio_capture.StubAudio, at --device-rate), and typed text goes to a stub
+injection backend. Each model/engine combination runs in its own subprocess
+so peak RSS and CPU time don't mix.
+
+Usage:
+    python benchmarks/bench_pipeline.py --wav-dir recordings/ --model base small --engine whisper whisper-int8
+    python benchmarks/bench_pipeline.py --synthetic 2 5 10 --repeat 3 -o results.json
+    python benchmarks/bench_pipeline.py --synthetic 5 --compare old.json
+    python benchmarks/bench_pipeline.py --wav-dir recordings/ --profile latency balanced accuracy
+"""
+
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import wave
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+RATE = 16000
+CHUNK = 1024
+STUB_ENGINE = "none"  # Skips the model, measures pipeline overhead only
+
+
+def synthetic_utterance(seconds, seed=0):
+    """Voice-like int16 audio: harmonic syllables with pauses over low noise"""
+    rng = np.random.default_rng(seed)
+    n = int(seconds * RATE)
+    t = np.arange(n) / RATE
+    audio = rng.normal(0, 0.003, n)
+    pos = int(0.3 * RATE)  # Leading silence, like a real hotkey press
+    while pos < n - int(0.3 * RATE):
+        length = int(rng.uniform(0.12, 0.35) * RATE)
+        end = min(pos + length, n)
+        f0 = rng.uniform(110, 240)
+        seg = t[pos:end]
+        voiced = sum(np.sin(2 * np.pi * f0 * k * seg) / k for k in range(1, 6))
+        audio[pos:end] += 0.2 * voiced * np.hanning(end - pos)
+        pos = end + int(rng.choice([0.05, 0.08, 0.4]) * RATE)
+    return (np.clip(audio, -1, 1) * 32767).astype(np.int16)
+
+
+def load_wav(path):
+    """Read a 16 kHz mono 16-bit WAV as int16 samples"""
+    with wave.open(path, "rb") as wf:
+        if (wf.getframerate(), wf.getnchannels(), wf.getsampwidth()) != (RATE, 1, 2):
+            raise ValueError(f"{path}: expected 16 kHz mono 16-bit PCM")
+        return np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16)
+
+
+class _StubWidget:
+    def config(self, **kwargs):
+        pass
+
+
+class _StubRoot:
+    """Runs root.after callbacks immediately on the calling thread"""
+
+    def after(self, delay, callback=None, *args):
+        if callback:
+            callback(*args)
+
+    def update_idletasks(self):
+        pass
+
+
+class _StubEngine:
+    """Stands in for a model so the pipeline's own overhead can be measured"""
+
+    def transcribe(self, audio, **options):
+        segment = {"start": 0.0, "end": len(audio) / RATE, "avg_logprob": -0.2}
+        return {"text": "測試", "segments": [segment], "language": options.get("language") or "zh",
+                "timings": {"transcribe": 0.0}, "audio_seconds": len(audio) / RATE,
+                "rtf": 0.0, "engine": STUB_ENGINE}
+
+    def detect_language(self, audio):
+        return {"zh": 1.0}
+
+
+def _headless_class():
+    from audio_capture import StubAudio
+    from dictation_integrated_gui import IntegratedDictationGUI, StartupProfile
+    from metrics import MetricsLog
+    from text_injection import StubBackend, TextInjector
+
+    class HeadlessDictation(IntegratedDictationGUI):
+        """IntegratedDictationGUI without Tk, PyAudio or a display to type into"""
+
+        def __init__(self, model_size, engine, metrics_path, realtime=False, streaming=False,
+                     profile="balanced", device_rate=RATE):
+            self.profile = StartupProfile(False)
+            self.root = _StubRoot()
+            self.mic_label = self.status_label = _StubWidget()
+            self._init_state()
+            self.MODEL_SIZE = model_size
+            self.ENGINE = engine
+            self.USE_DAEMON = False
+            self.STREAMING_MODE = streaming
+            self.DECODING_PROFILE = profile
+            self.metrics_log = MetricsLog(metrics_path)
+            self.audio = StubAudio(device_rate, realtime)
+            self.typing_backend = StubBackend()
+            self.injector = TextInjector([self.typing_backend])
+            self.records = []
+            self.done = threading.Semaphore(0)
+            self._start_pipeline()
+
+        def load(self):
+            start = time.perf_counter()
+            if self.ENGINE == STUB_ENGINE:
+                self.model = _StubEngine()
+            else:
+                from engines import create_engine
+                self.model = create_engine(self.ENGINE, self.MODEL_SIZE).load()
+            self.model_ready.set()
+            return time.perf_counter() - start
+
+        def start_flashing(self):
+            pass
+
+        def _finish_metrics(self, metrics):
+            self.records.append(super()._finish_metrics(metrics))
+            self.done.release()
+
+        def replay(self, samples):
+            """Record samples (at the device rate) through the capture path, then wait for the result"""
+            self.audio.next_samples = samples
+            self.audio.opened.clear()
+            self.start_recording()
+            self.audio.opened.wait()
+            self.audio.stream.finished.wait()
+            self.stop_recording()
+            # Empty recordings never reach the queue
+            if len(self.capture_buffer):
+                self.done.acquire()
+
+    return HeadlessDictation
+
+
+def _cpu_seconds():
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+def _summarize(values):
+    from metrics import percentile
+    if not values:
+        return None
+    return {"p50": round(percentile(values, 50), 4), "p95": round(percentile(values, 95), 4),
+            "max": round(max(values), 4), "mean": round(sum(values) / len(values), 4)}
+
+
+def run_one(config):
+    """Replay every clip with one model/engine in this process; returns a result dict"""
+    import contextlib
+    import io
+
+    from audio_capture import resample
+
+    device_rate = config.get("device_rate", RATE)
+    clips = [(name, resample(load_wav(path) if path else synthetic_utterance(seconds, seed), RATE, device_rate))
+             for name, path, seconds, seed in config["clips"]]
+    with tempfile.TemporaryDirectory() as tmp:
+        app = _headless_class()(config["model"], config["engine"], os.path.join(tmp, "metrics.jsonl"),
+                                realtime=config["realtime"], streaming=config["streaming"],
+                                profile=config["profile"], device_rate=device_rate)
+        load_seconds = app.load()
+        rss_after_load = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+        # Warm-up so first-call allocations don't land in the distribution
+        with contextlib.redirect_stdout(io.StringIO()):
+            app.replay(clips[0][1])
+        app.records.clear()
+        app.metrics_log = type(app.metrics_log)(app.metrics_log.path)
+
+        cpu_start = _cpu_seconds()
+        wall_start = time.perf_counter()
+        utterances = []
+        with contextlib.redirect_stdout(io.StringIO()):
+            for _ in range(config["repeat"]):
+                for name, samples in clips:
+                    count = len(app.records)
+                    app.replay(samples)
+                    if len(app.records) > count:
+                        record = app.records[-1]
+                        utterances.append({"clip": name, **record})
+        wall_seconds = time.perf_counter() - wall_start
+        cpu_seconds = _cpu_seconds() - cpu_start
+
+    audio_seconds = sum(u["audio_seconds"] for u in utterances)
+    decode_seconds = sum(u["stages"].get("decode", 0.0) for u in utterances)
+    stages = sorted({name for u in utterances for name in u["stages"]})
+    return {
+        "model": config["model"],
+        "engine": config["engine"],
+        "streaming": config["streaming"],
+        "profile": config["profile"],
+        "device_rate": device_rate,
+        "utterances": len(utterances),
+        "capture_overruns": app.capture_overruns,
+        "language_prior_hits": sum(1 for u in utterances if u.get("language_prior")),
+        "audio_seconds": round(audio_seconds, 3),
+        "load_seconds": round(load_seconds, 3),
+        "wall_seconds": round(wall_seconds, 3),
+        "cpu_seconds": round(cpu_seconds, 3),
+        "cpu_per_audio_second": round(cpu_seconds / audio_seconds, 4) if audio_seconds else None,
+        "rtf": round(decode_seconds / audio_seconds, 4) if audio_seconds else None,
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "rss_after_load_mb": round(rss_after_load, 1),
+        "latency": _summarize([u["total"] for u in utterances]),
+        "stages": {name: _summarize([u["stages"][name] for u in utterances if name in u["stages"]])
+                   for name in stages},
+        "utterance_records": utterances,
+    }
+
+
+def _git_revision():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                             cwd=os.path.dirname(os.path.abspath(__file__)))
+        return out.stdout.strip() or None
+    except OSError:
+        return None
+
+
+def print_table(results, baseline=None):
+    """One line per model/engine; with a baseline run, show the p50 change"""
+    def key(r):
+        return r["model"], r["engine"], r["streaming"], r.get("profile", "balanced")
+
+    previous = {key(r): r for r in (baseline or {}).get("results", [])}
+    print(f"{'model':<10}{'engine':<14}{'profile':<10}{'p50 (s)':>9}{'p95 (s)':>9}{'RTF':>7}{'CPU/s':>7}"
+          f"{'load (s)':>10}{'peak RSS':>10}" + ("   p50 vs baseline" if previous else ""))
+    for r in results:
+        latency = r["latency"] or {"p50": float("nan"), "p95": float("nan")}
+        line = (f"{r['model']:<10}{r['engine']:<14}{r.get('profile', 'balanced'):<10}{latency['p50']:>9.3f}{latency['p95']:>9.3f}"
+                f"{(r['rtf'] or 0):>7.2f}{(r['cpu_per_audio_second'] or 0):>7.2f}"
+                f"{r['load_seconds']:>10.2f}{r['peak_rss_mb']:>8.0f}MB")
+        old = previous.get(key(r))
+        if old and old["latency"] and r["latency"]:
+            change = (r["latency"]["p50"] - old["latency"]["p50"]) / old["latency"]["p50"] * 100
+            line += f"   {change:+.1f}%"
+        print(line)
+
+
+def main():
+    from decoding_profiles import PROFILES
+    from engines import ENGINES
+
+    parser = argparse.ArgumentParser(description="Replay recordings through the dictation pipeline headlessly")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--wav-dir", help="Folder of 16 kHz mono WAV recordings to replay")
+    source.add_argument("--synthetic", nargs="+", type=float, metavar="SECONDS",
+                        help="Generate voice-like test clips of these lengths (default: 2 5 10)")
+    parser.add_argument("--model", nargs="+", default=["small"], help="Model sizes to compare")
+    parser.add_argument("--engine", nargs="+", default=["whisper"], choices=sorted(ENGINES) + [STUB_ENGINE],
+                        help=f"Engines to compare ('{STUB_ENGINE}' measures pipeline overhead only)")
+    parser.add_argument("--profile", nargs="+", default=["balanced"], choices=sorted(PROFILES),
+                        help="Decoding profiles to compare")
+    parser.add_argument("--repeat", type=int, default=3, help="Replays of each clip")
+    parser.add_argument("--realtime", action="store_true", help="Feed audio at real-time speed")
+    parser.add_argument("--device-rate", type=int, default=RATE,
+                        help="Stub microphone rate; other than 16000 exercises the capture resampler")
+    parser.add_argument("--streaming", action="store_true", help="Enable STREAMING_MODE (implies --realtime)")
+    parser.add_argument("--output", "-o", help="Write results as JSON")
+    parser.add_argument("--compare", help="Previous results JSON to compare against")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_one(json.loads(args.child))))
+        return
+
+    if args.wav_dir:
+        paths = sorted(os.path.join(args.wav_dir, name) for name in os.listdir(args.wav_dir)
+                       if name.lower().endswith(".wav"))
+        if not paths:
+            print(f"No WAV files found in {args.wav_dir}", file=sys.stderr)
+            sys.exit(1)
+        clips = [(os.path.basename(path), os.path.abspath(path), None, None) for path in paths]
+    else:
+        clips = [(f"synthetic-{seconds:g}s", None, seconds, i)
+                 for i, seconds in enumerate(args.synthetic or [2, 5, 10])]
+
+    print(f"🧪 Pipeline replay: {len(clips)} clips × {args.repeat}, "
+          f"{'real-time' if args.realtime or args.streaming else 'fast'} feed")
+    print("=" * 88)
+    results = []
+    for model in args.model:
+        for engine in args.engine:
+            for profile in args.profile:
+                config = {"model": model, "engine": engine, "profile": profile, "clips": clips,
+                          "repeat": args.repeat, "realtime": args.realtime or args.streaming,
+                          "streaming": args.streaming, "device_rate": args.device_rate}
+                out = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", json.dumps(config)],
+                                     capture_output=True, text=True)
+                if out.returncode != 0:
+                    print(f"❌ {model}/{engine}/{profile} failed:\n{out.stderr.strip()}")
+                    continue
+                results.append(json.loads(out.stdout.strip().splitlines()[-1]))
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as fh:
+            baseline = json.load(fh)
+    print_table(results, baseline)
+
+    if args.output:
+        report = {
+            "timestamp": time.time(),
+            "revision": _git_revision(),
+            "platform": platform.platform(),
+            "python": platform.python_version(),
+            "cpus": os.cpu_count(),
+            "clips": [name for name, _, _, _ in clips],
+            "results": results,
+        }
+        with open(args.output, "w", encoding="utf-8") as fh:
+            json.dump(report, fh, ensure_ascii=False, indent=2)
+        print(f"💾 Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Benchmark: decode time vs. capture drops and UI lag under each resource policy
+Models pipelined use: utterances are decoded while the next recording runs.
+A real-time stub microphone (audio_capture.StubAudio with a device buffer of
+--buffer-blocks periods) feeds an AudioCapture, a UI thread ticks every
+10 ms like the Tk loop, and the model decodes clips back to back. A block
+the microphone thread could not deliver in time counts as a capture drop.
+Each policy runs in its own subprocess, since thread pools, affinity and
+nice values are per process.
+
+Usage:
+    python benchmarks/bench_resource_policy.py --model small --policy default reserve-core responsive
+    python benchmarks/bench_resource_policy.py --model base --engine whisper-int8 --clips 10 --seconds 8
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from bench_pipeline import RATE, synthetic_utterance
+
+UI_TICK = 0.01
+
+
+def _lag_summary(lags):
+    from metrics import percentile
+    if not lags:
+        return {"p95": 0.0, "max": 0.0}
+    return {"p95": round(percentile(lags, 95) * 1000, 1), "max": round(max(lags) * 1000, 1)}
+
+
+def run_one(config):
+    """Decode the clips under one policy while capture and a UI ticker run; returns a result dict"""
+    from audio_capture import AudioCapture, StubAudio
+    from decoding_profiles import decode_options
+    from engines import create_engine
+    from resource_policy import ResourceScheduler
+
+    scheduler = ResourceScheduler(config["policy"])
+    scheduler.reserve_current_thread()
+    engine = create_engine(config["engine"], config["model"]).load()
+    scheduler.configure_torch()
+    options = decode_options("latency", language="en")
+    clips = [synthetic_utterance(config["seconds"], seed=i).astype(np.float32) / 32768.0
+             for i in range(config["clips"])]
+    scheduler.inference_started()
+    engine.transcribe(clips[0], **options)  # Warm-up (and starts torch's threads)
+
+    running = True
+    lags = []
+
+    def ui():
+        scheduler.reserve_current_thread()
+        due = time.monotonic()
+        while running:
+            due += UI_TICK
+            time.sleep(max(0.0, due - time.monotonic()))
+            lags.append(max(0.0, time.monotonic() - due))
+            due = max(due, time.monotonic())
+
+    def reader():
+        scheduler.reserve_current_thread()
+        while running:
+            capture.read(timeout=0.1)
+
+    device = StubAudio(config["device_rate"], realtime=True, buffer_blocks=config["buffer_blocks"])
+    device.next_samples = np.broadcast_to(np.int16(0), (config["device_rate"] * 3600,))  # Silence, no memory
+    capture = AudioCapture(device, None, rate=RATE, on_thread_start=scheduler.reserve_current_thread)
+    capture.start()
+    threads = [threading.Thread(target=ui, daemon=True), threading.Thread(target=reader, daemon=True)]
+    for thread in threads:
+        thread.start()
+    scheduler.recording_started()
+
+    decode_times = []
+
+    def decode():
+        for clip in clips:
+            scheduler.inference_started()
+            start = time.perf_counter()
+            engine.transcribe(clip, **options)
+            decode_times.append(time.perf_counter() - start)
+
+    time.sleep(0.5)  # Settle into steady capture first
+    worker = threading.Thread(target=decode)
+    worker.start()
+    worker.join()
+
+    scheduler.recording_stopped()
+    running = False
+    for thread in threads:
+        thread.join()
+    capture.stop()
+
+    audio_seconds = config["seconds"] * len(clips)
+    return {
+        "policy": config["policy"],
+        "setup": scheduler.describe(),
+        "decode_seconds": round(sum(decode_times), 3),
+        "decode_per_clip": round(float(np.median(decode_times)), 3),
+        "rtf": round(sum(decode_times) / audio_seconds, 3),
+        "capture_drops": capture.overruns,
+        "capture_blocks": capture.blocks,
+        "ui_lag_ms": _lag_summary(lags),
+    }
+
+
+def main():
+    from engines import ENGINES
+    from resource_policy import POLICIES
+
+    parser = argparse.ArgumentParser(description="Compare resource policies: decode time, capture drops, UI lag")
+    parser.add_argument("--model", default="small", help="Whisper model size")
+    parser.add_argument("--engine", default="whisper", choices=sorted(ENGINES), help="Inference engine")
+    parser.add_argument("--policy", nargs="+", default=list(POLICIES), choices=sorted(POLICIES),
+                        help="Policies to compare")
+    parser.add_argument("--clips", type=int, default=6, help="Clips decoded per policy")
+    parser.add_argument("--seconds", type=float, default=5.0, help="Length of each synthetic clip")
+    parser.add_argument("--device-rate", type=int, default=48000, help="Stub microphone rate")
+    parser.add_argument("--buffer-blocks", type=int, default=2,
+                        help="Device buffer in block periods; later delivery counts as a drop")
+    parser.add_argument("--output", "-o", help="Write results as JSON")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_one(json.loads(args.child))))
+        return
+
+    print(f"🧪 Resource policies (Model: {args.model}, engine: {args.engine}, {args.clips} × {args.seconds:g}s clips "
+          f"decoded while recording, {os.cpu_count()} CPUs)")
+    print("=" * 88)
+    results = []
+    for policy in args.policy:
+        config = {"policy": policy, "model": args.model, "engine": args.engine, "clips": args.clips,
+                  "seconds": args.seconds, "device_rate": args.device_rate, "buffer_blocks": args.buffer_blocks}
+        out = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", json.dumps(config)],
+                             capture_output=True, text=True)
+        if out.returncode != 0:
+            print(f"❌ {policy} failed:\n{out.stderr.strip()}")
+            continue
+        results.append(json.loads(out.stdout.strip().splitlines()[-1]))
+
+    print(f"{'policy':<14}{'decode (s)':>11}{'per clip':>10}{'RTF':>7}{'drops':>13}{'UI lag p95':>12}{'max':>9}")
+    for r in results:
+        print(f"{r['policy']:<14}{r['decode_seconds']:>11.2f}{r['decode_per_clip']:>10.2f}{r['rtf']:>7.2f}"
+              f"{r['capture_drops']:>6}/{r['capture_blocks']:<6}{r['ui_lag_ms']['p95']:>10.1f}ms"
+              f"{r['ui_lag_ms']['max']:>7.1f}ms")
+    for r in results:
+        print(f"  {r['policy']}: {r['setup']}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            json.dump({"timestamp": time.time(), "cpus": os.cpu_count(), "results": results}, fh, indent=2)
+        print(f"💾 Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Decoding profiles and session language prior for the Whisper Dictation Tool
+A profile bundles the transcribe() options that trade speed for accuracy
+(beam size, best_of, fallback temperatures, prompt length). The language
+prior remembers the language Whisper keeps detecting with high probability,
+so later utterances can skip the separate language-detection pass.
+"""
+
+FULL_PROMPT = ("This is a mixed language conversation in Chinese and English. "
+               "Please transcribe accurately in both languages.")
+SHORT_PROMPT = "中文 and English."
+
+PROFILES = {
+    # Greedy, no fallback, no timestamp tokens, short prompt (streaming
+    # windows keep timestamps: decode_options(timestamps=True))
+    "latency": {
+        "temperature": 0.0,
+        "initial_prompt": SHORT_PROMPT,
+        "without_timestamps": True,
+    },
+    # The original dictation settings
+    "balanced": {
+        "temperature": 0.0,
+        "initial_prompt": FULL_PROMPT,
+    },
+    # Beam search, with sampling fallback when the output looks wrong
+    "accuracy": {
+        "temperature": (0.0, 0.2, 0.4, 0.6, 0.8, 1.0),
+        "beam_size": 5,
+        "best_of": 5,
+        "initial_prompt": FULL_PROMPT,
+    },
+}
+
+
+def decode_options(profile="balanced", language=None, timestamps=False):
+    """transcribe() keyword arguments for a profile.
+
+    timestamps=True keeps timestamp tokens even in profiles that drop them;
+    StreamingTranscriber needs segment boundaries to find its stable prefix.
+    """
+    try:
+        options = dict(PROFILES[profile])
+    except KeyError:
+        raise ValueError(f"Unknown decoding profile '{profile}' (choose from: {', '.join(PROFILES)})")
+    if timestamps:
+        options.pop("without_timestamps", None)
+    options.update(task="transcribe", language=language, condition_on_previous_text=False)
+    return options
+
+
+class LanguagePrior:
+    """Session language: locked after consistent confident detections, dropped when detection disagrees.
+
+    Confidence is the probability model.detect_language() gives the top
+    language. Once the same language has been detected with at least
+    min_probability confirm_count times in a row, it is passed as
+    language= and detection is skipped, except every recheck_every
+    utterances: if that detection picks another language the lock is
+    dropped. Mixed-language speech rarely gets a confident detection, so
+    it stays unlocked.
+    """
+
+    def __init__(self, confirm_count=2, min_probability=0.9, recheck_every=5):
+        self.confirm_count = confirm_count
+        self.min_probability = min_probability
+        self.recheck_every = recheck_every
+        self.language = None
+        self.detected = False  # Whether the last language_for() ran detection
+        self._candidate = None
+        self._streak = 0
+        self._locked_utterances = 0
+
+    def language_for(self, detect):
+        """Language to decode the next utterance in.
+
+        detect() returns {language: probability}; it is only called when the
+        utterance needs a detection (not locked, or a recheck is due).
+        """
+        self.detected = False
+        if self.language is not None:
+            self._locked_utterances += 1
+            if self._locked_utterances < self.recheck_every:
+                return self.language
+            self._locked_utterances = 0
+
+        probs = detect()
+        self.detected = True
+        language = max(probs, key=probs.get)
+        probability = probs[language]
+        if self.language is not None:
+            if language != self.language:
+                print(f"🌐 Detected '{language}' ({probability:.0%}) instead of '{self.language}', "
+                      f"re-detecting language")
+                self.reset()
+            return language
+
+        confident = probability >= self.min_probability
+        if confident and language == self._candidate:
+            self._streak += 1
+        else:
+            self._candidate = language if confident else None
+            self._streak = 1 if confident else 0
+        if self._candidate and self._streak >= self.confirm_count:
+            self.language = self._candidate
+            self._locked_utterances = 0
+            print(f"🌐 Language locked to '{self.language}' (skipping detection)")
+        return language
+
+    def reset(self):
+        self.language = None
+        self._candidate = None
+        self._streak = 0
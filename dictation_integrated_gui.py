@@ -4,34 +4,100 @@ Integrated GUI for Whisper Dictation Tool
 Combines the original dictation.py functionality with a modern GUI interface.
 """
 
+import time
+_MODULE_START = time.perf_counter()
+
 import tkinter as tk
 from tkinter import messagebox
 import threading
-import time
+import queue
 import os
 import sys
-import pyaudio
+import argparse
 import wave
-import whisper
-from pynput import keyboard
-import pyautogui
+from contextlib import contextmanager
 from datetime import datetime
 import warnings
-import pyperclip
-import psutil
+from streaming_transcriber import StreamingTranscriber
+from vad import trim_silence
+from audio_buffer import CaptureBuffer
+from audio_capture import ArmedCapture, AudioCapture
+from chinese_converter import convert_to_simplified
+from transcription_daemon import default_socket_path, ensure_daemon
+from engines import TranscriptionEngine, create_engine
+from metrics import MetricsLog, UtteranceMetrics
+from text_injection import TextInjector
+from single_instance import SingleInstance, send_command
+from decoding_profiles import LanguagePrior, decode_options
+from segment_store import LongSession, SegmentStore
+from parallel_decode import ParallelDecoder
+from mel_features import IncrementalLogMel
+from resource_policy import ResourceScheduler
+
+# Heavy or display-bound modules (whisper/torch, pyaudio, pynput and the
+# text injection backends) are imported lazily during staged startup so
+# the window appears before they load; the names below are bound by those imports.
+whisper = None
+pyaudio = None
+keyboard = None
+
+_MODULE_IMPORTS_DONE = time.perf_counter()
 
 # Suppress Whisper warnings
 warnings.filterwarnings("ignore", message="FP16 is not supported on CPU")
 
+
+class StartupProfile:
+    """Per-phase startup timings, printed with --startup-profile"""
+    
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.phases = [("module imports", _MODULE_IMPORTS_DONE - _MODULE_START, 0.0)]
+        self._lock = threading.Lock()
+    
+    @contextmanager
+    def phase(self, name):
+        """Time a startup phase (safe to use from background threads)"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            with self._lock:
+                self.phases.append((name, end - start, end - _MODULE_START))
+    
+    def mark(self, name):
+        """Record a milestone (time since process start, no duration)"""
+        with self._lock:
+            self.phases.append((name, None, time.perf_counter() - _MODULE_START))
+    
+    def report(self):
+        if not self.enabled:
+            return
+        print("⏱️  Startup profile")
+        print(f"  {'phase':<28}{'duration':>10}{'done at':>10}")
+        with self._lock:
+            phases = sorted(self.phases, key=lambda p: p[2])
+        for name, duration, done_at in phases:
+            duration_text = f"{duration * 1000:8.0f}ms" if duration is not None else f"{'—':>10}"
+            print(f"  {name:<28}{duration_text:>10}{done_at * 1000:8.0f}ms")
+
 class IntegratedDictationGUI:
-    def __init__(self):
-        # Check for existing dictation processes
-        if self._check_existing_processes():
-            print("❌ Another dictation process is already running!")
-            print("💡 Please close the existing process before starting a new one.")
-            sys.exit(1)
-        
-        self.root = tk.Tk()
+    def __init__(self, startup_profile=False, instance=None):
+        self.profile = StartupProfile(startup_profile)
+        
+        # One GUI per user; main() forwards later launches' commands to it
+        with self.profile.phase("instance lock"):
+            if instance is None:
+                instance = SingleInstance()
+                if not instance.acquire():
+                    print("❌ Another dictation process is already running!")
+                    print("💡 Use --toggle or --show to control it.")
+                    sys.exit(1)
+        self.instance = instance
+        
+        with self.profile.phase("create window"):
+            self.root = tk.Tk()
         self.root.title("whisper")
         self.root.geometry("200x100")
         self.root.resizable(False, False)
@@ -42,93 +108,131 @@ class IntegratedDictationGUI:
         # Position window in top-right corner
         self.position_window()
         
+        self._init_state()
+        
+        # Stage 1: draw the window; audio/hotkey and the model follow once
+        # the main loop is running
+        with self.profile.phase("setup ui"):
+            self.setup_ui()
+        
+        self._start_pipeline()
+        try:
+            self.instance.serve(self._handle_instance_command,
+                                on_thread_start=self.scheduler.reserve_current_thread)
+        except OSError as e:
+            print(f"⚠️  Command channel unavailable: {e}")
+        self.root.after(0, self._finish_startup)
+    
+    def _init_state(self):
+        """Configuration and runtime state (no window, devices or threads)"""
         # Initialize variables (same as original dictation.py)
         self.MODEL_SIZE = "small"
+        self.ENGINE = "whisper"  # "whisper" (stock fp32) or "whisper-int8" (quantized CPU)
+        # Draft-then-refine: MODEL_SIZE types a fast draft, REFINE_MODEL_SIZE
+        # re-transcribes it in the background and replaces it if different
+        self.REFINE_MODEL_SIZE = None  # e.g. "medium" (with MODEL_SIZE = "base")
+        self.REFINE_ENGINE = "whisper-int8"  # Quantized to keep the second model's memory down
+        self.REFINE_MIN_SECONDS = 3.0  # Shorter utterances keep the draft
+        self.MAX_QUEUED_UTTERANCES = 3  # Recordings waiting to be decoded before new ones are refused
+        self.USE_DAEMON = True  # Share a warm model via transcription_daemon.py
+        self.DEBUG_SAVE_AUDIO = False  # Also dump each recording to /tmp as WAV
+        self.STREAMING_MODE = False  # Transcribe committed windows while still recording
+        self.LONG_SESSION_MODE = False  # Hour-long dictation: spill pause-cut segments to disk, flat memory
+        self.LONG_SESSION_SEGMENT_SECONDS = 28.0  # Segment length (fits one Whisper window)
+        self.PARALLEL_DECODE = False  # Split long recordings at pauses and decode the chunks on a process pool
+        self.PARALLEL_DECODE_MIN_SECONDS = 90.0  # Shorter recordings are faster in one pass
+        self.PARALLEL_DECODE_JOBS = None  # Worker processes (None: half the physical cores)
+        self.CAPTURE_NATIVE_RATE = True  # Open the mic at its own rate and resample in NumPy (audio_capture.py)
+        # Armed mode: keep the mic open between recordings so starting is instant
+        # and the first syllable is never clipped (audio from before the hotkey is kept)
+        self.ARMED_MODE = False
+        self.PREROLL_SECONDS = 0.5  # Audio from before the hotkey press included in each recording
+        self.ARM_RING_SECONDS = 2.0  # Pre-roll ring size
+        self.ARM_IDLE_TIMEOUT = 600.0  # Close the mic after this long without a recording
+        self.ARM_CPU_BUDGET = 0.02  # Close the mic if idle capture uses more than this fraction of a core
+        self.SHORT_CLIP_BUCKETS = None  # e.g. (5.0, 10.0, 15.0, 20.0): encode short clips on a truncated window
+        self.INCREMENTAL_MEL = False  # Compute the log-mel while recording (in-process model, needs VAD_ENABLED = False)
+        # CPU scheduling of the in-process model (see resource_policy.py); None keeps the policy's value
+        self.RESOURCE_POLICY = "default"  # "default" (torch defaults), "reserve-core" or "responsive"
+        self.TORCH_THREADS = None  # Intra-op threads
+        self.TORCH_INTEROP_THREADS = None  # Inter-op threads
+        self.RESERVE_CORES = None  # Cores kept for capture/UI threads (Linux)
+        self.RECORDING_NICE = None  # Nice increment for inference while recording (Linux)
+        self.VAD_ENABLED = True  # Cut silence before transcription
+        self.DECODING_PROFILE = "balanced"  # "latency", "balanced" or "accuracy" (see decoding_profiles.py)
+        self.LANGUAGE_PRIOR = False  # Lock the session's language once detection is consistently confident
+        self.INJECTION_BACKEND = "auto"  # Or "clipboard", "xdotool", "wtype", "pyautogui"
+        self.INJECT_SETTLE_SECONDS = 0.3  # Our synthetic key events can reach the listener after inject() returns
         self.recording = False
         self.processing = False
         self.audio = None
-        self.frames = []
         self.stream = None
         self.model = None
-        self.hotkey = {keyboard.Key.alt, keyboard.KeyCode.from_char('d')}
+        self.model_ready = threading.Event()  # Set once loading finished (or failed)
+        self.refine_model = None
+        self.refine_lock = threading.Lock()  # One refinement at a time
+        self.refine_generation = 0  # Bumped per utterance; stale refinements are dropped
+        self.typed_span = None  # Text we last typed, while it is still right before the cursor
+        self.injecting = False
+        self.injected_at = 0.0  # When the last injection finished
+        self.mouse_listener = None
+        self.inference_lock = threading.Lock()  # Whisper's KV-cache hooks aren't reentrant
+        self.language_prior = LanguagePrior()
+        self.metrics_log = MetricsLog()  # Per-utterance stage timings (JSONL + rolling p50/p95)
+        self.injector = TextInjector(preferred=self.INJECTION_BACKEND)
         self.current_keys = set()
         self.record_thread = None
         self.last_hotkey_time = 0
         self.hotkey_debounce = 1.0
         self.flash_thread = None
         self.flash_running = False
+        self.streamer = None
+        self.long_session = None
+        self.mel_stream = None
+        self.parallel_decoder = None
+        self.scheduler = None
+        self.last_trimmed_seconds = 0.0
+        self.total_trimmed_seconds = 0.0
         
         # Audio settings (same as original)
-        self.format = pyaudio.paInt16
+        self.format = None  # pyaudio.paInt16, set once pyaudio is imported
         self.channels = 1
         self.rate = 16000
         self.chunk = 1024
+        self.capture_buffer = CaptureBuffer(rate=self.rate)
+        self.capture_overruns = 0  # Blocks the device reported as overflowed, over the session
+        self.last_capture_overruns = 0
+        self.armed_capture = None
+        self.armed_recording = False  # The current recording comes from the armed stream
+    
+    def _start_pipeline(self):
+        """Pipeline: recording -> utterance queue -> single inference worker -> typing.
         
-        # Chinese conversion dictionary (from original dictation.py)
-        self._chinese_map = {
-            '現': '现', '說': '说', '聽': '听', '嗎': '吗', '學': '学', '記': '记',
-            '這': '这', '個': '个', '裡': '里', '邊': '边', '為': '为', '麼': '么',
-            '會': '会', '來': '来', '從': '从', '對': '对', '錯': '错',
-            '時': '时', '間': '间', '鐘': '钟', '請': '请', '謝': '谢',
-            '話': '话', '試': '试', '檢': '检', '體': '体', '還': '还', '是': '是',
-            '你': '你', '我': '我', '在': '在', '中': '中', '文': '文', '能': '能',
-            '懂': '懂', '到': '到', '去': '去', '來': '来', '到': '到', '得': '得',
-            '一': '一', '二': '二', '三': '三', '四': '四', '五': '五', '六': '六',
-            '七': '七', '八': '八', '九': '九', '十': '十', '百': '百', '千': '千',
-            '萬': '万', '億': '亿', '第': '第', '次': '次', '回': '回', '遍': '遍',
-            '種': '种', '類': '类', '樣': '样', '種': '种', '類': '类', '樣': '样',
-            '東': '东', '西': '西', '南': '南', '北': '北', '上': '上', '下': '下',
-            '左': '左', '右': '右', '前': '前', '後': '后', '內': '内', '外': '外',
-            '大': '大', '小': '小', '高': '高', '低': '低', '長': '长', '短': '短',
-            '寬': '宽', '窄': '窄', '厚': '厚', '薄': '薄', '重': '重', '輕': '轻',
-            '快': '快', '慢': '慢', '新': '新', '舊': '旧', '好': '好', '壞': '坏',
-            '美': '美', '醜': '丑', '熱': '热', '冷': '冷', '暖': '暖', '涼': '凉',
-            '乾': '干', '濕': '湿', '亮': '亮', '暗': '暗', '強': '强', '弱': '弱',
-            '多': '多', '少': '少', '全': '全', '半': '半', '整': '整', '零': '零',
-            '單': '单', '雙': '双', '幾': '几', '些': '些', '每': '每', '各': '各',
-            '別': '别', '另': '另', '其': '其', '他': '他', '她': '她', '它': '它',
-            '們': '们', '的': '的', '地': '地', '得': '得', '了': '了', '着': '着',
-            '過': '过', '來': '来', '去': '去', '到': '到', '在': '在', '有': '有',
-            '沒': '没', '不': '不', '很': '很', '太': '太', '更': '更', '最': '最',
-            '比': '比', '和': '和', '與': '与', '或': '或', '但': '但', '而': '而',
-            '因': '因', '為': '为', '所': '所', '以': '以', '把': '把', '被': '被',
-            '給': '给', '讓': '让', '叫': '叫', '使': '使', '要': '要', '想': '想',
-            '覺': '觉', '知': '知', '道': '道', '看': '看', '見': '见', '聞': '闻',
-            '聽': '听', '說': '说', '講': '讲', '談': '谈', '問': '问', '答': '答',
-            '寫': '写', '讀': '读', '教': '教', '學': '学', '習': '习', '練': '练',
-            '工': '工', '作': '作', '做': '做', '辦': '办', '理': '理', '管': '管',
-            '幫': '帮', '助': '助', '支': '支', '持': '持', '保': '保', '護': '护',
-            '愛': '爱', '喜': '喜', '歡': '欢', '討': '讨', '厭': '厌', '恨': '恨',
-            '怕': '怕', '擔': '担', '心': '心', '擔': '担', '憂': '忧', '愁': '愁',
-            '樂': '乐', '笑': '笑', '哭': '哭', '怒': '怒', '氣': '气', '急': '急',
-            '忙': '忙', '閒': '闲', '累': '累', '困': '困', '睡': '睡', '醒': '醒',
-            '吃': '吃', '喝': '喝', '穿': '穿', '戴': '戴', '住': '住', '行': '行',
-            '走': '走', '跑': '跑', '跳': '跳', '坐': '坐', '站': '站', '躺': '躺',
-            '買': '买', '賣': '卖', '送': '送', '收': '收', '借': '借', '還': '还',
-            '開': '开', '關': '关', '進': '进', '出': '出', '入': '入', '離': '离',
-            '回': '回', '來': '来', '去': '去', '到': '到', '從': '从', '向': '向',
-            '往': '往', '朝': '朝', '對': '对', '面': '面', '背': '背', '側': '侧',
-            '正': '正', '反': '反', '直': '直', '彎': '弯', '平': '平', '斜': '斜',
-            '圓': '圆', '方': '方', '尖': '尖', '鈍': '钝', '軟': '软', '硬': '硬',
-            '滑': '滑', '粗': '粗', '細': '细', '光': '光', '亮': '亮', '暗': '暗',
-            '清': '清', '濁': '浊', '香': '香', '臭': '臭', '甜': '甜', '苦': '苦',
-            '酸': '酸', '辣': '辣', '鹹': '咸', '淡': '淡', '濃': '浓', '稀': '稀',
-            '深': '深', '淺': '浅', '遠': '远', '近': '近', '早': '早', '晚': '晚',
-            '遲': '迟', '快': '快', '慢': '慢', '久': '久', '短': '短', '長': '长',
-            '新': '新', '舊': '旧', '老': '老', '少': '少', '年': '年', '月': '月',
-            '日': '日', '時': '时', '分': '分', '秒': '秒', '週': '周', '期': '期',
-            '季': '季', '節': '节', '春': '春', '夏': '夏', '秋': '秋', '冬': '冬',
-            '今': '今', '昨': '昨', '明': '明', '後': '后', '前': '前', '當': '当',
-            '現': '现', '過': '过', '將': '将', '要': '要', '會': '会', '能': '能',
-            '可': '可', '應': '应', '該': '该', '必': '必', '須': '须', '需': '需',
-            '要': '要', '想': '想', '願': '愿', '希': '希', '望': '望', '期': '期',
-            '待': '待', '等': '等', '候': '候', '等': '等', '待': '待', '候': '候'
-        }
-        
-        self.setup_ui()
+        One worker keeps transcripts in capture order while the next recording runs.
+        """
+        self.scheduler = ResourceScheduler(self.RESOURCE_POLICY, intra_threads=self.TORCH_THREADS,
+                                           inter_threads=self.TORCH_INTEROP_THREADS,
+                                           reserve_cores=self.RESERVE_CORES, recording_nice=self.RECORDING_NICE)
+        self.scheduler.reserve_current_thread()  # The Tk main loop
+        self.utterance_queue = queue.Queue(maxsize=self.MAX_QUEUED_UTTERANCES)
+        self.inference_worker = threading.Thread(target=self._inference_worker, daemon=True)
+        self.inference_worker.start()
+        # Typing runs on its own thread so the Tk loop never blocks on it;
+        # jobs (drafts, then their refinements) are applied in order
+        self.injection_queue = queue.Queue()
+        self.injection_worker = threading.Thread(target=self._injection_worker, daemon=True)
+        self.injection_worker.start()
+    
+    def _finish_startup(self):
+        """Stage 2: audio + hotkey (recording works now), then the model in the background"""
+        self.root.update_idletasks()
+        self.profile.mark("window shown")
         self.initialize_audio()
-        self.initialize_whisper()
+        if self.ARMED_MODE:
+            self._arm()
         self.setup_hotkey_listener()
+        self.profile.mark("hotkey ready")
+        self.initialize_whisper()
         
     def position_window(self):
         """Position window with right offset"""
@@ -179,6 +283,25 @@ class IntegratedDictationGUI:
         self.root.bind('<Button-1>', self.start_drag)
         self.root.bind('<B1-Motion>', self.drag_window)
         
+        # Right-click shows latency percentiles
+        self.root.bind('<Button-3>', lambda event: self.show_stats())
+        
+    def show_stats(self):
+        """Show rolling p50/p95 latency per stage in a small popup"""
+        summary = self.metrics_log.summary()
+        lines = [f"{'stage':<16}{'p50':>8}{'p95':>8}{'n':>5}"]
+        for stage, (p50, p95, count) in sorted(summary.items(), key=lambda item: -item[1][0]):
+            lines.append(f"{stage:<16}{p50:>7.2f}s{p95:>7.2f}s{count:>5}")
+        if len(lines) == 1:
+            lines.append("No utterances yet")
+        
+        popup = tk.Toplevel(self.root)
+        popup.title("whisper stats")
+        popup.attributes('-topmost', True)
+        tk.Label(popup, text="\n".join(lines), font=("Courier", 9), justify='left',
+                 padx=8, pady=8).pack()
+        tk.Label(popup, text=self.metrics_log.path, font=("Arial", 7), fg='gray').pack(pady=(0, 4))
+    
     def start_drag(self, event):
         """Start dragging the window"""
         self.drag_start_x = event.x
@@ -192,44 +315,158 @@ class IntegratedDictationGUI:
     
     def initialize_audio(self):
         """Initialize audio system (same as original)"""
+        global pyaudio
         try:
-            self.audio = pyaudio.PyAudio()
+            with self.profile.phase("import pyaudio"):
+                import pyaudio
+            self.format = pyaudio.paInt16
+            with self.profile.phase("audio init"):
+                self.audio = pyaudio.PyAudio()
         except Exception as e:
             self.show_error(f"Audio initialization failed: {e}")
     
     def initialize_whisper(self):
         """Initialize Whisper model (same as original)"""
+        # Listed before any new recording can start, so an active session is never "resumed"
+        interrupted_sessions = SegmentStore.incomplete() if self.LONG_SESSION_MODE else []
+        
         def load_model():
+            global whisper
             try:
-                print("Loading Whisper model... (this may take a moment on first run)")
-                self.model = whisper.load_model(self.MODEL_SIZE)
-                print(f"Whisper model loaded successfully! (Model: {self.MODEL_SIZE})")
-                self.root.after(0, lambda: self.status_label.config(text="Ready"))
+                if self.USE_DAEMON:
+                    try:
+                        with self.profile.phase("connect daemon"):
+                            self.model = ensure_daemon(self.MODEL_SIZE, engine=self.ENGINE,
+                                                       resource_policy=self.RESOURCE_POLICY,
+                                                       threads=self.TORCH_THREADS, reserve_cores=self.RESERVE_CORES,
+                                                       short_clip_buckets=self.SHORT_CLIP_BUCKETS)
+                        print(f"Connected to transcription daemon! (Model: {self.MODEL_SIZE})")
+                        if self.scheduler.recording_nice:
+                            print("⚠️  RECORDING_NICE only applies to an in-process model; "
+                                  "the daemon decodes at normal priority")
+                    except Exception as e:
+                        print(f"⚠️  Transcription daemon unavailable ({e}), loading model in-process")
+                if self.model is None:
+                    print("Loading Whisper model... (this may take a moment on first run)")
+                    with self.profile.phase("import whisper/torch"):
+                        import whisper
+                    with self.profile.phase("load model"):
+                        self.model = create_engine(self.ENGINE, self.MODEL_SIZE).load()
+                    self.model.short_clip_buckets = self.SHORT_CLIP_BUCKETS
+                    self.scheduler.configure_torch()
+                    if self.INCREMENTAL_MEL and self.VAD_ENABLED:
+                        print("⚠️  INCREMENTAL_MEL is ignored while VAD_ENABLED is on "
+                              "(the mel has to match the trimmed audio)")
+                    if self.RESOURCE_POLICY != "default":
+                        print(f"⚙️  CPU scheduling: {self.scheduler.describe()}")
+                    print(f"Whisper model loaded successfully! (Model: {self.MODEL_SIZE}, engine: {self.ENGINE})")
+                self.root.after(0, self._update_queue_status)
             except Exception as e:
                 print(f"Error loading Whisper model: {e}")
                 self.root.after(0, lambda: self.show_error(f"Whisper model failed: {e}"))
+            finally:
+                self.model_ready.set()
+                self.profile.mark("model ready")
+            
+            if self.REFINE_MODEL_SIZE:
+                self._load_refine_model()
+            
+            if self.PARALLEL_DECODE and self.model:
+                with self.profile.phase("start parallel decoder"):
+                    self.parallel_decoder = ParallelDecoder(self.MODEL_SIZE, self.ENGINE,
+                                                            jobs=self.PARALLEL_DECODE_JOBS).start()
+            
+            if interrupted_sessions and self.model:
+                self._resume_long_sessions(interrupted_sessions)
+            
+            # Warm up the text injection backends so the first utterance doesn't pay for them
+            with self.profile.phase("load text injection"):
+                self.injector.load()
+            self.profile.report()
         
         # Load model in background thread
         threading.Thread(target=load_model, daemon=True).start()
         self.status_label.config(text="Loading...")
     
+    def _load_refine_model(self):
+        """Load the second (refinement) model after the draft model is ready"""
+        try:
+            if self.USE_DAEMON:
+                try:
+                    self.refine_model = ensure_daemon(self.REFINE_MODEL_SIZE, default_socket_path("refine"),
+                                                      engine=self.REFINE_ENGINE, resource_policy=self.RESOURCE_POLICY,
+                                                      threads=self.TORCH_THREADS, reserve_cores=self.RESERVE_CORES)
+                except Exception as e:
+                    print(f"⚠️  Refinement daemon unavailable ({e}), loading refinement model in-process")
+            if self.refine_model is None:
+                self.refine_model = create_engine(self.REFINE_ENGINE, self.REFINE_MODEL_SIZE).load()
+            print(f"Refinement model ready! (Model: {self.REFINE_MODEL_SIZE}, engine: {self.REFINE_ENGINE})")
+        except Exception as e:
+            print(f"⚠️  Refinement model failed to load, keeping drafts: {e}")
+    
+    def _arm(self):
+        """Open the always-warm input stream with its pre-roll ring"""
+        if not self.audio or (self.armed_capture and self.armed_capture.armed):
+            return
+        try:
+            capture = AudioCapture(self.audio, self.format, rate=self.rate, chunk=self.chunk,
+                                   channels=self.channels, use_native_rate=self.CAPTURE_NATIVE_RATE,
+                                   on_thread_start=self.scheduler.reserve_current_thread)
+            self.armed_capture = ArmedCapture(capture, ring_seconds=self.ARM_RING_SECONDS,
+                                              idle_timeout=self.ARM_IDLE_TIMEOUT,
+                                              cpu_budget=self.ARM_CPU_BUDGET,
+                                              on_disarm=self._on_disarm).arm()
+            print(f"🎙️  Microphone armed ({self.PREROLL_SECONDS:.1f}s pre-roll)")
+        except Exception as e:
+            print(f"⚠️  Could not arm the microphone ({e}), opening it per recording")
+            self.armed_capture = None
+    
+    def _on_disarm(self, reason):
+        """Called from the armed reader thread once the stream is closed"""
+        if reason == "idle":
+            print(f"💤 Microphone disarmed after {self.ARM_IDLE_TIMEOUT / 60:.0f} min idle (re-arms on next recording)")
+        elif reason == "cpu budget":
+            idle_cpu = self.armed_capture.idle_cpu if self.armed_capture else 0.0
+            print(f"⚠️  Microphone disarmed: idle capture used {idle_cpu:.1%} of a core "
+                  f"(budget {self.ARM_CPU_BUDGET:.1%}); opening it per recording from now on")
+    
     def setup_hotkey_listener(self):
         """Setup global hotkey listener (same as original)"""
+        global keyboard
         try:
+            with self.profile.phase("import pynput"):
+                from pynput import keyboard, mouse
             self.listener = keyboard.Listener(
                 on_press=self.on_press,
                 on_release=self.on_release
             )
             self.listener.start()
+            # Key events arrive on the listener's own thread: keep it off the inference cores
+            self.scheduler.reserve_thread(self.listener.native_id)
+            # Clicks can move the caret or switch fields, which a keyboard listener doesn't see
+            self.mouse_listener = mouse.Listener(on_click=self.on_click)
+            self.mouse_listener.start()
+            self.scheduler.reserve_thread(self.mouse_listener.native_id)
             print("🎤 Dictation tool ready! Press Alt+F9 to start/stop recording.")
         except Exception as e:
             self.show_error(f"Hotkey listener failed: {e}")
     
-    def on_press(self, key):
+    def _injection_in_flight(self):
+        """Whether key events now may be our own (injecting, or just finished and still being delivered)"""
+        return self.injecting or time.monotonic() - self.injected_at < self.INJECT_SETTLE_SECONDS
+    
+    def on_press(self, key, injected=False):
         """Handle key press events (same as original)"""
         try:
             # Track currently pressed keys
             self.current_keys.add(key)
+            
+            # Any real keystroke (other than the hotkey) may move the cursor,
+            # so a typed draft can no longer be replaced safely. injected is
+            # only set by pynput >= 1.8, and not for XTEST events (xdotool)
+            hotkey_keys = (keyboard.Key.alt, keyboard.Key.alt_l, keyboard.Key.alt_r, keyboard.Key.f9)
+            if not injected and not self._injection_in_flight() and key not in hotkey_keys:
+                self.typed_span = None
 
             # Trigger on Alt+F9 only
             is_alt = any(k in self.current_keys for k in (keyboard.Key.alt, keyboard.Key.alt_l, keyboard.Key.alt_r))
@@ -244,7 +481,12 @@ class IntegratedDictationGUI:
         except AttributeError:
             pass
     
-    def on_release(self, key):
+    def on_click(self, x, y, button, pressed, injected=False):
+        """A click may move the caret, so a typed draft can no longer be replaced safely"""
+        if pressed and not injected:
+            self.typed_span = None
+    
+    def on_release(self, key, injected=False):
         """Handle key release events (same as original)"""
         try:
             self.current_keys.discard(key)
@@ -262,21 +504,55 @@ class IntegratedDictationGUI:
         """Start recording (same as original)"""
         if self.recording:
             return
+        
+        # Backpressure: don't capture more than the worker can catch up on
+        if self.utterance_queue.full():
+            print(f"⏸️  {self.utterance_queue.qsize()} utterances still waiting to be decoded, not recording")
+            self.status_label.config(text="Queue full")
+            return
             
         self.recording = True
-        self.frames = []
+        # The flash and record threads (and, unarmed, the PortAudio callback thread) start below;
+        # inference_started() leaves them alone until they are reserved
+        self.scheduler.hold_new_threads()
+        self.scheduler.recording_started()
+        self.capture_buffer.clear()
+        
+        # Start the background decoder for streaming mode
+        if self.STREAMING_MODE and self.model:
+            self.streamer = StreamingTranscriber(self._transcribe_window, rate=self.rate)
+            self.streamer.start()
+        elif self.LONG_SESSION_MODE:
+            self.long_session = LongSession(
+                self._transcribe_when_ready, SegmentStore.create(self.rate), rate=self.rate,
+                segment_seconds=self.LONG_SESSION_SEGMENT_SECONDS,
+                postprocess=self._convert_to_simplified,
+            )
+            self.long_session.start()
+        elif self.INCREMENTAL_MEL and not self.VAD_ENABLED and isinstance(self.model, TranscriptionEngine):
+            # Daemon clients get raw audio; only an in-process model can take a mel. VAD
+            # nearly always trims something, and the mel must cover exactly the decoded audio
+            self.mel_stream = IncrementalLogMel(self.model.n_mels)
         
         # Update UI
         self.mic_label.config(fg='red')  # Red
-        self.status_label.config(text="Recording...")
+        self._update_queue_status()
         
         # Start flashing
         self.start_flashing()
         
-        # Start recording in a separate thread (same as original)
-        self.record_thread = threading.Thread(target=self._record_audio)
-        self.record_thread.daemon = True
-        self.record_thread.start()
+        if self.armed_capture and self.armed_capture.armed:
+            # Stream already open: start with the pre-roll, no device open
+            self.armed_recording = True
+            self.armed_capture.begin(self._store_samples, self.PREROLL_SECONDS)
+            self.scheduler.release_new_threads()
+        else:
+            # Start recording in a separate thread (same as original)
+            self.armed_recording = False
+            self.record_thread = threading.Thread(target=self._record_audio)
+            self.record_thread.daemon = True
+            self.record_thread.start()
+            self.scheduler.reserve_thread(self.record_thread.native_id)
         
         print("🎤 Recording started... (Press Alt+D again to stop)")
     
@@ -288,6 +564,7 @@ class IntegratedDictationGUI:
         self.flash_running = True
         self.flash_thread = threading.Thread(target=self._flash_animation, daemon=True)
         self.flash_thread.start()
+        self.scheduler.reserve_thread(self.flash_thread.native_id)
     
     def stop_flashing(self):
         """Stop flashing animation"""
@@ -305,25 +582,29 @@ class IntegratedDictationGUI:
             self.root.after(0, lambda: self.mic_label.config(fg='orange'))  # Orange
             time.sleep(0.5)
     
+    def _capture_thread_started(self):
+        """First PortAudio callback: the last thread start_recording() was waiting for"""
+        self.scheduler.reserve_current_thread()
+        self.scheduler.release_new_threads()
+    
     def _record_audio(self):
         """Record audio in background thread (same as original)"""
+        capture = None
+        self.last_capture_overruns = 0
         try:
             if not self.audio:
                 print("Audio system not initialized")
                 return
                 
-            self.stream = self.audio.open(
-                format=self.format,
-                channels=self.channels,
-                rate=self.rate,
-                input=True,
-                frames_per_buffer=self.chunk
-            )
+            # Callback mode: PortAudio queues blocks even while this thread is busy
+            capture = AudioCapture(self.audio, self.format, rate=self.rate, chunk=self.chunk,
+                                   channels=self.channels, use_native_rate=self.CAPTURE_NATIVE_RATE,
+                                   on_thread_start=self._capture_thread_started)
+            self.stream = capture.start()
             
             while self.recording:
                 try:
-                    data = self.stream.read(self.chunk, exception_on_overflow=False)
-                    self.frames.append(data)
+                    self._store_samples(capture.read(timeout=0.1))
                 except Exception as e:
                     print(f"Error reading audio: {e}")
                     break
@@ -332,25 +613,36 @@ class IntegratedDictationGUI:
             print(f"Error recording audio: {e}")
             self.recording = False
         finally:
-            if self.stream:
-                try:
-                    self.stream.stop_stream()
-                    self.stream.close()
-                except:
-                    pass
-                self.stream = None
+            if capture:
+                self._store_samples(capture.stop())
+                self.last_capture_overruns = capture.overruns
+                if capture.overruns:
+                    self.capture_overruns += capture.overruns
+                    print(f"⚠️  Microphone overran {capture.overruns} times ({capture.blocks} blocks at "
+                          f"{capture.device_rate} Hz); some audio was lost by the device")
+            self.stream = None
+    
+    def _store_samples(self, samples):
+        """Route captured 16 kHz int16 samples to the active recorder(s)"""
+        if not len(samples):
+            return
+        if self.long_session:
+            self.long_session.feed(samples)  # Spills to disk, so memory stays flat
+        else:
+            self.capture_buffer.append(samples)
+            if self.mel_stream:
+                self.mel_stream.feed(samples)
+        if self.streamer:
+            self.streamer.feed(samples)
     
     def stop_recording(self):
         """Stop recording and transcribe (same as original)"""
         if not self.recording:
             return
         
-        if self.processing:
-            print("⏸️  Already processing, ignoring duplicate request")
-            return
-            
         self.recording = False
-        self.processing = True
+        self.scheduler.recording_stopped()
+        metrics = UtteranceMetrics(model=self.MODEL_SIZE, engine=self.ENGINE)
         
         # Stop flashing
         self.stop_flashing()
@@ -362,55 +654,203 @@ class IntegratedDictationGUI:
         print("⏹️  Recording stopped. Transcribing...")
         
         # Wait for recording thread to finish (same as original)
-        if self.record_thread and self.record_thread.is_alive():
-            self.record_thread.join(timeout=2.0)
-        
-        if self.frames:
-            # Save audio to temporary file (same as original)
-            temp_file = f"/tmp/dictation_{datetime.now().strftime('%Y%m%d_%H%M%S')}.wav"
-            if self._save_audio(temp_file):
-                # Process audio in background
-                threading.Thread(target=self._process_audio, args=(temp_file,), daemon=True).start()
-            else:
-                print("❌ Failed to save audio file")
+        with metrics.stage("record_join"):
+            if self.armed_recording:
+                self.last_capture_overruns = self.armed_capture.end()
+                self.capture_overruns += self.last_capture_overruns
+            elif self.record_thread and self.record_thread.is_alive():
+                self.record_thread.join(timeout=2.0)
+        metrics.info["capture_overruns"] = self.last_capture_overruns
+        metrics.info["armed"] = self.armed_recording
+        if self.ARMED_MODE and not self.armed_recording and (
+                self.armed_capture is None or self.armed_capture.disarm_reason == "idle"):
+            self.root.after(0, self._arm)  # Disarmed while idle; warm up again once this one is queued
+        
+        streamer, self.streamer = self.streamer, None
+        mel_stream, self.mel_stream = self.mel_stream, None
+        metrics.info["streaming"] = streamer is not None
+        
+        session, self.long_session = self.long_session, None
+        if session:
+            metrics.info["long_session"] = True
+            metrics.audio_seconds = session.seconds
+            metrics.mark("queue_wait")
+            try:
+                self.utterance_queue.put_nowait((None, session, metrics, None))
+            except queue.Full:
+                print(f"❌ Utterance queue full; long session kept in {session.store.directory} for resume")
+            self._update_queue_status()
+            return
+        
+        if len(self.capture_buffer):
+            # Hand the captured PCM to Whisper in memory (no ffmpeg/WAV round-trip)
+            with metrics.stage("buffer_convert"):
+                audio = self.capture_buffer.as_float32()
+            metrics.audio_seconds = len(audio) / self.rate
+            if self.DEBUG_SAVE_AUDIO:
+                debug_file = f"/tmp/dictation_{datetime.now().strftime('%Y%m%d_%H%M%S')}.wav"
+                with metrics.stage("wav_save"):
+                    saved = self._save_audio(debug_file)
+                if saved:
+                    print(f"💾 Debug audio saved to {debug_file}")
+            metrics.mark("queue_wait")
+            try:
+                self.utterance_queue.put_nowait((audio, streamer, metrics, mel_stream))
+            except queue.Full:
+                # start_recording checks for room, so this only happens in a race
+                print("❌ Utterance queue full, dropping recording")
+                if streamer:
+                    streamer.cancel()
+        else:
+            if streamer:
+                streamer.cancel()
+        self._update_queue_status()
+    
+    def _inference_worker(self):
+        """Decode queued utterances one at a time, in capture order"""
+        while True:
+            audio, streamer, metrics, mel_stream = self.utterance_queue.get()
+            metrics.end_mark("queue_wait")
+            self.processing = True
+            self.root.after(0, self._update_queue_status)
+            try:
+                self._process_audio(audio, streamer, metrics, mel_stream)
+            finally:
                 self.processing = False
+                self.utterance_queue.task_done()
+                self.root.after(0, self._update_queue_status)
+    
+    def _injection_worker(self):
+        """Run typing jobs one at a time, off the Tk main thread"""
+        self.scheduler.reserve_current_thread()
+        while True:
+            job = self.injection_queue.get()
+            try:
+                job()
+            except Exception as e:
+                print(f"❌ Typing job failed: {e}")
+            finally:
+                self.injection_queue.task_done()
+    
+    def _update_queue_status(self):
+        """Show recording/processing state and queue depth in the status label"""
+        queued = self.utterance_queue.qsize()
+        if self.recording:
+            text = "Recording..."
+        elif self.processing or queued:
+            text = "Processing..."
         else:
-            self.processing = False
+            self.status_label.config(text="Ready")
+            return
+        pending = queued + (1 if self.processing else 0)
+        if pending > (0 if self.recording else 1):
+            text += f" ({pending} queued)"
+        self.status_label.config(text=text)
+    
+    def _trim(self, audio, metrics):
+        """VAD-trim float32 audio; returns (audio to decode, seconds cut), empty audio if no speech"""
+        with metrics.stage("vad"):
+            audio, trimmed = trim_silence(audio, self.rate)
+        metrics.info["trimmed_seconds"] = round(trimmed, 3)
+        return audio, trimmed
     
-    def _process_audio(self, temp_file):
-        """Process recorded audio (same as original)"""
+    def _process_audio(self, audio, streamer=None, metrics=None, mel_stream=None):
+        """Process recorded audio (float32 samples at 16 kHz).
+
+        mel_stream is an IncrementalLogMel fed during recording; its mel is
+        only valid for the untrimmed audio.
+        """
+        if audio is None:
+            # Long session: the segments were spilled and decoded while recording
+            return self._finish_long_session(streamer, metrics)
+        if metrics is None:
+            metrics = UtteranceMetrics(model=self.MODEL_SIZE, engine=self.ENGINE)
+            metrics.audio_seconds = len(audio) / self.rate
+        handed_to_typing = False
         try:
+            if self.VAD_ENABLED:
+                audio, trimmed = self._trim(audio, metrics)
+                self.last_trimmed_seconds = trimmed
+                self.total_trimmed_seconds += trimmed
+                if trimmed > 0:
+                    mel_stream = None  # The mel was computed for the untrimmed audio
+                if len(audio) == 0:
+                    # Nothing to decode; skip Whisper entirely
+                    if streamer:
+                        streamer.cancel()
+                    print("❌ No speech detected")
+                    self.root.after(0, lambda: self.status_label.config(text="No speech"))
+                    return
+                if trimmed > 0:
+                    print(f"✂️  Trimmed {trimmed:.2f}s of silence")
+            
+            if not self.model_ready.is_set():
+                # Recording was allowed before the model finished loading
+                print("⏳ Waiting for Whisper model to finish loading...")
+                self.root.after(0, lambda: self.status_label.config(text="Loading model..."))
+                with metrics.stage("model_wait"):
+                    self.model_ready.wait()
+            
             if not self.model:
-                self.root.after(0, lambda: self.status_label.config(text="Ready"))
-                self.processing = False
+                if streamer:
+                    streamer.cancel()
                 return
             
             # Transcribe with Whisper (same as original)
             print("🔍 Transcribing with Whisper...")
             
-            result = self.model.transcribe(
-                temp_file,
-                task="transcribe",
-                language=None,  # Let Whisper auto-detect
-                initial_prompt="This is a mixed language conversation in Chinese and English. Please transcribe accurately in both languages.",
-                condition_on_previous_text=False,
-                temperature=0.0  # More deterministic output
-            )
-            
-            transcribed_text = result["text"].strip()
+            if streamer:
+                # Most of the audio is already decoded; only the tail is left
+                with metrics.stage("stream_tail"):
+                    transcribed_text = streamer.finish()
+            else:
+                metrics.info["profile"] = self.DECODING_PROFILE
+                language = None
+                if self.LANGUAGE_PRIOR:
+                    with metrics.stage("language"):
+                        language = self._utterance_language(audio)
+                metrics.info["language_prior"] = self.LANGUAGE_PRIOR and not self.language_prior.detected
+                mel = None
+                if mel_stream and mel_stream.samples == len(audio):
+                    with metrics.stage("mel_finish"):
+                        mel = mel_stream.finish()
+                metrics.info["incremental_mel"] = mel is not None
+                with metrics.stage("transcribe"):
+                    result = self._transcribe(audio, mel=mel, language=language)
+                transcribed_text = result["text"].strip()
+                metrics.info["language"] = result.get("language")
+                if "chunks" in result:
+                    metrics.info["parallel_chunks"] = result["chunks"]
+                if "encoder_frames" in result:
+                    metrics.info["encoder_frames"] = result["encoder_frames"]
+                # Engine-side time, without daemon IPC
+                if "transcribe" in result.get("timings", {}):
+                    metrics.add("decode", result["timings"]["transcribe"])
+                if result.get("rtf") is not None:
+                    print(f"⚡ Decoded {result['audio_seconds']:.1f}s in {result['timings']['transcribe']:.2f}s "
+                          f"(RTF {result['rtf']:.2f}, engine: {result.get('engine')})")
             
             if transcribed_text:
                 print(f"📝 Transcribed: {transcribed_text}")
                 
                 # Always convert traditional Chinese characters to simplified (same as original)
-                simplified_text = self._convert_to_simplified(transcribed_text)
+                with metrics.stage("convert"):
+                    simplified_text = self._convert_to_simplified(transcribed_text)
                 
                 # Show conversion if any changes were made
                 if simplified_text != transcribed_text:
                     print(f"🔄 Converted to simplified: {simplified_text}")
                 
                 # Type the text into the active window (same as original)
-                self.root.after(0, lambda: self._type_text(simplified_text))
+                metrics.mark("inject_queue")
+                self.injection_queue.put(lambda: self._type_text(simplified_text, metrics=metrics))
+                handed_to_typing = True
+                
+                # Re-transcribe with the larger model and fix the draft if needed
+                self.refine_generation += 1
+                if self.refine_model and len(audio) / self.rate >= self.REFINE_MIN_SECONDS:
+                    threading.Thread(target=self._refine, daemon=True,
+                                     args=(audio, simplified_text, self.refine_generation)).start()
             else:
                 print("❌ No speech detected")
                 self.root.after(0, lambda: self.status_label.config(text="No speech"))
@@ -419,124 +859,224 @@ class IntegratedDictationGUI:
             print(f"Error transcribing: {e}")
             self.root.after(0, lambda: self.status_label.config(text="Error"))
         finally:
-            # Reset processing flag
-            self.processing = False
-            self.root.after(0, lambda: self.status_label.config(text="Ready"))
-            
-            # Clean up temporary file (same as original)
+            # Typed utterances are recorded once the text is in the window
+            if not handed_to_typing:
+                self._finish_metrics(metrics)
+    
+    def _finish_long_session(self, session, metrics):
+        """Decode a long session's last segment and type the whole transcript"""
+        handed_to_typing = False
+        try:
+            with metrics.stage("session_tail"):
+                text = session.finish()
+            print(f"📝 Transcribed {session.seconds / 60:.1f} min long session: {text}")
+            print(f"💾 Transcript saved to {os.path.join(session.store.directory, 'transcript.txt')}")
+            if text:
+                metrics.mark("inject_queue")
+                self.injection_queue.put(lambda: self._type_text(text, metrics=metrics))
+                handed_to_typing = True
+            else:
+                print("❌ No speech detected")
+                self.root.after(0, lambda: self.status_label.config(text="No speech"))
+        except Exception as e:
+            print(f"Error finishing long session: {e} (resumable from {session.store.directory})")
+            self.root.after(0, lambda: self.status_label.config(text="Error"))
+        finally:
+            if not handed_to_typing:
+                self._finish_metrics(metrics)
+    
+    def _resume_long_sessions(self, stores):
+        """Finish long sessions interrupted by a crash (transcripts are saved, not typed)"""
+        for store in stores:
+            print(f"🩹 Resuming interrupted long session {store.directory} "
+                  f"({len(store.pending())} of {len(store.manifest['segments'])} segments left)")
             try:
-                os.remove(temp_file)
-            except:
-                pass
+                session = LongSession(self._transcribe, store, rate=store.rate,
+                                      postprocess=self._convert_to_simplified)
+                text = session.finish()
+                print(f"📝 Recovered: {text}")
+                print(f"💾 Transcript saved to {os.path.join(store.directory, 'transcript.txt')}")
+            except Exception as e:
+                print(f"⚠️  Could not resume {store.directory}: {e}")
+    
+    def _finish_metrics(self, metrics):
+        """Log an utterance's stage timings and print the rolling percentiles"""
+        record = self.metrics_log.record(metrics)
+        p50, p95, count = self.metrics_log.percentiles("total")
+        print(f"⏱️  {record['total']:.2f}s stop-to-text (p50 {p50:.2f}s, p95 {p95:.2f}s over {count})")
+        return record
+    
+    def _refine(self, audio, draft, generation):
+        """Re-transcribe an utterance with the refinement model (background thread)"""
+        with self.refine_lock:
+            if generation != self.refine_generation:
+                return  # A newer utterance superseded this one
+            try:
+                result = self._transcribe(audio, model=self.refine_model)
+            except Exception as e:
+                print(f"⚠️  Refinement failed: {e}")
+                return
+        refined = self._convert_to_simplified(result["text"].strip())
+        if not refined or refined == draft:
+            print("✅ Refinement agrees with draft")
+            return
+        self.injection_queue.put(lambda: self._apply_refinement(draft, refined, generation))
+    
+    def _apply_refinement(self, draft, refined, generation):
+        """Replace the typed draft with the refined text if it is still at the cursor"""
+        if generation != self.refine_generation or self.typed_span != draft:
+            print("⏭️  Skipping refinement: the draft is no longer right before the cursor")
+            return
+        print(f"✨ Refined: {refined}")
+        self._type_text(refined, replace=draft)
+    
+    def _transcribe(self, audio, model=None, mel=None, language=None, timestamps=False):
+        """Run Whisper on float32 audio with the dictation decoding options.
+
+        mel (from IncrementalLogMel) skips Whisper's audio front end; it is
+        only passed to in-process engines, never to the daemon. language
+        defaults to the prior's locked language; timestamps keeps timestamp
+        tokens in profiles that drop them.
+        """
+        if language is None and self.LANGUAGE_PRIOR:
+            language = self.language_prior.language  # None lets Whisper auto-detect the language
+        if (model is None and self.parallel_decoder
+                and len(audio) / self.rate >= self.PARALLEL_DECODE_MIN_SECONDS):
+            return self.parallel_decoder.transcribe(audio, **decode_options(self.DECODING_PROFILE, language=language))
+        if model is None:
+            # Streaming windows and queued utterances share the main model
+            with self.inference_lock:
+                return self._transcribe(audio, model=self.model, mel=mel, language=language, timestamps=timestamps)
+        options = decode_options(self.DECODING_PROFILE, language=language, timestamps=timestamps)
+        if mel is not None and isinstance(model, TranscriptionEngine):
+            options["mel"] = mel
+        self.scheduler.inference_started()  # Pins torch threads started since the last decode
+        return model.transcribe(audio, **options)
+    
+    def _transcribe_window(self, audio):
+        """_transcribe for streaming windows: StreamingTranscriber needs segment timestamps"""
+        return self._transcribe(audio, timestamps=True)
+    
+    def _utterance_language(self, audio):
+        """The prior's language for an utterance, running language detection when it asks for one"""
+        def detect():
+            with self.inference_lock:
+                self.scheduler.inference_started()
+                return self.model.detect_language(audio)
+        try:
+            return self.language_prior.language_for(detect)
+        except Exception as e:
+            print(f"⚠️  Language detection failed ({type(e).__name__}: {e}); Whisper will detect it")
+            return None
+    
+    def _transcribe_when_ready(self, audio):
+        """_transcribe for work that may start before the model has loaded"""
+        self.model_ready.wait()
+        if not self.model:
+            raise RuntimeError("Whisper model is not loaded")
+        return self._transcribe(audio)
     
     def _save_audio(self, filename):
-        """Save recorded audio to file (same as original)"""
+        """Save recorded audio to a WAV file (debug mode only)"""
         try:
             with wave.open(filename, 'wb') as wf:
                 wf.setnchannels(self.channels)
                 wf.setsampwidth(self.audio.get_sample_size(self.format))
                 wf.setframerate(self.rate)
-                wf.writeframes(b''.join(self.frames))
+                wf.writeframes(self.capture_buffer.as_bytes())
             return True
         except Exception as e:
             print(f"Error saving audio: {e}")
             return False
     
     def _convert_to_simplified(self, text):
-        """Convert traditional Chinese to simplified (same as original)"""
-        converted_text = text
-        for traditional, simplified in self._chinese_map.items():
-            converted_text = converted_text.replace(traditional, simplified)
-        return converted_text
-    
-    def _type_text(self, text):
-        """Type text into active window (same as original)"""
+        """Convert traditional Chinese to simplified"""
+        return convert_to_simplified(text)
+    
+    def _type_text(self, text, replace=None, metrics=None):
+        """Type text into active window; with replace, overwrite that just-typed span"""
+        timing = metrics if metrics is not None else UtteranceMetrics()
+        timing.end_mark("inject_queue")
         try:
             print(f"🎯 Attempting to type: '{text}'")
             
-            # Small delay to ensure focus is on the target window
-            time.sleep(0.2)
-            
-            # Use clipboard method for better Unicode support (same as original)
-            original_clipboard = pyperclip.paste()
-            
-            # Clear clipboard first to avoid contamination
-            pyperclip.copy("")
-            time.sleep(0.1)
-            
-            # Copy text to clipboard
-            pyperclip.copy(text)
-            
-            # Verify clipboard content
-            clipboard_content = pyperclip.paste()
-            if clipboard_content != text:
-                print(f"⚠️  Clipboard verification failed! Expected: '{text}', Got: '{clipboard_content}'")
-                # Try direct typing instead
-                raise Exception("Clipboard content mismatch")
-            
-            # Paste using Ctrl+V
-            pyautogui.hotkey('ctrl', 'v')
-            
-            # Wait a bit longer for paste to complete
-            time.sleep(0.5)
-            
-            # Don't restore clipboard immediately to avoid triggering additional paste
-            # Only restore if original content was not empty and not too long
-            if original_clipboard and len(original_clipboard) < 100:
-                time.sleep(0.5)  # Longer delay before restoring
-                pyperclip.copy(original_clipboard)
-            
-            print("✅ Text typed successfully via clipboard!")
-            self.status_label.config(text="Text typed!")
+            # The stop hotkey's Alt may still be held; pasting now would send Ctrl+Alt+V
+            with timing.stage("key_release_wait"):
+                self._wait_for_hotkey_release()
             
+            self.injecting = True
+            self.typed_span = None
+            with timing.stage("inject"):
+                backend = self.injector.inject(text, replace=replace)
+            timing.info["injection_backend"] = backend
+            print(f"✅ Text typed successfully via {backend}!")
+            self.root.after(0, lambda: self.status_label.config(text="Text typed!"))
+            self.typed_span = text
         except Exception as e:
-            print(f"❌ Clipboard method failed: {e}")
-            print("🔄 Trying direct typing method...")
-            
-            # Fallback to direct typing if clipboard method fails
-            try:
-                # Clear any existing text selection first
-                pyautogui.hotkey('ctrl', 'a')  # Select all
-                time.sleep(0.1)
-                pyautogui.press('delete')      # Delete selected text
-                time.sleep(0.1)
-                
-                # Type the text directly
-                pyautogui.write(text)
-                print("✅ Text typed successfully (direct method)!")
-                self.status_label.config(text="Text typed!")
-            except Exception as e2:
-                print(f"❌ Direct typing also failed: {e2}")
-                print("💡 Please manually copy and paste the text from the terminal output")
-                self.status_label.config(text="Type error")
+            print(f"❌ Typing failed: {e}")
+            print("💡 Please manually copy and paste the text from the terminal output")
+            self.root.after(0, lambda: self.status_label.config(text="Type error"))
+        finally:
+            self.injected_at = time.monotonic()
+            self.injecting = False
+            if metrics is not None:
+                self._finish_metrics(metrics)
+    
+    def _wait_for_hotkey_release(self, timeout=1.0):
+        """Wait until Alt/F9 are released (returns immediately without a key listener)"""
+        if keyboard is None:
+            return
+        hotkey_keys = (keyboard.Key.alt, keyboard.Key.alt_l, keyboard.Key.alt_r, keyboard.Key.f9)
+        deadline = time.monotonic() + timeout
+        while any(key in self.current_keys for key in hotkey_keys) and time.monotonic() < deadline:
+            time.sleep(0.005)
     
     def show_error(self, message):
         """Show error message"""
         self.status_label.config(text="Error")
         messagebox.showerror("Error", message)
     
-    def _check_existing_processes(self):
-        """Check if another dictation process is already running"""
+    def _handle_instance_command(self, request):
+        """Answer a command forwarded by a second launch (command channel thread)"""
+        cmd = request.get("cmd")
+        if cmd == "ping":
+            return {"ok": True, "pid": os.getpid(), "recording": self.recording}
+        if cmd == "toggle":
+            self.root.after(0, self.toggle_recording)
+            return {"ok": True, "recording": not self.recording}
+        if cmd == "show":
+            self.root.after(0, self._show_window)
+            return {"ok": True}
+        if cmd == "transcribe":
+            return self._transcribe_file(request.get("path"))
+        return {"ok": False, "error": f"Unknown command: {cmd}"}
+    
+    def _transcribe_file(self, path):
+        """Transcribe an audio file for the command channel; errors go into the response"""
+        if not isinstance(path, str) or not os.path.isfile(path):
+            return {"ok": False, "error": f"No such file: {path}"}
+        if self.recording:
+            return {"ok": False, "error": "Recording in progress; try again once it has stopped"}
+        self.model_ready.wait()
+        if not self.model:
+            return {"ok": False, "error": "Whisper model is not loaded"}
         try:
-            current_pid = os.getpid()
-            for proc in psutil.process_iter(['pid', 'name', 'cmdline']):
-                try:
-                    # Check if it's a Python process
-                    if proc.info['name'] and 'python' in proc.info['name'].lower():
-                        cmdline = proc.info['cmdline']
-                        if cmdline and len(cmdline) > 1:
-                            # Check if it's running dictation-related scripts
-                            script_name = cmdline[1] if len(cmdline) > 1 else ""
-                            if any(keyword in script_name.lower() for keyword in ['dictation', 'whisper']):
-                                # Skip current process
-                                if proc.info['pid'] != current_pid:
-                                    return True
-                except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
-                    continue
-            return False
+            import whisper
+            audio = whisper.load_audio(path)
+            if self.VAD_ENABLED:
+                audio, _ = self._trim(audio, UtteranceMetrics(model=self.MODEL_SIZE, engine=self.ENGINE))
+            if len(audio) == 0:
+                return {"ok": True, "text": ""}  # No speech; skip Whisper as for recordings
+            # Decodes share inference_lock with the worker, so queued utterances keep their order
+            result = self._transcribe(audio)
+            return {"ok": True, "text": self._convert_to_simplified(result["text"].strip())}
         except Exception as e:
-            print(f"⚠️  Error checking existing processes: {e}")
-            return False
+            return {"ok": False, "error": f"{type(e).__name__}: {e}"}
+    
+    def _show_window(self):
+        """Bring the window back if it was minimized or hidden behind others"""
+        self.root.deiconify()
+        self.root.lift()
     
     def close_app(self):
         """Close the application (same cleanup as original)"""
@@ -548,6 +1088,9 @@ class IntegratedDictationGUI:
         # Stop processing
         self.processing = False
         
+        if self.armed_capture:
+            self.armed_capture.disarm()
+        
         # Clean up audio (same as original)
         if self.stream:
             try:
@@ -570,6 +1113,13 @@ class IntegratedDictationGUI:
                 self.listener.stop()
             except:
                 pass
+        if self.mouse_listener:
+            self.mouse_listener.stop()
+        
+        if self.parallel_decoder:
+            self.parallel_decoder.close()
+        
+        self.instance.release()
         
         print("👋 Exiting dictation tool...")
         # Close window
@@ -583,14 +1133,59 @@ class IntegratedDictationGUI:
         except Exception as e:
             print(f"Application error: {e}")
 
+def _forward_to_running_instance(args):
+    """Hand this launch's command to the instance holding the lock; returns an exit code"""
+    if args.transcribe:
+        for path in args.transcribe:
+            response = send_command("transcribe", timeout=None, path=os.path.abspath(path))
+            if response is None:
+                break
+            if not response.get("ok"):
+                print(f"❌ {path}: {response.get('error')}")
+                continue
+            print(f"📝 {path}:")
+            print(response["text"])
+        else:
+            return 0
+    else:
+        response = send_command("toggle" if args.toggle else "show")
+        if response is not None:
+            if args.toggle:
+                print("🎤 Recording started" if response.get("recording") else "⏹️  Recording stopped")
+            return 0
+    print("❌ Another dictation process is already running but not answering commands")
+    print("💡 It may still be starting up; try again in a moment.")
+    return 1
+
 def main():
     """Main entry point"""
-    # Set pyautogui safety settings (same as original)
-    pyautogui.FAILSAFE = True
-    pyautogui.PAUSE = 0.1
+    parser = argparse.ArgumentParser(description="Whisper Dictation Tool")
+    parser.add_argument("--startup-profile", action="store_true",
+                        help="Print per-phase import and init timings")
+    parser.add_argument("--toggle", action="store_true",
+                        help="Start/stop recording (in the running instance if there is one)")
+    parser.add_argument("--show", action="store_true", help="Raise the running instance's window")
+    parser.add_argument("--transcribe", nargs="+", metavar="FILE",
+                        help="Transcribe files with the running instance's model")
+    args = parser.parse_args()
+    
+    instance = SingleInstance()
+    if not instance.acquire():
+        sys.exit(_forward_to_running_instance(args))
+    
+    if args.transcribe:
+        # Nothing running to hand the files to; use the transcription daemon with the configured model
+        instance.release()
+        config = IntegratedDictationGUI.__new__(IntegratedDictationGUI)
+        config._init_state()
+        os.execv(sys.executable, [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                  "transcription_daemon.py"), "--model", config.MODEL_SIZE,
+                                  "--engine", config.ENGINE, "--transcribe"] + args.transcribe)
     
     try:
-        app = IntegratedDictationGUI()
+        app = IntegratedDictationGUI(startup_profile=args.startup_profile, instance=instance)
+        if args.toggle:
+            app.root.after(0, app.toggle_recording)  # Runs after audio init (_finish_startup)
         app.run()
     except Exception as e:
         print(f"Failed to start application: {e}")
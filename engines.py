@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Inference engines for the Whisper Dictation Tool
+Every engine loads a model and exposes the same transcribe() call as a Whisper
+model, adding timings and real-time factor to the result. Select one with
+ENGINE next to MODEL_SIZE (or --engine for the daemon).
+"""
+
+import os
+import time
+
+SAMPLE_RATE = 16000
+
+
+def physical_cpu_count():
+    """Physical cores if psutil knows them, otherwise the usable logical CPUs"""
+    try:
+        import psutil
+        count = psutil.cpu_count(logical=False)
+        if count:
+            return count
+    except ImportError:
+        pass
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+class TranscriptionEngine:
+    """Base class for inference engines"""
+
+    name = "base"
+    short_clip_buckets = None  # e.g. (5.0, 10.0, 15.0, 20.0): short clips use a truncated encoder window
+
+    def __init__(self, model_size="small"):
+        self.model_size = model_size
+        self.model = None
+        self.load_seconds = 0.0
+
+    def load(self):
+        """Load the model; returns self so calls can be chained"""
+        start = time.perf_counter()
+        self.model = self._load_model()
+        self.load_seconds = time.perf_counter() - start
+        return self
+
+    def _load_model(self):
+        raise NotImplementedError
+
+    def _run(self, audio, **options):
+        return self.model.transcribe(audio, **options)
+
+    def _run_full(self, audio, mel=None, **options):
+        if mel is None:
+            return self._run(audio, **options)
+        from mel_features import precomputed_mel
+        with precomputed_mel(mel):
+            return self._run(audio, **options)
+
+    @property
+    def n_mels(self):
+        """Mel bands the model expects (80, or 128 for large-v3)"""
+        return self.model.dims.n_mels
+
+    def transcribe(self, audio, mel=None, **options):
+        """Transcribe float32 16 kHz audio; adds "timings", "rtf" and "engine" to the result.
+
+        mel, if given, is the audio's log-mel spectrogram (see mel_features.py)
+        and replaces transcribe()'s own front end. With short_clip_buckets set,
+        short clips are first tried on a truncated encoder window (short_clip.py).
+        """
+        start = time.perf_counter()
+        result = None
+        if self.short_clip_buckets and not isinstance(audio, str):
+            from short_clip import transcribe_short
+            # None when the clip is too long or the decode fails the quality checks
+            result = transcribe_short(self.model, audio, self.short_clip_buckets, mel=mel, **options)
+        if result is None:
+            result = self._run_full(audio, mel, **options)
+        elapsed = time.perf_counter() - start
+        audio_seconds = len(audio) / SAMPLE_RATE if not isinstance(audio, str) else None
+        result.setdefault("timings", {})["transcribe"] = elapsed
+        result["audio_seconds"] = audio_seconds
+        result["rtf"] = elapsed / audio_seconds if audio_seconds else None
+        result["engine"] = self.name
+        return result
+
+    def detect_language(self, audio):
+        """{language: probability} for the first 30 s of float32 audio, as transcribe() detects it"""
+        from whisper.audio import N_FRAMES, N_SAMPLES, log_mel_spectrogram, pad_or_trim
+
+        if not self.model.is_multilingual:
+            return {"en": 1.0}
+        mel = log_mel_spectrogram(audio, self.n_mels, padding=N_SAMPLES)
+        segment = pad_or_trim(mel, N_FRAMES).to(self.model.device)
+        _, probs = self.model.detect_language(segment)
+        return probs
+
+    def transcribe_batch(self, clips, **options):
+        """Transcribe several float32 clips of up to 30 s in one batched decode (batch_decode.py).
+
+        Each result gets the same keys as transcribe(); the batch's time is
+        split evenly across its clips.
+        """
+        from batch_decode import transcribe_batch
+
+        start = time.perf_counter()
+        results = transcribe_batch(self.model, clips, **options)
+        elapsed = (time.perf_counter() - start) / max(1, len(clips))
+        for audio, result in zip(clips, results):
+            audio_seconds = len(audio) / SAMPLE_RATE
+            result.setdefault("timings", {})["transcribe"] = elapsed
+            result["audio_seconds"] = audio_seconds
+            result["rtf"] = elapsed / audio_seconds if audio_seconds else None
+            result["engine"] = self.name
+        return results
+
+
+class WhisperEngine(TranscriptionEngine):
+    """Stock openai-whisper (PyTorch fp32 on CPU, fp16 on GPU)"""
+
+    name = "whisper"
+    use_cache = True  # Map weights from model_cache.py instead of unpickling the checkpoint
+
+    def _load_model(self):
+        return self._load_whisper()
+
+    def _load_whisper(self, device=None):
+        if self.use_cache:
+            try:
+                import model_cache
+                return model_cache.load_model(self.model_size, device=device)
+            except Exception as e:
+                print(f"⚠️  Model cache unavailable ({e}), loading the checkpoint")
+        import whisper
+        return whisper.load_model(self.model_size, device=device)
+
+
+class QuantizedWhisperEngine(WhisperEngine):
+    """CPU engine: dynamic int8 quantization of every Linear layer, tuned threads.
+
+    The attention and MLP projections hold most of Whisper's weights and FLOPs;
+    quantizing them to int8 roughly halves CPU decode time with a small
+    accuracy cost. Threads are pinned to the physical core count, since
+    hyperthread siblings only add contention for these matmuls.
+    """
+
+    name = "whisper-int8"
+
+    def __init__(self, model_size="small", num_threads=None):
+        super().__init__(model_size)
+        self.num_threads = num_threads or physical_cpu_count()
+
+    def _load_model(self):
+        import torch
+        import whisper
+        from torch import nn
+
+        torch.set_num_threads(self.num_threads)
+        model = self._load_whisper(device="cpu")
+
+        # whisper.model.Linear only adds a dtype cast (a no-op in fp32), but
+        # quantize_dynamic matches exact module types, so make them plain Linears
+        for module in model.modules():
+            if isinstance(module, whisper.model.Linear):
+                module.__class__ = nn.Linear
+
+        # In place: a copy would fault in every mapped fp32 weight as private memory
+        model = torch.quantization.quantize_dynamic(model, {nn.Linear}, dtype=torch.qint8, inplace=True)
+        model.eval()
+        return model
+
+    def _run(self, audio, **options):
+        options.setdefault("fp16", False)
+        return self.model.transcribe(audio, **options)
+
+    def transcribe_batch(self, clips, **options):
+        options.setdefault("fp16", False)
+        return super().transcribe_batch(clips, **options)
+
+
+ENGINES = {
+    WhisperEngine.name: WhisperEngine,
+    QuantizedWhisperEngine.name: QuantizedWhisperEngine,
+}
+
+
+def create_engine(name="whisper", model_size="small"):
+    """Create (but don't load) the engine registered under name"""
+    try:
+        engine_class = ENGINES[name]
+    except KeyError:
+        raise ValueError(f"Unknown engine '{name}' (choose from: {', '.join(ENGINES)})")
+    return engine_class(model_size)
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Incremental log-mel features for the Whisper Dictation Tool
+Computes Whisper's log-mel spectrogram while the user is still speaking, so
+transcribe() can start from a ready mel instead of running its own audio
+front end over the whole clip after the hotkey is released.
+"""
+
+import contextlib
+import sys
+import threading
+
+import numpy as np
+
+# whisper.audio constants (whisper itself is imported lazily)
+SAMPLE_RATE = 16000
+N_FFT = 400
+HOP_LENGTH = 160
+N_SAMPLES = 30 * SAMPLE_RATE
+
+
+class IncrementalLogMel:
+    """Whisper's log-mel spectrogram, computed as audio arrives.
+
+    finish() returns the same tensor as
+    whisper.audio.log_mel_spectrogram(audio, n_mels, padding=N_SAMPLES),
+    which is what transcribe() builds. STFT frames are computed as soon as
+    their 400-sample window is complete, carrying the overlap into the next
+    chunk. Only the global max-8 floor and scaling need the whole clip, so
+    finish() computes the last few frames, fills in the all-zero frames of
+    the 30 s padding and normalizes.
+    """
+
+    def __init__(self, n_mels=80):
+        import torch
+        from whisper.audio import mel_filters
+
+        self.n_mels = n_mels
+        self.samples = 0
+        self._torch = torch
+        self._window = torch.hann_window(N_FFT)
+        self._filters = mel_filters("cpu", n_mels)
+        self._head = np.zeros(0, dtype=np.float32)  # Audio until the reflect padding can be built
+        self._carry = None  # Not yet consumed part of the centred (reflect-padded) signal
+        self._blocks = []  # log10 mel spectra, (n_mels, frames) each
+        self._frames = 0
+
+    def feed(self, data):
+        """Append int16 PCM (bytes or samples) or float32 samples"""
+        if isinstance(data, (bytes, bytearray, memoryview)):
+            data = np.frombuffer(data, dtype=np.int16)
+        if data.dtype == np.int16:
+            samples = data.astype(np.float32)
+            samples *= 1.0 / 32768.0  # Same conversion as CaptureBuffer.as_float32
+        else:
+            samples = np.asarray(data, dtype=np.float32)
+        self.samples += len(samples)
+        if self._carry is None:
+            self._head = np.concatenate((self._head, samples))
+            if len(self._head) <= N_FFT // 2:
+                return
+            self._start()
+        else:
+            self._carry = np.concatenate((self._carry, samples))
+        self._compute()
+
+    def _start(self):
+        # torch.stft(center=True) reflect-pads N_FFT // 2 samples at the start
+        self._carry = np.concatenate((self._head[1:N_FFT // 2 + 1][::-1], self._head))
+        self._head = None
+
+    def _compute(self):
+        count = (len(self._carry) - N_FFT) // HOP_LENGTH + 1
+        if count <= 0:
+            return
+        torch = self._torch
+        signal = torch.from_numpy(self._carry[:(count - 1) * HOP_LENGTH + N_FFT])
+        stft = torch.stft(signal, N_FFT, HOP_LENGTH, window=self._window, center=False, return_complex=True)
+        magnitudes = stft.abs() ** 2
+        self._blocks.append(torch.clamp(self._filters @ magnitudes, min=1e-10).log10())
+        self._frames += count
+        self._carry = self._carry[count * HOP_LENGTH:]
+
+    def finish(self):
+        """Return the (n_mels, frames) log-mel tensor for all audio fed so far"""
+        torch = self._torch
+        total = (self.samples + N_SAMPLES) // HOP_LENGTH
+        if self._carry is None:
+            # Shorter than the reflect padding: the zero padding follows directly
+            self._head = np.pad(self._head, (0, N_FFT // 2 + 1 - len(self._head)))
+            self._start()
+        # Frames whose window still touches audio; every later frame is all zeros
+        live = min(total, -(-(self.samples + N_FFT // 2) // HOP_LENGTH))
+        if live > self._frames:
+            needed = (live - self._frames - 1) * HOP_LENGTH + N_FFT
+            self._carry = np.pad(self._carry, (0, max(0, needed - len(self._carry))))
+            self._compute()
+        blocks = list(self._blocks)
+        if total > self._frames:
+            silence = torch.clamp(torch.zeros(1), min=1e-10).log10()
+            blocks.append(silence.expand(self.n_mels, total - self._frames))
+        log_spec = torch.cat(blocks, dim=1)[:, :total]
+        log_spec = torch.maximum(log_spec, log_spec.max() - 8.0)
+        return (log_spec + 4.0) / 4.0
+
+
+_local = threading.local()
+_install_lock = threading.Lock()
+_installed = False
+
+
+def _install():
+    """Route whisper.transcribe's front end through precomputed mels (once)"""
+    global _installed
+    with _install_lock:
+        if _installed:
+            return
+        import whisper  # Loads the whisper.transcribe module
+        # whisper/__init__ re-exports transcribe(), shadowing the module attribute
+        whisper_transcribe = sys.modules["whisper.transcribe"]
+        original = whisper_transcribe.log_mel_spectrogram
+
+        def log_mel_spectrogram(audio, n_mels=80, padding=0, device=None):
+            mel = getattr(_local, "mel", None)
+            if (mel is not None and padding == N_SAMPLES and mel.shape[0] == n_mels
+                    and not isinstance(audio, str)
+                    and mel.shape[-1] == (len(audio) + padding) // HOP_LENGTH):
+                _local.mel = None  # One transcribe() call per precomputed mel
+                return mel if device is None else mel.to(device)
+            return original(audio, n_mels, padding, device)
+
+        whisper_transcribe.log_mel_spectrogram = log_mel_spectrogram
+        _installed = True
+
+
+@contextlib.contextmanager
+def precomputed_mel(mel):
+    """Within the block, transcribe() on this thread uses mel instead of computing it.
+
+    A mel that doesn't match the audio (length or n_mels) is ignored, so
+    the worst case is the normal front end.
+    """
+    _install()
+    _local.mel = mel
+    try:
+        yield
+    finally:
+        _local.mel = None
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Latency instrumentation for the Whisper Dictation Tool
+Times each stage between stopping a recording and the text appearing, writes
+one JSONL record per utterance and keeps rolling p50/p95 per stage.
+
+Usage: python metrics.py --by profile    # Compare groups over the whole log
+"""
+
+import argparse
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+
+def default_metrics_path():
+    state_dir = os.environ.get("XDG_STATE_HOME") or os.path.expanduser("~/.local/state")
+    return os.path.join(state_dir, "whisper-dictation", "metrics.jsonl")
+
+
+def percentile(values, q):
+    """Linear-interpolated percentile of a non-empty sequence (q in 0..100)"""
+    ordered = sorted(values)
+    pos = (len(ordered) - 1) * q / 100.0
+    lower = int(pos)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (pos - lower)
+
+
+class UtteranceMetrics:
+    """Stage timings for one utterance.
+
+    Stages may be timed from different threads (capture, inference worker,
+    Tk main loop); repeated stages accumulate.
+    """
+
+    def __init__(self, **info):
+        self.start = time.perf_counter()
+        self.timestamp = time.time()
+        self.stages = {}
+        self.info = dict(info)
+        self.audio_seconds = 0.0
+        self._marks = {}
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def add(self, name, seconds):
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def mark(self, name):
+        """Start a stage that ends on another thread (see end_mark)"""
+        self._marks[name] = time.perf_counter()
+
+    def end_mark(self, name):
+        if name in self._marks:
+            self.add(name, time.perf_counter() - self._marks.pop(name))
+
+    def to_record(self):
+        total = time.perf_counter() - self.start
+        decode = self.stages.get("transcribe")
+        return {
+            "timestamp": self.timestamp,
+            "audio_seconds": round(self.audio_seconds, 3),
+            "total": round(total, 4),
+            "rtf": round(decode / self.audio_seconds, 4) if decode and self.audio_seconds else None,
+            "stages": {name: round(seconds, 4) for name, seconds in self.stages.items()},
+            **self.info,
+        }
+
+
+class MetricsLog:
+    """Appends utterance records to a JSONL file and keeps rolling percentiles"""
+
+    def __init__(self, path=None, window=200):
+        self.path = path or default_metrics_path()
+        self.window = window
+        self._history = {}  # stage -> deque of seconds ("total" included)
+        self._lock = threading.Lock()
+
+    def record(self, metrics):
+        """Finish an utterance; returns the record that was written"""
+        record = metrics.to_record()
+        with self._lock:
+            for name, seconds in [("total", record["total"])] + list(record["stages"].items()):
+                self._history.setdefault(name, deque(maxlen=self.window)).append(seconds)
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                with open(self.path, "a", encoding="utf-8") as fh:
+                    fh.write(json.dumps(record, ensure_ascii=False) + "\n")
+            except OSError as e:
+                print(f"⚠️  Could not write metrics: {e}")
+        return record
+
+    def percentiles(self, stage="total"):
+        """Return (p50, p95, count) for a stage, or None if it has no samples"""
+        with self._lock:
+            values = list(self._history.get(stage, ()))
+        if not values:
+            return None
+        return percentile(values, 50), percentile(values, 95), len(values)
+
+    def summary(self):
+        """Return {stage: (p50, p95, count)} for every stage seen so far"""
+        with self._lock:
+            stages = list(self._history)
+        return {stage: self.percentiles(stage) for stage in stages}
+
+
+def summarize(path=None, group_by="profile", stages=("total", "transcribe")):
+    """Return {group value: {stage: (p50, p95, count)}} over a metrics log"""
+    groups = {}
+    with open(path or default_metrics_path(), encoding="utf-8") as fh:
+        for line in fh:
+            record = json.loads(line)
+            values = groups.setdefault(str(record.get(group_by)), {})
+            for stage in stages:
+                seconds = record["total"] if stage == "total" else record["stages"].get(stage)
+                if seconds is not None:
+                    values.setdefault(stage, []).append(seconds)
+    return {group: {stage: (percentile(v, 50), percentile(v, 95), len(v)) for stage, v in values.items()}
+            for group, values in groups.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize the dictation latency log")
+    parser.add_argument("--path", default=None, help=f"Metrics JSONL (default: {default_metrics_path()})")
+    parser.add_argument("--by", default="profile",
+                        help="Record field to group by (profile, language_prior, engine, model, ...)")
+    parser.add_argument("--stage", nargs="+", default=["total", "transcribe"], help="Stages to report")
+    args = parser.parse_args()
+
+    summary = summarize(args.path, args.by, args.stage)
+    print(f"{args.by:<16}" + "".join(f"{stage + ' p50/p95 (s)':>26}" for stage in args.stage) + f"{'n':>6}")
+    for group, stages in sorted(summary.items()):
+        cells = "".join(f"{stages[s][0]:>12.3f} /{stages[s][1]:>8.3f}    " if s in stages else f"{'—':>26}"
+                        for s in args.stage)
+        count = max(values[2] for values in stages.values()) if stages else 0
+        print(f"{group:<16}{cells}{count:>6}")
+
+
+if __name__ == "__main__":
+    main()
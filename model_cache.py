@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Memory-mapped model cache for the Whisper Dictation Tool
+Converts a Whisper checkpoint once into a flat file of fp32 tensors behind a
+JSON header. Later loads map that file instead of unpickling the checkpoint:
+nothing is deserialized or copied, pages are read lazily on first use, and
+every process that maps the file (GUI, daemon, batch workers) shares one copy
+in the page cache.
+
+Usage:
+    python model_cache.py --convert small     # Build (or refresh) the cache
+    python model_cache.py --report small      # Load time and RSS, checkpoint vs cache
+    python model_cache.py --clear             # Delete cached models
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+
+import numpy as np
+
+FORMAT_VERSION = 1
+ALIGNMENT = 64  # Byte alignment of every tensor in the data section
+_HEADER_SIZE_BYTES = 8
+
+
+def default_cache_dir():
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(cache_home, "whisper-dictation", "models")
+
+
+def _align(offset):
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def expected_checkpoint(model_size):
+    """Where the stock checkpoint is (or will be once downloaded); never downloads or hashes"""
+    if os.path.isfile(model_size):
+        return os.path.abspath(model_size)
+    import whisper
+    if model_size not in whisper._MODELS:
+        raise ValueError(f"Unknown model '{model_size}' (choose from: {', '.join(whisper.available_models())})")
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(cache_home, "whisper", os.path.basename(whisper._MODELS[model_size]))
+
+
+def checkpoint_path(model_size):
+    """Local path of the stock checkpoint, downloaded (and SHA-256 checked) by whisper if needed"""
+    path = expected_checkpoint(model_size)
+    if os.path.isfile(model_size):
+        return path
+    import whisper
+    return whisper._download(whisper._MODELS[model_size], os.path.dirname(path), False)
+
+
+def cache_path(model_size, cache_dir=None):
+    name = os.path.splitext(os.path.basename(model_size))[0]
+    return os.path.join(cache_dir or default_cache_dir(), f"{name}.f32.bin")
+
+
+def _source_info(path):
+    stat = os.stat(path)
+    return {"path": path, "size": stat.st_size, "mtime": int(stat.st_mtime)}
+
+
+def read_header(path):
+    """Return (header dict, data section offset) of a cache file"""
+    with open(path, "rb") as fh:
+        header_size = int.from_bytes(fh.read(_HEADER_SIZE_BYTES), "little")
+        header = json.loads(fh.read(header_size).decode("utf-8"))
+    return header, _align(_HEADER_SIZE_BYTES + header_size)
+
+
+def is_fresh(model_size, cache_dir=None):
+    """True if the cache exists and was built from the current checkpoint.
+
+    Compares the checkpoint's path, size and mtime recorded at conversion
+    with os.stat(), so a fresh cache is used without reading the checkpoint.
+    """
+    path = cache_path(model_size, cache_dir)
+    if not os.path.exists(path):
+        return False
+    try:
+        header, _ = read_header(path)
+    except (OSError, ValueError):
+        return False
+    source = expected_checkpoint(model_size)
+    if not os.path.isfile(source):
+        return False
+    return header.get("format") == FORMAT_VERSION and header.get("source") == _source_info(source)
+
+
+def convert(model_size, cache_dir=None):
+    """Write the cache file for model_size; returns its path"""
+    import torch
+
+    source = checkpoint_path(model_size)
+    checkpoint = torch.load(source, map_location="cpu", weights_only=True)
+    tensors = {}
+    offset = 0
+    arrays = []
+    for name, tensor in checkpoint["model_state_dict"].items():
+        # Store fp32 (the CPU compute dtype) so loads can use the mapping as-is
+        array = tensor.float().numpy() if tensor.is_floating_point() else tensor.numpy()
+        array = np.ascontiguousarray(array)
+        offset = _align(offset)
+        tensors[name] = {"dtype": str(array.dtype), "shape": list(array.shape), "offset": offset}
+        arrays.append((offset, array))
+        offset += array.nbytes
+
+    header = json.dumps({
+        "format": FORMAT_VERSION,
+        "model": model_size,
+        "source": _source_info(source),
+        "dims": checkpoint["dims"],
+        "tensors": tensors,
+    }).encode("utf-8")
+    data_start = _align(_HEADER_SIZE_BYTES + len(header))
+
+    path = cache_path(model_size, cache_dir)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as fh:
+        fh.write(len(header).to_bytes(_HEADER_SIZE_BYTES, "little"))
+        fh.write(header)
+        for array_offset, array in arrays:
+            fh.seek(data_start + array_offset)
+            fh.write(memoryview(array).cast("B"))
+    os.replace(tmp_path, path)  # Readers never see a half-written file
+    return path
+
+
+@contextmanager
+def _skip_weight_init():
+    """Construct layers with uninitialized (untouched, so non-resident) weights.
+
+    The weights are replaced from the mapping straight away; building on the
+    meta device instead would pull in torch._dynamo for its init kernels.
+    """
+    from torch import nn
+    from torch.nn.modules.conv import _ConvNd
+
+    classes = (nn.Linear, nn.Embedding, _ConvNd)
+    originals = [cls.__dict__["reset_parameters"] for cls in classes]
+    for cls in classes:
+        cls.reset_parameters = lambda self: None
+    try:
+        yield
+    finally:
+        for cls, original in zip(classes, originals):
+            cls.reset_parameters = original
+
+
+def load_model(model_size, device=None, cache_dir=None):
+    """Load a Whisper model from the cache, converting the checkpoint first if needed"""
+    import torch
+    import whisper
+    from whisper.model import ModelDimensions, Whisper
+
+    if not is_fresh(model_size, cache_dir):
+        print(f"📦 Converting '{model_size}' checkpoint to the memory-mapped cache (one time)...")
+        convert(model_size, cache_dir)
+
+    path = cache_path(model_size, cache_dir)
+    header, data_start = read_header(path)
+    # Copy-on-write mapping: clean pages stay shared with every other process
+    mapping = np.memmap(path, dtype=np.uint8, mode="c")
+    state = {}
+    for name, info in header["tensors"].items():
+        dtype = np.dtype(info["dtype"])
+        start = data_start + info["offset"]
+        count = int(np.prod(info["shape"], dtype=np.int64))
+        array = mapping[start:start + count * dtype.itemsize].view(dtype).reshape(info["shape"])
+        state[name] = torch.from_numpy(array)
+
+    with _skip_weight_init():
+        model = Whisper(ModelDimensions(**header["dims"]))
+    model.load_state_dict(state, assign=True)
+
+    if model_size in whisper._ALIGNMENT_HEADS:
+        model.set_alignment_heads(whisper._ALIGNMENT_HEADS[model_size])
+    device = device or ("cuda" if torch.cuda.is_available() else "cpu")
+    return model.to(device)
+
+
+def _memory_mb():
+    """(anonymous RSS, file-backed RSS) of this process in MB"""
+    values = {}
+    with open("/proc/self/status") as fh:
+        for line in fh:
+            if line.startswith(("RssAnon:", "RssFile:")):
+                key, value = line.split(":", 1)
+                values[key] = int(value.split()[0]) / 1024
+    return values.get("RssAnon", 0.0), values.get("RssFile", 0.0)
+
+
+def _measure(method, model_size):
+    """Load once with method in this process and print a tab-separated result line"""
+    import torch
+    import whisper  # Imported before timing so only the load itself is measured
+    anon_before, file_before = _memory_mb()
+    start = time.perf_counter()
+    if method == "checkpoint":
+        model = whisper.load_model(model_size, device="cpu")
+    else:
+        model = load_model(model_size, device="cpu")
+    elapsed = time.perf_counter() - start
+    anon, file_backed = _memory_mb()
+    # One forward pass touches every weight, as the first utterance would
+    mel = torch.zeros(1, model.dims.n_mels, 2 * model.dims.n_audio_ctx)
+    tokens = torch.tensor([[whisper.tokenizer.get_tokenizer(model.is_multilingual).sot]])
+    with torch.no_grad():
+        model(mel, tokens)
+    anon_used, file_used = _memory_mb()
+    print(f"{method}\t{elapsed:.3f}\t{anon - anon_before:.1f}\t{file_backed - file_before:.1f}"
+          f"\t{anon_used - anon_before:.1f}\t{file_used - file_before:.1f}")
+
+
+def report(model_size):
+    """Compare load time and memory of the stock checkpoint and the cache"""
+    if not is_fresh(model_size):
+        convert(model_size)
+    print(f"🧪 Model load: '{model_size}' checkpoint vs memory-mapped cache (each in a fresh process)")
+    print(f"{'':<22}{'after load':^24}{'after first forward':^24}")
+    print(f"{'method':<12}{'load (s)':>10}{'private MB':>12}{'shared MB':>12}{'private MB':>12}{'shared MB':>12}")
+    for method in ("checkpoint", "cache"):
+        out = subprocess.run([sys.executable, os.path.abspath(__file__), "--measure", method, model_size],
+                             capture_output=True, text=True, check=True)
+        name, elapsed, *memory = out.stdout.strip().splitlines()[-1].split("\t")
+        print(f"{name:<12}{elapsed:>10}" + "".join(f"{value:>12}" for value in memory))
+    print("💡 Shared RSS is page cache: mapped once, it is counted for every process but stored once")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memory-mapped Whisper model cache")
+    parser.add_argument("--convert", metavar="MODEL", help="Build the cache for a model size")
+    parser.add_argument("--report", metavar="MODEL", help="Compare load time and RSS with the checkpoint")
+    parser.add_argument("--clear", action="store_true", help="Delete all cached models")
+    parser.add_argument("--measure", nargs=2, metavar=("METHOD", "MODEL"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        _measure(*args.measure)
+    elif args.convert:
+        start = time.perf_counter()
+        path = convert(args.convert)
+        print(f"✅ {path} ({os.path.getsize(path) / 1e6:.0f} MB) in {time.perf_counter() - start:.1f}s")
+    elif args.report:
+        report(args.report)
+    elif args.clear:
+        shutil.rmtree(default_cache_dir(), ignore_errors=True)
+        print(f"🗑️  Cleared {default_cache_dir()}")
+    else:
+        parser.print_help()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Parallel long-form decoding for the Whisper Dictation Tool
+Whisper's transcribe() walks a long recording 30 s at a time on one thread.
+ParallelDecoder cuts the audio at pauses into independent chunks that each
+fit one Whisper window, decodes them on a pool of worker processes (each
+with its own model and a share of the cores) and joins the texts back in
+recording order.
+"""
+
+import multiprocessing
+import time
+from collections import Counter
+
+from engines import SAMPLE_RATE, create_engine, physical_cpu_count
+from segment_store import join_texts
+from vad import split_at_silence, trim_silence
+
+SEGMENT_FIELDS = ("start", "end", "text", "avg_logprob", "no_speech_prob")
+
+_worker_engine = None
+
+
+def _init_worker(model_size, engine_name, threads):
+    """Load the model once per worker process"""
+    global _worker_engine
+    import torch
+    torch.set_num_threads(threads)
+    engine = create_engine(engine_name, model_size)
+    if hasattr(engine, "num_threads"):
+        engine.num_threads = threads
+    _worker_engine = engine.load()
+
+
+def _transcribe_chunk(task):
+    """Worker: decode one chunk; silent chunks are skipped so Whisper can't hallucinate on them"""
+    audio, options = task
+    speech, _ = trim_silence(audio, SAMPLE_RATE)
+    if len(speech) == 0:
+        return {"text": "", "language": None, "segments": []}
+    result = _worker_engine.transcribe(audio, **options)
+    return {
+        "text": result["text"].strip(),
+        "language": result.get("language"),
+        "segments": [{k: seg.get(k) for k in SEGMENT_FIELDS} for seg in result.get("segments", [])],
+    }
+
+
+class ParallelDecoder:
+    """Decodes long recordings on a process pool, one pause-delimited chunk per task.
+
+    Chunks are at most chunk_seconds long (28 s leaves room in a 30 s
+    window, so each is a single decode pass) and are cut in the middle of
+    a pause, so no word straddles two chunks and the texts can simply be
+    joined. With the model cache the workers share the mapped fp32 weights,
+    so extra workers cost CPU, not another copy of the model each.
+    """
+
+    def __init__(self, model_size="small", engine="whisper", jobs=None, chunk_seconds=28.0):
+        cores = physical_cpu_count()
+        self.model_size = model_size
+        self.engine = engine
+        self.jobs = max(1, jobs or cores // 2)
+        self.threads = max(1, cores // self.jobs)
+        self.chunk_seconds = chunk_seconds
+        self._pool = None
+
+    def start(self):
+        """Spawn the workers; they load the model in the background. Returns self"""
+        # spawn: each worker imports torch fresh instead of inheriting a forked parent
+        context = multiprocessing.get_context("spawn")
+        self._pool = context.Pool(self.jobs, initializer=_init_worker,
+                                  initargs=(self.model_size, self.engine, self.threads))
+        print(f"🧵 Parallel decoder: {self.jobs} workers × {self.threads} threads "
+              f"(Model: {self.model_size}, engine: {self.engine})")
+        return self
+
+    def transcribe(self, audio, **options):
+        """Transcribe float32 16 kHz audio; returns a result shaped like an engine's"""
+        if self._pool is None:
+            self.start()
+        start = time.perf_counter()
+        chunks = split_at_silence(audio, SAMPLE_RATE, max_seconds=self.chunk_seconds)
+        tasks = [(audio[begin:end], options) for begin, end in chunks]
+        results = self._pool.map(_transcribe_chunk, tasks, chunksize=1)
+        elapsed = time.perf_counter() - start
+
+        segments = []
+        for (begin, _), result in zip(chunks, results):
+            offset = begin / SAMPLE_RATE
+            for seg in result["segments"]:
+                segments.append(dict(seg, start=seg["start"] + offset, end=seg["end"] + offset))
+        languages = Counter(r["language"] for r in results if r["language"])
+        audio_seconds = len(audio) / SAMPLE_RATE
+        return {
+            "text": join_texts(r["text"] for r in results),
+            "language": languages.most_common(1)[0][0] if languages else options.get("language"),
+            "segments": segments,
+            "chunks": len(chunks),
+            "timings": {"transcribe": elapsed},
+            "audio_seconds": audio_seconds,
+            "rtf": elapsed / audio_seconds if audio_seconds else None,
+            "engine": f"{self.engine} ×{self.jobs}",
+        }
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool.join()
+            self._pool = None
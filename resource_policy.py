@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+CPU resource policies for the Whisper Dictation Tool
+By default torch's thread pool uses every core, so a decode competes with
+the Tk loop, the flashing indicator and the capture threads. A policy sets
+torch's intra-/inter-op thread counts, can keep a reserved core free of
+inference (capture and UI threads are pinned to it, every other thread of
+the process to the rest) and can lower inference priority (nice) while a
+recording is active. Affinity and per-thread nice are Linux-only; elsewhere
+only the thread counts apply.
+"""
+
+import os
+import sys
+import threading
+
+POLICIES = {
+    # torch defaults: every core, normal priority (the original behaviour)
+    "default": {
+        "intra_threads": None,
+        "inter_threads": None,
+        "reserve_cores": 0,
+        "recording_nice": 0,
+    },
+    # Inference on all but one core; capture and the Tk loop keep the last one
+    "reserve-core": {
+        "intra_threads": "auto",
+        "inter_threads": 1,
+        "reserve_cores": 1,
+        "recording_nice": 0,
+    },
+    # As reserve-core, and inference yields the CPU while a recording is active
+    "responsive": {
+        "intra_threads": "auto",
+        "inter_threads": 1,
+        "reserve_cores": 1,
+        "recording_nice": 10,
+    },
+}
+
+PER_THREAD = sys.platform.startswith("linux")  # sched_setaffinity/setpriority take thread ids
+
+
+def policy_settings(policy="default", **overrides):
+    """Settings of a named policy, with any non-None overrides applied"""
+    try:
+        settings = dict(POLICIES[policy])
+    except KeyError:
+        raise ValueError(f"Unknown resource policy '{policy}' (choose from: {', '.join(POLICIES)})")
+    settings.update({k: v for k, v in overrides.items() if v is not None})
+    return settings
+
+
+def _thread_ids():
+    try:
+        return {int(tid) for tid in os.listdir("/proc/self/task")}
+    except OSError:
+        return set()
+
+
+class ResourceScheduler:
+    """Applies a resource policy to this process's threads.
+
+    Capture and UI threads call reserve_current_thread() (or are passed to
+    reserve_thread()); every other thread counts as inference. Threads torch starts lazily are picked up by
+    inference_started(), which the decoding thread calls before each decode.
+    Between hold_new_threads() and release_new_threads() threads started in
+    the meantime are left alone, so a capture thread that only reserves
+    itself once it runs (a PortAudio callback) is never niced first.
+    recording_started()/recording_stopped() raise and restore the nice value
+    of the inference threads; restoring needs CAP_SYS_NICE (or RLIMIT_NICE)
+    for an unprivileged user, so if it is refused inference simply stays
+    niced from then on.
+    """
+
+    def __init__(self, policy="default", cpus=None, **overrides):
+        self.policy = policy
+        self.settings = policy_settings(policy, **overrides)
+        if cpus is None:
+            try:
+                cpus = os.sched_getaffinity(0)
+            except AttributeError:
+                cpus = range(os.cpu_count() or 1)
+        cpus = sorted(cpus)
+        reserve = self.settings["reserve_cores"]
+        if PER_THREAD and reserve and len(cpus) > reserve:
+            self.reserved_cpus = set(cpus[-reserve:])
+            self.inference_cpus = set(cpus[:-reserve])
+        else:
+            self.reserved_cpus = None  # No pinning (not requested, unsupported, or too few cores)
+            self.inference_cpus = set(cpus)
+        self.recording_nice = self.settings["recording_nice"] if PER_THREAD else 0
+        self.base_nice = os.getpriority(os.PRIO_PROCESS, 0) if PER_THREAD else 0
+        self.recording = False
+        self.niced = set()  # Inference threads currently at the recording nice value
+        self.stay_niced = False
+        self._reserved = set()
+        self._held = None  # Thread ids existing at hold_new_threads(); newer ones are skipped
+        self._lock = threading.Lock()
+
+    def describe(self):
+        parts = [f"policy {self.policy}"]
+        threads = self.settings["intra_threads"]
+        if threads is not None:
+            parts.append(f"{self.intra_threads} torch threads")
+        if self.reserved_cpus:
+            parts.append(f"inference on CPUs {_cpu_list(self.inference_cpus)}, "
+                         f"capture/UI on {_cpu_list(self.reserved_cpus)}")
+        elif self.settings["reserve_cores"]:
+            parts.append("no reserved core (too few CPUs or not Linux)")
+        if self.recording_nice:
+            parts.append(f"nice +{self.recording_nice} while recording")
+        return ", ".join(parts)
+
+    @property
+    def intra_threads(self):
+        threads = self.settings["intra_threads"]
+        return len(self.inference_cpus) if threads == "auto" else threads
+
+    def configure_torch(self):
+        """Set torch's thread pools (call before the first decode)"""
+        import torch
+
+        if self.intra_threads is not None:
+            torch.set_num_threads(max(1, self.intra_threads))
+        if self.settings["inter_threads"] is not None:
+            try:
+                torch.set_num_interop_threads(self.settings["inter_threads"])
+            except RuntimeError:
+                pass  # Only settable before any inter-op work has run
+        return self
+
+    def reserve_current_thread(self):
+        """Mark the calling thread as capture/UI: it keeps the reserved core and normal priority"""
+        self.reserve_thread(threading.get_native_id())
+
+    def reserve_thread(self, tid):
+        """reserve_current_thread() for another thread, by native id (e.g. a library's listener thread)"""
+        with self._lock:
+            self._reserved.add(tid)
+            if tid in self.niced:
+                if self._set_nice(tid, self.base_nice):
+                    self.niced.discard(tid)
+                else:
+                    print(f"⚠️  Not allowed to restore the priority of reserved thread {tid}; "
+                          f"it stays at nice +{self.recording_nice}")
+        if self.reserved_cpus:
+            self._set_affinity(tid, self.reserved_cpus)
+
+    def inference_started(self):
+        """Pin (and, while recording, nice) every non-reserved thread, including new torch workers"""
+        if not PER_THREAD or not (self.reserved_cpus or self.recording_nice):
+            return
+        with self._lock:
+            tids = _thread_ids() - self._reserved
+            if self._held is not None:
+                tids &= self._held
+            for tid in tids:
+                if self.reserved_cpus:
+                    self._set_affinity(tid, self.inference_cpus)
+                if (self.recording or self.stay_niced) and tid not in self.niced:
+                    self._nice(tid)
+
+    def hold_new_threads(self):
+        """Leave threads started from now on alone until release_new_threads() (they aren't classified yet)"""
+        with self._lock:
+            if self._held is None:
+                self._held = _thread_ids()
+
+    def release_new_threads(self):
+        """Treat threads not reserved by now as inference again"""
+        with self._lock:
+            self._held = None
+
+    def recording_started(self):
+        self.recording = True
+        if self.recording_nice:
+            self.inference_started()
+
+    def recording_stopped(self):
+        self.recording = False
+        self.release_new_threads()
+        if not self.recording_nice or self.stay_niced:
+            return
+        with self._lock:
+            for tid in list(self.niced):
+                if not self._set_nice(tid, self.base_nice):
+                    print(f"⚠️  Not allowed to restore inference priority; it stays at nice +{self.recording_nice}")
+                    self.stay_niced = True
+                    return
+            self.niced.clear()
+
+    def _nice(self, tid):
+        if self._set_nice(tid, self.base_nice + self.recording_nice):
+            self.niced.add(tid)
+
+    @staticmethod
+    def _set_nice(tid, value):
+        """False only if the change was refused; a thread that has exited counts as done"""
+        try:
+            os.setpriority(os.PRIO_PROCESS, tid, min(value, 19))
+        except PermissionError:
+            return False
+        except OSError:
+            pass
+        return True
+
+    @staticmethod
+    def _set_affinity(tid, cpus):
+        try:
+            os.sched_setaffinity(tid, cpus)
+        except OSError:
+            pass  # Thread has exited
+
+
+def _cpu_list(cpus):
+    return ",".join(str(cpu) for cpu in sorted(cpus))
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Long-session recording for the Whisper Dictation Tool
+Keeps memory flat during hour-long dictation: audio is cut at pauses into
+bounded segments, each segment is written to disk as raw int16 PCM and
+released, and segments are decoded in the background while recording
+continues. A JSON manifest records every segment and its text as soon as it
+is known, so an interrupted session can be resumed after a crash.
+"""
+
+import json
+import os
+import queue
+import shutil
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+
+from audio_buffer import CaptureBuffer
+from vad import silence_boundary, trim_silence
+
+
+def default_sessions_dir():
+    state_dir = os.environ.get("XDG_STATE_HOME") or os.path.expanduser("~/.local/state")
+    return os.path.join(state_dir, "whisper-dictation", "sessions")
+
+
+def join_texts(texts):
+    """Join segment transcripts: a space between Latin-script ends, nothing between CJK"""
+    joined = ""
+    for text in texts:
+        if not text:
+            continue
+        if joined and joined[-1].isascii() and text[0].isascii():
+            joined += " "
+        joined += text
+    return joined
+
+
+class SegmentStore:
+    """On-disk PCM segments of one session plus their manifest"""
+
+    MANIFEST = "manifest.json"
+
+    def __init__(self, directory):
+        self.directory = directory
+        self._lock = threading.Lock()
+        with open(os.path.join(directory, self.MANIFEST), encoding="utf-8") as fh:
+            self.manifest = json.load(fh)
+
+    @classmethod
+    def create(cls, rate=16000, root=None):
+        """Start a new, empty session directory"""
+        directory = os.path.join(root or default_sessions_dir(), datetime.now().strftime("%Y%m%d_%H%M%S_%f"))
+        os.makedirs(directory)
+        manifest = {"rate": rate, "created": time.time(), "complete": False, "segments": []}
+        with open(os.path.join(directory, cls.MANIFEST), "w", encoding="utf-8") as fh:
+            json.dump(manifest, fh)
+        return cls(directory)
+
+    @classmethod
+    def incomplete(cls, root=None):
+        """Sessions that were never finished (e.g. the app crashed while recording)"""
+        root = root or default_sessions_dir()
+        stores = []
+        for name in sorted(os.listdir(root)) if os.path.isdir(root) else []:
+            try:
+                store = cls(os.path.join(root, name))
+            except (OSError, ValueError):
+                continue
+            if not store.manifest["complete"]:
+                stores.append(store)
+        return stores
+
+    @property
+    def rate(self):
+        return self.manifest["rate"]
+
+    @property
+    def seconds(self):
+        return sum(seg["samples"] for seg in self.manifest["segments"]) / self.rate
+
+    def _write_manifest(self):
+        path = os.path.join(self.directory, self.MANIFEST)
+        with open(path + ".tmp", "w", encoding="utf-8") as fh:
+            json.dump(self.manifest, fh, ensure_ascii=False)
+        os.replace(path + ".tmp", path)  # Never leave a half-written manifest
+
+    def add(self, samples):
+        """Write int16 samples as the next segment; returns its index"""
+        with self._lock:
+            index = len(self.manifest["segments"])
+            name = f"{index:05d}.pcm"
+            samples.tofile(os.path.join(self.directory, name))
+            self.manifest["segments"].append({"file": name, "samples": len(samples), "text": None})
+            self._write_manifest()
+        return index
+
+    def load(self, index):
+        """Read a segment back as int16 samples"""
+        name = self.manifest["segments"][index]["file"]
+        return np.fromfile(os.path.join(self.directory, name), dtype=np.int16)
+
+    def set_text(self, index, text):
+        with self._lock:
+            self.manifest["segments"][index]["text"] = text
+            self._write_manifest()
+
+    def pending(self):
+        """Indices of segments that have not been transcribed yet"""
+        return [i for i, seg in enumerate(self.manifest["segments"]) if seg["text"] is None]
+
+    def text(self):
+        return join_texts(seg["text"] for seg in self.manifest["segments"])
+
+    def complete(self, keep_audio=False):
+        """Mark the session finished and write transcript.txt; deletes the audio unless keep_audio"""
+        with self._lock:
+            with open(os.path.join(self.directory, "transcript.txt"), "w", encoding="utf-8") as fh:
+                fh.write(self.text() + "\n")
+            self.manifest["complete"] = True
+            self._write_manifest()
+            if not keep_audio:
+                for seg in self.manifest["segments"]:
+                    try:
+                        os.unlink(os.path.join(self.directory, seg["file"]))
+                    except OSError:
+                        pass
+
+    def discard(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+class LongSession:
+    """Records an arbitrarily long dictation in bounded memory.
+
+    Audio accumulates in a fixed arena. Whenever it reaches segment_seconds
+    it is cut at the longest pause within the last search_seconds, written
+    to the store and released, and decoded on a background thread.
+    finish() decodes the remainder and returns the transcript in order.
+    Same start/feed/finish/cancel calls as StreamingTranscriber.
+    """
+
+    def __init__(self, transcribe_fn, store, rate=16000, segment_seconds=28.0, search_seconds=8.0,
+                 postprocess=None, keep_audio=False):
+        self.transcribe_fn = transcribe_fn
+        self.store = store
+        self.rate = rate
+        self.segment_seconds = segment_seconds
+        self.search_seconds = search_seconds
+        self.postprocess = postprocess
+        self.keep_audio = keep_audio
+        self.buffer = CaptureBuffer(rate=rate, initial_seconds=segment_seconds + 1.0)
+        self._jobs = queue.Queue()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._decode_loop, daemon=True)
+        self._thread.start()
+
+    def feed(self, data):
+        """Append captured PCM; spills a segment once the arena holds segment_seconds"""
+        self.buffer.append(data)
+        if self.buffer.seconds >= self.segment_seconds:
+            self._spill()
+
+    def _spill(self, final=False):
+        samples = self.buffer.view()
+        if final:
+            cut = len(samples)
+        else:
+            search_start = max(0, len(samples) - int(self.search_seconds * self.rate))
+            window = samples[search_start:].astype(np.float32) / 32768.0
+            cut = search_start + silence_boundary(window, self.rate)
+        index = self.store.add(samples[:cut])
+        self.buffer.discard(cut)
+        self._jobs.put(index)
+
+    def _decode_loop(self):
+        while True:
+            index = self._jobs.get()
+            if index is None:
+                return
+            try:
+                self._decode(index)
+            except Exception as e:
+                # Left pending in the manifest; finish() or a resume retries it
+                print(f"⚠️  Long session segment {index} failed: {e}")
+
+    def _decode(self, index):
+        audio = self.store.load(index).astype(np.float32) / 32768.0
+        speech, _ = trim_silence(audio, self.rate)
+        text = self.transcribe_fn(speech)["text"].strip() if len(speech) else ""
+        if text and self.postprocess:
+            text = self.postprocess(text)
+        self.store.set_text(index, text)
+
+    def finish(self):
+        """Decode everything that's left and return the full transcript"""
+        if len(self.buffer):
+            self._spill(final=True)
+        if self._thread:
+            self._jobs.put(None)
+            self._thread.join()
+        for index in self.store.pending():
+            self._decode(index)
+        self.store.complete(keep_audio=self.keep_audio)
+        return self.store.text()
+
+    def cancel(self):
+        if self._thread:
+            self._jobs.put(None)
+        self.store.discard()
+
+    @property
+    def seconds(self):
+        """Recorded duration so far"""
+        return self.store.seconds + self.buffer.seconds
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Short-clip fast path for the Whisper Dictation Tool
+Whisper pads every input to a 30 s mel window, so the encoder does the same
+work for two words as for a paragraph. Here a short clip's mel is cut to the
+smallest of a few bucket lengths that holds it, the encoder runs on that
+with a correspondingly sliced positional embedding, and the decoder attends
+to the shorter audio features. If the decode looks unreliable the caller
+falls back to the standard 30 s transcribe(). Unless without_timestamps is
+set, the decode keeps timestamp tokens and the result is split into
+segments the way transcribe() splits a window.
+"""
+
+import types
+
+# whisper.audio constants (whisper itself is imported lazily)
+SAMPLE_RATE = 16000
+HOP_LENGTH = 160
+N_SAMPLES = 30 * SAMPLE_RATE
+FRAMES_PER_SECOND = SAMPLE_RATE // HOP_LENGTH
+TIME_PRECISION = 2 * HOP_LENGTH / SAMPLE_RATE  # Seconds per timestamp token (conv2 stride 2)
+
+DEFAULT_BUCKETS = (5.0, 10.0, 15.0, 20.0)  # Seconds; few shapes, so allocator/kernel caches stay warm
+TAIL_SECONDS = 0.5  # Silence kept after the speech inside the bucket
+COMPRESSION_RATIO_THRESHOLD = 2.4  # Same thresholds transcribe() uses for its fallback
+LOGPROB_THRESHOLD = -1.0
+
+
+def _variable_length_forward(self, x):
+    """AudioEncoder.forward for mel inputs of up to 3000 frames"""
+    import torch.nn.functional as F
+
+    x = F.gelu(self.conv1(x))
+    x = F.gelu(self.conv2(x))
+    x = x.permute(0, 2, 1)
+
+    n_ctx = x.shape[1]
+    assert n_ctx <= self.positional_embedding.shape[0], "audio longer than 30 s"
+    x = (x + self.positional_embedding[:n_ctx]).to(x.dtype)
+
+    for block in self.blocks:
+        x = block(x)
+
+    x = self.ln_post(x)
+    return x
+
+
+def enable_variable_length(model):
+    """Let model.encoder take mels shorter than 30 s (30 s input behaves exactly as before)"""
+    encoder = model.encoder
+    if getattr(encoder, "variable_length", False):
+        return model
+    encoder.forward = types.MethodType(_variable_length_forward, encoder)
+    encoder.variable_length = True
+    return model
+
+
+def bucket_frames(num_samples, buckets=DEFAULT_BUCKETS):
+    """Mel frames of the smallest bucket holding the clip plus its tail, or None if none does"""
+    needed = num_samples / SAMPLE_RATE + TAIL_SECONDS
+    for seconds in sorted(buckets):
+        if needed <= seconds:
+            return min(int(seconds * FRAMES_PER_SECOND) // 2 * 2, 3000)  # conv2 has stride 2
+    return None
+
+
+def _decoding_options(options, fp16):
+    """DecodingOptions equivalent to transcribe() options, for its first (lowest) temperature"""
+    import whisper
+
+    temperature = options.get("temperature", 0.0)
+    if isinstance(temperature, (list, tuple)):
+        temperature = temperature[0]
+    sampling = {"beam_size": options.get("beam_size"), "patience": options.get("patience")}
+    if temperature > 0:
+        sampling = {"best_of": options.get("best_of")}
+    return whisper.DecodingOptions(
+        task=options.get("task", "transcribe"),
+        language=options.get("language"),
+        temperature=temperature,
+        length_penalty=options.get("length_penalty"),
+        prompt=options.get("initial_prompt"),
+        suppress_tokens=options.get("suppress_tokens", "-1"),
+        without_timestamps=options.get("without_timestamps", False),
+        fp16=fp16,
+        **sampling,
+    )
+
+
+def split_segments(tokens, timestamp_begin, duration):
+    """(start, end, tokens) per segment of one decoded window, as transcribe() splits it.
+
+    Tokens between two consecutive timestamp tokens form a segment; trailing
+    text after the last pair without a closing timestamp (which transcribe()
+    would decode again from the next window) becomes a last segment running
+    to the end of the clip.
+    """
+    def seconds(token):
+        return min((token - timestamp_begin) * TIME_PRECISION, duration)
+
+    is_timestamp = [token >= timestamp_begin for token in tokens]
+    consecutive = [i + 1 for i in range(len(tokens) - 1) if is_timestamp[i] and is_timestamp[i + 1]]
+    if not consecutive:
+        timestamps = [token for token in tokens if token >= timestamp_begin]
+        end = seconds(timestamps[-1]) if timestamps and timestamps[-1] != timestamp_begin else duration
+        return [(0.0, end, tokens)]
+
+    if is_timestamp[-2:] == [False, True]:
+        consecutive.append(len(tokens))  # A single timestamp at the end closes the last segment
+    segments = []
+    last = 0
+    for current in consecutive:
+        sliced = tokens[last:current]
+        segments.append((seconds(sliced[0]), seconds(sliced[-1]), sliced))
+        last = current
+    rest = tokens[last:]
+    if any(not stamp for stamp in is_timestamp[last:]):
+        segments.append((segments[-1][1], duration, rest))
+    return segments
+
+
+def transcribe_short(model, audio, buckets=DEFAULT_BUCKETS, mel=None, **options):
+    """Decode a short clip on a truncated encoder window.
+
+    Returns a transcribe()-shaped result, or None when the clip doesn't fit
+    a bucket or the decode fails the quality checks (the caller should then
+    run the standard transcribe()). mel is an optional precomputed
+    log_mel_spectrogram(audio, padding=N_SAMPLES).
+    """
+    import torch
+    import whisper
+    from whisper.audio import log_mel_spectrogram
+
+    frames = bucket_frames(len(audio), buckets)
+    if frames is None:
+        return None
+    enable_variable_length(model)
+    if mel is None:
+        # Same normalization as transcribe(): the global max includes the 30 s padding
+        mel = log_mel_spectrogram(audio, model.dims.n_mels, padding=N_SAMPLES)
+    fp16 = options.get("fp16", True) and model.device.type != "cpu"
+    segment = mel[:, :frames].to(model.device).to(torch.float16 if fp16 else torch.float32)
+
+    if options.get("language") is None:
+        # decode() would re-encode truncated features for detection; detect first, as transcribe() does
+        _, probs = model.detect_language(segment)
+        options = dict(options, language=max(probs, key=probs.get))
+    result = whisper.decode(model, segment, _decoding_options(options, fp16))
+    if (result.compression_ratio > COMPRESSION_RATIO_THRESHOLD
+            or result.avg_logprob < LOGPROB_THRESHOLD):
+        return None
+
+    tokenizer = whisper.tokenizer.get_tokenizer(model.is_multilingual, num_languages=model.num_languages,
+                                                language=result.language, task=options.get("task", "transcribe"))
+    pieces = split_segments(result.tokens, tokenizer.timestamp_begin, len(audio) / SAMPLE_RATE)
+    return {
+        "text": result.text,
+        "segments": [{
+            "id": i, "seek": 0, "start": start, "end": end, "text": tokenizer.decode(tokens),
+            "tokens": tokens, "temperature": result.temperature,
+            "avg_logprob": result.avg_logprob, "compression_ratio": result.compression_ratio,
+            "no_speech_prob": result.no_speech_prob,
+        } for i, (start, end, tokens) in enumerate(pieces)],
+        "language": result.language,
+        "encoder_frames": frames,
+    }
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Single-instance lock and command channel for the Whisper Dictation Tool
+The running GUI holds an flock on a per-user lock file and listens on a
+per-user Unix socket (abstract namespace on Linux, so there is no file to go
+stale). Abstract sockets have no file permissions, so connections from other
+users are refused by their SO_PEERCRED uid. A second launch fails to take the lock and forwards its command
+(toggle recording, show the window, transcribe a file) to the running
+instance instead of starting another GUI.
+
+Protocol (one request per connection): one JSON line each way,
+    {"cmd": "toggle"|"show"|"ping"|"transcribe", ...} -> {"ok": true, ...}
+"""
+
+import fcntl
+import json
+import os
+import socket
+import struct
+import sys
+import threading
+
+
+def _runtime_dir():
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir and os.path.isdir(runtime_dir):
+        return runtime_dir
+    return "/tmp"
+
+
+def default_lock_path(name="whisper-dictation"):
+    return os.path.join(_runtime_dir(), f"{name}-{os.getuid()}.lock")
+
+
+def default_address(name="whisper-dictation"):
+    """Abstract socket name on Linux, a socket file elsewhere"""
+    if sys.platform.startswith("linux"):
+        return f"\0{name}-{os.getuid()}"
+    return os.path.join(_runtime_dir(), f"{name}-{os.getuid()}.cmd.sock")
+
+
+class SingleInstance:
+    """Per-user lock plus a command listener for the instance that holds it"""
+
+    def __init__(self, name="whisper-dictation"):
+        self.lock_path = default_lock_path(name)
+        self.address = default_address(name)
+        self._lock_file = None
+        self._server = None
+        self._on_thread_start = None
+
+    def acquire(self):
+        """Take the lock without blocking; returns False if another instance holds it"""
+        lock_file = open(self.lock_path, "a+")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        lock_file.seek(0)
+        lock_file.truncate()
+        lock_file.write(f"{os.getpid()}\n")
+        lock_file.flush()
+        self._lock_file = lock_file  # The kernel drops the lock when this process exits
+        return True
+
+    def serve(self, handler, on_thread_start=None):
+        """Answer commands on a daemon thread; handler(request) returns the response dict.
+
+        on_thread_start, if given, is called first on the accept thread and
+        on every connection's thread.
+        """
+        if not self.address.startswith("\0") and os.path.exists(self.address):
+            os.unlink(self.address)  # We hold the lock, so this is stale
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        old_umask = os.umask(0o177)  # A socket file is created 0600, with no window before a chmod
+        try:
+            server.bind(self.address)
+        finally:
+            os.umask(old_umask)
+        server.listen(4)
+        self._server = server
+        self._on_thread_start = on_thread_start
+        threading.Thread(target=self._accept_loop, args=(server, handler), daemon=True).start()
+
+    def _accept_loop(self, server, handler):
+        if self._on_thread_start:
+            self._on_thread_start()
+        while True:
+            try:
+                conn, _ = server.accept()
+            except OSError:
+                return  # Closed by release()
+            threading.Thread(target=self._handle, args=(conn, handler), daemon=True).start()
+
+    def _handle(self, conn, handler):
+        if self._on_thread_start:
+            self._on_thread_start()
+        with conn, conn.makefile("rwb") as sock_file:
+            try:
+                uid = peer_uid(conn)
+            except OSError:
+                return
+            if uid is not None and uid != os.getuid():
+                return  # Another user's process: close without answering
+            try:
+                request = json.loads(sock_file.readline().decode("utf-8"))
+                response = handler(request)
+            except Exception as e:
+                response = {"ok": False, "error": str(e)}
+            try:
+                sock_file.write(json.dumps(response, ensure_ascii=False).encode("utf-8") + b"\n")
+                sock_file.flush()
+            except OSError:
+                pass
+
+    def release(self):
+        if self._server:
+            try:
+                self._server.shutdown(socket.SHUT_RDWR)  # Wakes the blocked accept()
+            except OSError:
+                pass
+            self._server.close()
+            if not self.address.startswith("\0"):
+                try:
+                    os.unlink(self.address)
+                except OSError:
+                    pass
+            self._server = None
+        if self._lock_file:
+            self._lock_file.close()
+            self._lock_file = None
+
+
+def peer_uid(conn):
+    """uid of the process on the other end of a Unix socket, or None where SO_PEERCRED is unavailable"""
+    if not hasattr(socket, "SO_PEERCRED"):
+        return None
+    creds = conn.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize("3i"))
+    _, uid, _ = struct.unpack("3i", creds)
+    return uid
+
+
+def send_command(cmd, name="whisper-dictation", timeout=2.0, **fields):
+    """Send a command to the running instance; returns its response, or None if unreachable"""
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(default_address(name))
+            with sock.makefile("rwb") as sock_file:
+                sock_file.write(json.dumps({"cmd": cmd, **fields}).encode("utf-8") + b"\n")
+                sock_file.flush()
+                line = sock_file.readline()
+    except OSError:
+        return None
+    if not line:
+        return None
+    return json.loads(line.decode("utf-8"))
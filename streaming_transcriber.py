@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Streaming transcription for the Whisper Dictation Tool
+Decodes committed windows in the background while the user is still speaking,
+so only the uncommitted tail is left to transcribe when recording stops.
+"""
+
+import threading
+
+from audio_buffer import CaptureBuffer
+
+
+class StreamingTranscriber:
+    """Incrementally transcribe a recording with sliding windows.
+
+    Audio is fed in as int16 PCM chunks. Once enough uncommitted audio has
+    accumulated, a background thread transcribes a window of it. Segments that
+    end before the overlap region at the end of the window are treated as a
+    stable prefix: their text is committed and the window start advances to
+    the end of the last committed segment. Everything else is re-decoded in
+    the next window (or as the tail in finish()).
+    """
+
+    def __init__(self, transcribe_fn, rate=16000, window_seconds=8.0,
+                 overlap_seconds=2.0, max_window_seconds=25.0, poll_interval=0.25):
+        self.transcribe_fn = transcribe_fn
+        self.rate = rate
+        self.window_samples = int(window_seconds * rate)
+        self.overlap_seconds = overlap_seconds
+        self.max_window_samples = int(max_window_seconds * rate)
+        self.poll_interval = poll_interval
+
+        self._buffer = CaptureBuffer(rate=rate)
+        self._committed_samples = 0
+        self._committed_text = ""
+        self._stop_event = threading.Event()
+        self._thread = None
+        self.windows_decoded = 0
+
+    def start(self):
+        """Start the background decoder"""
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def feed(self, data):
+        """Append a chunk of int16 PCM, bytes or samples (called from the capture thread)"""
+        self._buffer.append(data)
+
+    def finish(self):
+        """Stop the background decoder and return the full transcript"""
+        self._stop()
+        tail = self._buffer.as_float32(self._committed_samples)
+        text = self._committed_text
+        if len(tail) > 0:
+            result = self.transcribe_fn(tail)
+            text += result["text"]
+        return text.strip()
+
+    def cancel(self):
+        """Stop the background decoder and discard any pending work"""
+        self._stop()
+
+    @property
+    def committed_seconds(self):
+        """Seconds of audio whose text is already committed"""
+        return self._committed_samples / self.rate
+
+    def _stop(self):
+        self._stop_event.set()
+        if self._thread and self._thread.is_alive():
+            self._thread.join()
+
+    def _run(self):
+        while not self._stop_event.wait(self.poll_interval):
+            pending = len(self._buffer) - self._committed_samples
+            if pending < self.window_samples:
+                continue
+            try:
+                self._decode_window()
+            except Exception as e:
+                print(f"⚠️  Streaming decode failed: {e}")
+                return
+
+    def _decode_window(self):
+        """Transcribe one window and commit its stable prefix"""
+        start = self._committed_samples
+        window = self._buffer.as_float32(start, start + self.max_window_samples)
+        window_seconds = len(window) / self.rate
+
+        result = self.transcribe_fn(window)
+        self.windows_decoded += 1
+        segments = result.get("segments")
+        if segments is None:
+            # No timestamps: the text can't be split, so it counts as one segment
+            # spanning the whole window
+            segments = [{"end": window_seconds, "text": result["text"]}] if result["text"].strip() else []
+
+        # Segments ending inside the overlap region may be cut mid-word
+        stable_until = window_seconds - self.overlap_seconds
+        committed = [seg for seg in segments if seg["end"] <= stable_until]
+
+        if not segments:
+            # Nothing but silence: skip it, keeping the overlap for context
+            skip = len(window) - int(self.overlap_seconds * self.rate)
+            self._committed_samples = start + max(0, skip)
+            return
+
+        # A window that never produces a stable segment would grow without
+        # bound; once it hits the maximum, commit everything but the last one
+        if not committed and len(window) >= self.max_window_samples:
+            committed = segments[:-1] or segments
+
+        if not committed:
+            return
+
+        self._committed_text += "".join(seg["text"] for seg in committed)
+        end_sample = int(committed[-1]["end"] * self.rate)
+        self._committed_samples = start + min(end_sample, len(window))
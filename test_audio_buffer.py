@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Test script for the capture buffer
+Checks that the growable arena keeps every sample in order across
+reallocations, and that ring mode keeps only the newest samples when it
+wraps around.
+"""
+
+import numpy as np
+
+from audio_buffer import CaptureBuffer
+
+
+def test_growable_buffer_grows_and_keeps_order():
+    buffer = CaptureBuffer(rate=100, initial_seconds=1.0)  # 100-sample arena
+    assert buffer.capacity == 100
+    expected = np.arange(1000, dtype=np.int16)
+    for start in range(0, len(expected), 64):
+        buffer.append(expected[start:start + 64])
+    assert len(buffer) == 1000
+    assert buffer.capacity >= 1000
+    assert buffer.seconds == 10.0
+    assert np.array_equal(buffer.view(), expected)
+    assert np.array_equal(buffer.tail(10), expected[-10:])
+
+
+def test_append_accepts_bytes():
+    buffer = CaptureBuffer(rate=100, initial_seconds=1.0)
+    samples = np.array([1, -2, 32767, -32768], dtype=np.int16)
+    buffer.append(samples.tobytes())
+    assert np.array_equal(buffer.view(), samples)
+    assert bytes(buffer.as_bytes()) == samples.tobytes()
+    assert np.allclose(buffer.as_float32(), samples / 32768.0)
+
+
+def test_discard_and_clear_keep_the_arena():
+    buffer = CaptureBuffer(rate=100, initial_seconds=1.0)
+    buffer.append(np.arange(80, dtype=np.int16))
+    buffer.discard(30)
+    assert np.array_equal(buffer.view(), np.arange(30, 80, dtype=np.int16))
+    capacity = buffer.capacity
+    buffer.clear()
+    assert len(buffer) == 0
+    assert buffer.capacity == capacity
+
+
+def test_ring_wraps_around():
+    ring = CaptureBuffer(rate=100, ring_seconds=1.0)  # 100 samples
+    samples = np.arange(250, dtype=np.int16)
+    for start in range(0, len(samples), 30):
+        ring.append(samples[start:start + 30])
+        end = min(start + 30, len(samples))
+        assert np.array_equal(ring.view(), samples[max(0, end - 100):end])
+    assert len(ring) == ring.capacity == 100
+    assert np.array_equal(ring.tail(20), samples[-20:])
+
+
+def test_ring_block_larger_than_capacity():
+    ring = CaptureBuffer(rate=100, ring_seconds=1.0)
+    ring.append(np.arange(10, dtype=np.int16))
+    ring.append(np.arange(1000, 1300, dtype=np.int16))
+    assert np.array_equal(ring.view(), np.arange(1200, 1300, dtype=np.int16))
+    ring.append(np.arange(5, dtype=np.int16))
+    assert np.array_equal(ring.view(), np.concatenate((np.arange(1205, 1300), np.arange(5))).astype(np.int16))
+
+
+def main():
+    print("🧪 Testing the capture buffer")
+    print("=" * 60)
+    for test in (test_growable_buffer_grows_and_keeps_order, test_append_accepts_bytes,
+                 test_discard_and_clear_keep_the_arena, test_ring_wraps_around,
+                 test_ring_block_larger_than_capacity):
+        test()
+        print(f"✅ {test.__name__}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Test script for the capture resampler
+Checks that PolyphaseResampler gives the same samples fed in blocks as
+resampling the whole recording, and that AudioCapture.stop() returns the
+filter tail so no samples are lost at the end of a recording.
+"""
+
+import numpy as np
+
+from audio_capture import AudioCapture, PolyphaseResampler, StubAudio, resample
+
+
+def _clip(seconds, rate, seed=0):
+    """int16 tone plus noise at the device rate"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * rate)) / rate
+    audio = 0.3 * np.sin(2 * np.pi * 440 * t) + rng.normal(0, 0.05, len(t))
+    return (audio * 32767).astype(np.int16)
+
+
+def test_streaming_matches_whole_array():
+    for rate in (48000, 44100, 22050, 8000):
+        samples = _clip(1.3, rate)
+        whole = resample(samples, rate)
+        assert len(whole) == -(-len(samples) * 16000 // rate)
+        for block in (1, 160, 1024, 4801):
+            resampler = PolyphaseResampler(rate)
+            parts = [resampler.process(samples[i:i + block]) for i in range(0, len(samples), block)]
+            streamed = np.concatenate(parts + [resampler.flush()])
+            assert np.array_equal(streamed, whole), (rate, block)
+
+
+def test_flush_starts_a_new_stream():
+    samples = _clip(0.5, 44100)
+    resampler = PolyphaseResampler(44100)
+    first = np.concatenate((resampler.process(samples), resampler.flush()))
+    second = np.concatenate((resampler.process(samples), resampler.flush()))
+    assert np.array_equal(first, second)
+    assert len(resampler.flush()) == 0
+
+
+def test_stop_returns_the_resampler_tail():
+    samples = _clip(1.0, 48000)
+    device = StubAudio(48000)
+    device.next_samples = samples
+    capture = AudioCapture(device, None)
+    capture.start()
+    device.stream.finished.wait(5.0)
+    captured = np.concatenate((capture.read(timeout=1.0), capture.stop()))
+    assert capture.device_rate == 48000
+    assert np.array_equal(captured, resample(samples, 48000))
+
+
+def main():
+    print("🧪 Testing the capture resampler")
+    print("=" * 60)
+    for test in (test_streaming_matches_whole_array, test_flush_starts_a_new_stream,
+                 test_stop_returns_the_resampler_tail):
+        test()
+        print(f"✅ {test.__name__}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,48 +1,55 @@
 #!/usr/bin/env python3
 """
 Test script for Chinese character conversion
+Checks chinese_converter against expected output: the character table,
+phrase overrides (longest match first) and text the table doesn't cover.
+Throughput is measured by benchmarks/bench_conversion.py.
 """
 
-class TestChineseConverter:
-    def __init__(self):
-        # Chinese conversion dictionary (same as in dictation_integrated_gui.py)
-        self._chinese_map = {
-            '現': '现', '說': '说', '聽': '听', '嗎': '吗', '學': '学', '記': '记',
-            '這': '这', '個': '个', '裡': '里', '邊': '边', '為': '为', '麼': '么',
-            '會': '会', '來': '来', '從': '从', '對': '对', '錯': '错',
-            '時': '时', '間': '间', '鐘': '钟', '請': '请', '謝': '谢',
-            '話': '话', '試': '试', '檢': '检', '體': '体', '還': '还'
-        }
-    
-    def convert_to_simplified(self, text):
-        """Convert traditional Chinese characters to simplified"""
-        converted_text = text
-        for traditional, simplified in self._chinese_map.items():
-            converted_text = converted_text.replace(traditional, simplified)
-        return converted_text
+from chinese_converter import ChineseConverter, get_converter
+
+
+def test_traditional_characters_are_simplified():
+    converter = get_converter()
+    assert converter.convert("你好，這是繁體中文。") == "你好，这是繁体中文。"
+    assert (converter.convert("繁體字：現說聽嗎學記這個裡邊為麼會來從對錯時間鐘請謝")
+            == "繁体字：现说听吗学记这个里边为么会来从对错时间钟请谢")
+
+
+def test_simplified_and_unmapped_text_is_unchanged():
+    converter = get_converter()
+    for text in ("简体字：现说听吗学记这个里边为么会来从对错时间钟请谢",
+                 "Hello, this is English text.",
+                 "表情 😀 and 𠀀 outside the BMP",
+                 ""):
+        assert converter.convert(text) == text
+    # 語 and 測 aren't in the table: they pass through while 試 is converted
+    assert converter.convert("混合語言測試：Hello 世界！") == "混合語言測试：Hello 世界！"
+
+
+def test_phrase_overrides_win_over_characters():
+    converter = get_converter()
+    assert converter.convert("乾隆皇帝覺得衣服還沒乾") == "乾隆皇帝觉得衣服还没干"
+    assert converter.convert("乾坤") == "乾坤"
+    assert converter.convert("乾") == "干"
+
+
+def test_longest_phrase_matches_first():
+    converter = ChineseConverter({"甲": "1", "乙": "2", "丙": "3"}, {"甲乙": "A", "甲乙丙": "B"})
+    assert converter.convert("甲乙丙") == "B"
+    assert converter.convert("甲乙丁") == "A丁"
+    assert converter.convert("甲丙乙") == "132"
+    assert converter.convert("x甲乙丙y甲乙") == "xBy" + "A"
+
 
 def main():
-    converter = TestChineseConverter()
-    
-    # Test cases
-    test_cases = [
-        "你好，這是繁體中文測試。",
-        "Hello, this is English text.",
-        "混合語言測試：Hello 世界！",
-        "繁體字：現說聽嗎學記這個裡邊為麼會來從對錯時間鐘請謝",
-        "簡體字：现说听吗学记这个里边为么会来从对错时间钟请谢"
-    ]
-    
     print("🧪 Testing Chinese Character Conversion")
     print("=" * 50)
-    
-    for i, test_text in enumerate(test_cases, 1):
-        converted = converter.convert_to_simplified(test_text)
-        print(f"Test {i}:")
-        print(f"  Original: {test_text}")
-        print(f"  Converted: {converted}")
-        print(f"  Changed: {'Yes' if converted != test_text else 'No'}")
-        print()
+    for test in (test_traditional_characters_are_simplified, test_simplified_and_unmapped_text_is_unchanged,
+                 test_phrase_overrides_win_over_characters, test_longest_phrase_matches_first):
+        test()
+        print(f"✅ {test.__name__}")
+
 
 if __name__ == "__main__":
     main()
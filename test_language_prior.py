@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Test script for the session language prior
+Feeds LanguagePrior canned detect_language() probabilities and checks when it
+locks, when it skips detection, and that a disagreeing detection drops the lock.
+"""
+
+from decoding_profiles import LanguagePrior, decode_options
+
+
+class _Detector:
+    """Stands in for model.detect_language, returning queued probabilities"""
+
+    def __init__(self, *results):
+        self.results = list(results)
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.results.pop(0)
+
+
+def test_locks_after_consistent_confident_detections():
+    prior = LanguagePrior(confirm_count=2, min_probability=0.9, recheck_every=5)
+    detect = _Detector({"en": 0.95, "zh": 0.05}, {"en": 0.97, "zh": 0.03})
+    assert prior.language_for(detect) == "en"
+    assert prior.language is None
+    assert prior.language_for(detect) == "en"
+    assert prior.language == "en"
+
+    # Locked: no detection until the recheck is due
+    for _ in range(4):
+        assert prior.language_for(detect) == "en"
+        assert not prior.detected
+    assert detect.calls == 2
+
+
+def test_unconfident_detections_never_lock():
+    prior = LanguagePrior(confirm_count=2, min_probability=0.9)
+    detect = _Detector(*[{"zh": 0.6, "en": 0.4}] * 4)
+    for _ in range(4):
+        assert prior.language_for(detect) == "zh"
+        assert prior.detected
+    assert prior.language is None
+
+
+def test_streak_restarts_on_another_language():
+    prior = LanguagePrior(confirm_count=2, min_probability=0.9)
+    detect = _Detector({"en": 0.95}, {"zh": 0.95}, {"zh": 0.92})
+    prior.language_for(detect)
+    prior.language_for(detect)
+    assert prior.language is None
+    prior.language_for(detect)
+    assert prior.language == "zh"
+
+
+def test_recheck_that_disagrees_drops_the_lock():
+    prior = LanguagePrior(confirm_count=2, min_probability=0.9, recheck_every=3)
+    detect = _Detector({"en": 0.95}, {"en": 0.95}, {"zh": 0.7, "en": 0.3}, {"zh": 0.8, "en": 0.2})
+    prior.language_for(detect)
+    prior.language_for(detect)
+    assert prior.language == "en"
+    prior.language_for(detect)
+    prior.language_for(detect)
+    assert detect.calls == 2
+    # The recheck detects zh: that utterance is decoded as zh and the lock is gone
+    assert prior.language_for(detect) == "zh"
+    assert prior.language is None
+    assert prior.language_for(detect) == "zh"
+    assert detect.calls == 4
+
+
+def test_streaming_windows_keep_timestamps():
+    assert decode_options("latency")["without_timestamps"] is True
+    assert "without_timestamps" not in decode_options("latency", timestamps=True)
+
+
+def main():
+    print("🧪 Testing the session language prior")
+    print("=" * 60)
+    for test in (test_locks_after_consistent_confident_detections, test_unconfident_detections_never_lock,
+                 test_streak_restarts_on_another_language, test_recheck_that_disagrees_drops_the_lock,
+                 test_streaming_windows_keep_timestamps):
+        test()
+        print(f"✅ {test.__name__}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Test script for incremental log-mel features
+Checks IncrementalLogMel against whisper.audio.log_mel_spectrogram for
+several clip lengths and chunkings, and times the work left at stop.
+"""
+
+import time
+
+import numpy as np
+import torch
+from whisper.audio import N_SAMPLES, log_mel_spectrogram
+
+from mel_features import IncrementalLogMel
+
+TOLERANCE = 1e-5
+
+
+def _clip(seconds, seed=0):
+    """int16 voice-like test audio"""
+    rng = np.random.default_rng(seed)
+    n = int(seconds * 16000)
+    t = np.arange(n) / 16000
+    audio = 0.3 * np.sin(2 * np.pi * 220 * t) * (np.sin(2 * np.pi * 3 * t) > 0) + rng.normal(0, 0.01, n)
+    return (audio * 32767).astype(np.int16)
+
+
+def _reference(samples, n_mels=80):
+    audio = samples.astype(np.float32) / 32768.0
+    return log_mel_spectrogram(audio, n_mels, padding=N_SAMPLES)
+
+
+def _incremental(samples, chunk, n_mels=80):
+    mel = IncrementalLogMel(n_mels)
+    for start in range(0, len(samples), chunk):
+        mel.feed(samples[start:start + chunk])
+    return mel.finish()
+
+
+def _max_difference(samples, chunk, n_mels=80):
+    expected = _reference(samples, n_mels)
+    actual = _incremental(samples, chunk, n_mels)
+    assert actual.shape == expected.shape, (actual.shape, expected.shape)
+    return (actual - expected).abs().max().item()
+
+
+def test_matches_whisper():
+    for seconds in (0.5, 2.0, 7.3, 31.0):
+        for chunk in (1024, 160, 4097):
+            assert _max_difference(_clip(seconds), chunk) < TOLERANCE, (seconds, chunk)
+
+
+def test_very_short_and_empty_clips():
+    for length in (0, 1, 150, 200, 201, 399, 400):
+        samples = _clip(1.0)[:length]
+        assert _max_difference(samples, 64) < TOLERANCE, length
+
+
+def test_silence_and_loud_clips():
+    # All-zero audio is the one case where the padding frames decide the max
+    assert _max_difference(np.zeros(16000, dtype=np.int16), 1024) < TOLERANCE
+    loud = (np.sign(_clip(2.0, seed=1)) * 32000).astype(np.int16)
+    assert _max_difference(loud, 1024) < TOLERANCE
+
+
+def test_128_mels():
+    assert _max_difference(_clip(3.0), 1024, n_mels=128) < TOLERANCE
+
+
+def test_bytes_input():
+    samples = _clip(1.5)
+    mel = IncrementalLogMel()
+    for start in range(0, len(samples), 1024):
+        mel.feed(samples[start:start + 1024].tobytes())
+    assert torch.equal(mel.finish(), _incremental(samples, 1024))
+
+
+def main():
+    print("🧪 Testing incremental log-mel against whisper.audio.log_mel_spectrogram")
+    print("=" * 60)
+    for seconds in (0.5, 2.0, 7.3, 31.0):
+        print(f"  {seconds:>5.1f}s clip: max |diff| = {_max_difference(_clip(seconds), 1024):.2e}")
+    for test in (test_matches_whisper, test_very_short_and_empty_clips, test_silence_and_loud_clips,
+                 test_128_mels, test_bytes_input):
+        test()
+        print(f"✅ {test.__name__}")
+
+    # What is left for stop time, compared with computing the whole mel then
+    samples = _clip(10.0)
+    start = time.perf_counter()
+    _reference(samples)
+    full = time.perf_counter() - start
+    mel = IncrementalLogMel()
+    for i in range(0, len(samples), 1024):
+        mel.feed(samples[i:i + 1024])
+    start = time.perf_counter()
+    mel.finish()
+    tail = time.perf_counter() - start
+    print(f"📊 10s clip: full front end {full * 1000:.1f} ms, incremental finish() {tail * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Test script for the CPU resource scheduler
+Runs ResourceScheduler against a fake thread list with recorded nice
+changes (nothing in the test process is reniced) and checks which threads
+a recording nices: not the reserved ones, not threads started while new
+threads are held, and that a refused restore is reported.
+"""
+
+import contextlib
+import io
+
+import resource_policy
+from resource_policy import ResourceScheduler
+
+BASE_NICE = 0
+
+
+class RecordingScheduler(ResourceScheduler):
+    """ResourceScheduler over fake thread ids that records nice changes instead of making them"""
+
+    def __init__(self, tids, allow_restore=True):
+        super().__init__("responsive", cpus={0})
+        self.base_nice = BASE_NICE
+        self.tids = set(tids)
+        self.allow_restore = allow_restore
+        self.nice_values = {}
+
+    def _set_nice(self, tid, value):
+        if value < self.nice_values.get(tid, BASE_NICE) and not self.allow_restore:
+            return False
+        self.nice_values[tid] = value
+        return True
+
+    def niced_tids(self):
+        return {tid for tid, value in self.nice_values.items() if value > BASE_NICE}
+
+
+@contextlib.contextmanager
+def _threads_of(scheduler):
+    original = resource_policy._thread_ids
+    resource_policy._thread_ids = lambda: set(scheduler.tids)
+    try:
+        yield scheduler
+    finally:
+        resource_policy._thread_ids = original
+
+
+def test_recording_nices_only_unreserved_threads():
+    with _threads_of(RecordingScheduler({1, 2, 3})) as scheduler:
+        scheduler.reserve_thread(1)
+        scheduler.recording_started()
+        assert scheduler.niced_tids() == {2, 3}
+        scheduler.recording_stopped()
+        assert scheduler.niced_tids() == set()
+
+
+def test_threads_started_while_held_are_not_niced():
+    with _threads_of(RecordingScheduler({1, 2})) as scheduler:
+        scheduler.reserve_thread(1)
+        scheduler.hold_new_threads()
+        scheduler.recording_started()
+        scheduler.tids |= {10, 11}  # Record thread and a capture callback thread, not reserved yet
+        scheduler.inference_started()
+        assert scheduler.niced_tids() == {2}
+
+        scheduler.reserve_thread(10)
+        scheduler.reserve_thread(11)
+        scheduler.tids.add(12)  # A torch worker started meanwhile
+        scheduler.release_new_threads()
+        scheduler.inference_started()
+        assert scheduler.niced_tids() == {2, 12}
+
+
+def test_recording_stopped_releases_the_hold():
+    with _threads_of(RecordingScheduler({1})) as scheduler:
+        scheduler.hold_new_threads()
+        scheduler.recording_started()
+        scheduler.recording_stopped()
+        scheduler.tids.add(5)
+        scheduler.recording_started()
+        assert scheduler.niced_tids() == {1, 5}
+
+
+def test_refused_restore_is_reported():
+    with _threads_of(RecordingScheduler({1, 2}, allow_restore=False)) as scheduler:
+        scheduler.recording_started()
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            scheduler.reserve_thread(2)
+        assert "stays at nice +10" in output.getvalue()
+        assert 2 in scheduler.niced
+
+
+def main():
+    print("🧪 Testing CPU resource scheduler")
+    print("=" * 60)
+    for test in (test_recording_nices_only_unreserved_threads, test_threads_started_while_held_are_not_niced,
+                 test_recording_stopped_releases_the_hold, test_refused_restore_is_reported):
+        test()
+        print(f"✅ {test.__name__}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Test script for the short-clip fast path
+Checks bucket selection and that a timestamped decode is split into
+segments the way transcribe() splits a window (StreamingTranscriber relies
+on those boundaries).
+"""
+
+from short_clip import FRAMES_PER_SECOND, bucket_frames, split_segments
+
+BEGIN = 50000  # Stand-in for tokenizer.timestamp_begin
+
+
+def _ts(seconds):
+    return BEGIN + round(seconds / 0.02)
+
+
+def test_bucket_frames():
+    assert bucket_frames(2 * 16000) == 5 * FRAMES_PER_SECOND
+    assert bucket_frames(int(4.8 * 16000)) == 10 * FRAMES_PER_SECOND  # The tail doesn't fit in 5 s
+    assert bucket_frames(25 * 16000) is None
+
+
+def test_consecutive_timestamps_split_segments():
+    tokens = [_ts(0), 1, 2, _ts(1.5), _ts(1.5), 3, _ts(2.5), _ts(2.5), 4, 5, _ts(3.0)]
+    segments = split_segments(tokens, BEGIN, 3.2)
+    assert [(start, end) for start, end, _ in segments] == [(0.0, 1.5), (1.5, 2.5), (2.5, 3.0)]
+    assert [[t for t in toks if t < BEGIN] for _, _, toks in segments] == [[1, 2], [3], [4, 5]]
+
+
+def test_unfinished_last_segment_runs_to_the_end():
+    tokens = [_ts(0), 1, _ts(1.0), _ts(1.0), 2, 3]
+    segments = split_segments(tokens, BEGIN, 2.0)
+    assert [(start, end) for start, end, _ in segments] == [(0.0, 1.0), (1.0, 2.0)]
+    assert segments[-1][2] == [_ts(1.0), 2, 3]
+
+
+def test_without_timestamps_is_one_segment():
+    assert split_segments([1, 2, 3], BEGIN, 2.5) == [(0.0, 2.5, [1, 2, 3])]
+    # A single timestamp pair: the last timestamp ends the segment, clamped to the clip
+    assert split_segments([_ts(0), 1, _ts(9.0)], BEGIN, 2.5) == [(0.0, 2.5, [_ts(0), 1, _ts(9.0)])]
+
+
+def main():
+    print("🧪 Testing the short-clip fast path")
+    print("=" * 60)
+    for test in (test_bucket_frames, test_consecutive_timestamps_split_segments,
+                 test_unfinished_last_segment_runs_to_the_end, test_without_timestamps_is_one_segment):
+        test()
+        print(f"✅ {test.__name__}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Test script for the single-instance lock and command channel
+Round-trips ping/toggle commands through a listener under a test-only name,
+checks that a second instance can't take the lock and that connections from
+another user are refused.
+"""
+
+import os
+import socket
+import tempfile
+import threading
+
+import single_instance
+from single_instance import SingleInstance, peer_uid, send_command
+
+LOCK_DIR = tempfile.mkdtemp()  # Lock files away from a real instance's
+
+
+def _instance(name, acquire=True):
+    instance = SingleInstance(name)
+    instance.lock_path = os.path.join(LOCK_DIR, f"{name}.lock")
+    if acquire:
+        assert instance.acquire()
+    return instance
+
+
+def test_ping_toggle_round_trip():
+    name = f"whisper-dictation-test-{os.getpid()}-rt"
+    instance = _instance(name)
+    received = []
+
+    def handler(request):
+        received.append(request["cmd"])
+        if request["cmd"] == "toggle":
+            return {"ok": True, "recording": True}
+        return {"ok": True, "pid": os.getpid()}
+
+    try:
+        instance.serve(handler)
+        assert send_command("ping", name=name) == {"ok": True, "pid": os.getpid()}
+        assert send_command("toggle", name=name) == {"ok": True, "recording": True}
+        assert received == ["ping", "toggle"]
+    finally:
+        instance.release()
+    assert send_command("ping", name=name, timeout=0.5) is None
+
+
+def test_thread_start_hook_runs_on_command_threads():
+    name = f"whisper-dictation-test-{os.getpid()}-hook"
+    instance = _instance(name)
+    started = []
+    handled = []
+
+    def handler(request):
+        handled.append(threading.get_ident())
+        return {"ok": True}
+
+    try:
+        instance.serve(handler, on_thread_start=lambda: started.append(threading.get_ident()))
+        assert send_command("ping", name=name) == {"ok": True}
+        assert len(started) == 2  # The accept thread and the connection's thread
+        assert handled[0] in started
+    finally:
+        instance.release()
+
+
+def test_second_instance_cannot_lock():
+    name = f"whisper-dictation-test-{os.getpid()}-lock"
+    instance = _instance(name)
+    try:
+        assert not _instance(name, acquire=False).acquire()
+    finally:
+        instance.release()
+    second = _instance(name)
+    second.release()
+
+
+def test_peer_uid_is_checked():
+    left, right = socket.socketpair(socket.AF_UNIX)
+    with left, right:
+        assert peer_uid(left) in (None, os.getuid())
+
+    name = f"whisper-dictation-test-{os.getpid()}-uid"
+    instance = _instance(name)
+    original = single_instance.peer_uid
+    single_instance.peer_uid = lambda conn: os.getuid() + 1  # As if another user connected
+    try:
+        instance.serve(lambda request: {"ok": True})
+        assert send_command("toggle", name=name) is None
+    finally:
+        single_instance.peer_uid = original
+        instance.release()
+
+
+def main():
+    print("🧪 Testing the single-instance lock and command channel")
+    print("=" * 60)
+    for test in (test_ping_toggle_round_trip, test_thread_start_hook_runs_on_command_threads,
+                 test_second_instance_cannot_lock, test_peer_uid_is_checked):
+        test()
+        print(f"✅ {test.__name__}")
+
+
+if __name__ == "__main__":
+    main()
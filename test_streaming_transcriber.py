@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Test script for streaming transcription
+Drives StreamingTranscriber with a fake transcribe function that returns
+scripted results and checks what each window commits and how far the
+window start advances: stable segments, the overlap region, silence,
+the maximum window and results without timestamps.
+"""
+
+import numpy as np
+
+from streaming_transcriber import StreamingTranscriber
+
+RATE = 1000  # Small rate keeps the windows cheap; only the sample arithmetic matters
+
+
+class FakeTranscribe:
+    """Returns the scripted results in order and records the window lengths it was given"""
+
+    def __init__(self, *results):
+        self.results = list(results)
+        self.seconds = []
+
+    def __call__(self, audio):
+        self.seconds.append(len(audio) / RATE)
+        return self.results.pop(0)
+
+
+def _segments(*spans):
+    return {
+        "text": "".join(text for _, _, text in spans),
+        "segments": [{"start": start, "end": end, "text": text} for start, end, text in spans],
+    }
+
+
+def _streamer(fake, seconds, max_window_seconds=25.0):
+    streamer = StreamingTranscriber(fake, rate=RATE, window_seconds=8.0, overlap_seconds=2.0,
+                                    max_window_seconds=max_window_seconds)
+    streamer.feed(np.zeros(int(seconds * RATE), dtype=np.int16))
+    return streamer
+
+
+def test_stable_segments_are_committed():
+    fake = FakeTranscribe(_segments((0.0, 3.0, " One."), (3.0, 5.5, " Two."), (5.5, 9.5, " Three")),
+                          {"text": " Three four.", "segments": []})
+    streamer = _streamer(fake, 10.0)
+    streamer._decode_window()
+    # " Three" ends inside the overlap (after 8 s), so it waits for the next window
+    assert streamer._committed_text == " One. Two."
+    assert streamer.committed_seconds == 5.5
+    assert streamer.finish() == "One. Two. Three four."
+    assert fake.seconds == [10.0, 4.5]
+
+
+def test_later_windows_start_at_the_commit_point():
+    fake = FakeTranscribe(_segments((0.0, 4.0, " One."), (4.0, 9.0, " Two")),
+                          _segments((0.0, 5.0, " Two three."), (5.0, 9.5, " Four")))
+    streamer = _streamer(fake, 10.0)
+    streamer._decode_window()
+    assert streamer.committed_seconds == 4.0
+    streamer.feed(np.zeros(4 * RATE, dtype=np.int16))
+    streamer._decode_window()
+    assert fake.seconds == [10.0, 10.0]
+    assert streamer._committed_text == " One. Two three."
+    assert streamer.committed_seconds == 9.0
+
+
+def test_nothing_stable_keeps_the_window():
+    fake = FakeTranscribe(_segments((0.0, 9.0, " One long sentence")))
+    streamer = _streamer(fake, 10.0)
+    streamer._decode_window()
+    assert streamer._committed_text == ""
+    assert streamer.committed_seconds == 0.0
+
+
+def test_silence_skips_all_but_the_overlap():
+    fake = FakeTranscribe({"text": "", "segments": []})
+    streamer = _streamer(fake, 10.0)
+    streamer._decode_window()
+    assert streamer._committed_text == ""
+    assert streamer.committed_seconds == 8.0
+
+
+def test_full_window_commits_all_but_the_last_segment():
+    fake = FakeTranscribe(_segments((0.0, 11.0, " One"), (11.0, 12.0, " two")))
+    streamer = _streamer(fake, 12.0, max_window_seconds=12.0)
+    streamer._decode_window()
+    assert streamer._committed_text == " One"
+    assert streamer.committed_seconds == 11.0
+
+
+def test_result_without_timestamps_waits_for_the_full_window():
+    fake = FakeTranscribe({"text": " One two"}, {"text": " One two three"})
+    streamer = _streamer(fake, 10.0, max_window_seconds=12.0)
+    streamer._decode_window()
+    # The text can't be placed in time, so none of it is stable yet
+    assert streamer._committed_text == ""
+    assert streamer.committed_seconds == 0.0
+
+    streamer.feed(np.zeros(2 * RATE, dtype=np.int16))
+    streamer._decode_window()
+    assert streamer._committed_text == " One two three"
+    assert streamer.committed_seconds == 12.0
+
+
+def test_empty_result_without_timestamps_counts_as_silence():
+    fake = FakeTranscribe({"text": " "})
+    streamer = _streamer(fake, 10.0)
+    streamer._decode_window()
+    assert streamer._committed_text == ""
+    assert streamer.committed_seconds == 8.0
+
+
+def main():
+    print("🧪 Testing streaming transcription")
+    print("=" * 60)
+    for test in (test_stable_segments_are_committed, test_later_windows_start_at_the_commit_point,
+                 test_nothing_stable_keeps_the_window, test_silence_skips_all_but_the_overlap,
+                 test_full_window_commits_all_but_the_last_segment,
+                 test_result_without_timestamps_waits_for_the_full_window,
+                 test_empty_result_without_timestamps_counts_as_silence):
+        test()
+        print(f"✅ {test.__name__}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Test script for text injection
+Runs TextInjector over StubBackend instances and checks how backends are
+ranked (measured cost, preferred backend, availability), that a failing
+backend falls through to the next, and that the clipboard backend restores
+the user's clipboard after a paste without clobbering a newer copy.
+"""
+
+import time
+
+from text_injection import ClipboardBackend, InjectionError, StubBackend, TextInjector, wait_until
+
+
+class NamedStub(StubBackend):
+    """StubBackend under its own name, optionally failing or unavailable"""
+
+    def __init__(self, name, latency=0.0, fails=False, present=True):
+        super().__init__(latency)
+        self.name = name
+        self.fails = fails
+        self.present = present
+
+    def available(self):
+        return self.present
+
+    def inject(self, text, replace=None):
+        if self.fails:
+            raise InjectionError(f"{self.name} is broken")
+        super().inject(text, replace)
+
+
+class FakeClipboard:
+    """pyperclip stand-in"""
+
+    def __init__(self, content=""):
+        self.content = content
+
+    def copy(self, text):
+        self.content = text
+
+    def paste(self):
+        return self.content
+
+
+class FakeKeyboard:
+    """pyautogui stand-in that records hotkeys"""
+
+    def __init__(self):
+        self.hotkeys = []
+
+    def hotkey(self, *keys):
+        self.hotkeys.append(keys)
+
+
+def _clipboard_backend(content):
+    backend = ClipboardBackend()
+    backend.RESTORE_DELAY = 0.05
+    backend._pyperclip, backend._pyautogui = FakeClipboard(content), FakeKeyboard()
+    return backend
+
+
+def _names(injector):
+    return [backend.name for backend in injector.candidates()]
+
+
+def test_backends_are_ranked_by_measured_cost():
+    slow, fast = NamedStub("slow", latency=0.02), NamedStub("fast")
+    injector = TextInjector([slow, fast])
+    assert _names(injector) == ["slow", "fast"]  # Equal priors keep the given order
+
+    for name in ("slow", "fast"):
+        injector.preferred = name
+        assert injector.inject(name) == name
+    injector.preferred = "auto"
+    assert injector.stats["slow"].latency >= 0.02
+    assert _names(injector) == ["fast", "slow"]
+
+
+def test_preferred_backend_goes_first_and_unavailable_ones_are_skipped():
+    injector = TextInjector([NamedStub("a"), NamedStub("b"), NamedStub("gone", present=False)],
+                            preferred="b")
+    assert _names(injector) == ["b", "a"]
+    assert injector.inject("hi") == "b"
+    assert injector.last_backend == "b"
+
+
+def test_failing_backend_falls_back_to_the_next():
+    broken, working = NamedStub("broken", fails=True), NamedStub("working")
+    injector = TextInjector([broken, working], preferred="broken")
+    assert injector.inject("text", replace="txt") == "working"
+    assert working.typed == [("text", "txt")]
+    assert injector.stats["broken"].failures == 1
+    assert injector.stats["working"].successes == 1
+
+    # Without a preference the failure is charged to the broken backend's cost
+    injector.preferred = "auto"
+    assert _names(injector) == ["working", "broken"]
+
+
+def test_all_backends_failing_raises():
+    cases = (
+        (TextInjector([NamedStub("a", fails=True), NamedStub("b", fails=True)]), "a: a is broken; b: b is broken"),
+        (TextInjector([NamedStub("gone", present=False)]), "No text injection backend available"),
+    )
+    for injector, message in cases:
+        try:
+            injector.inject("text")
+        except InjectionError as e:
+            assert str(e) == message
+        else:
+            raise AssertionError("inject() should have raised")
+
+
+def test_clipboard_is_restored_after_paste():
+    backend = _clipboard_backend("user text")
+    backend.inject("dictated")
+    assert backend._pyautogui.hotkeys == [("ctrl", "v")]
+    assert backend._pyperclip.paste() == "dictated"
+    assert wait_until(lambda: backend._pyperclip.paste() == "user text", 1.0)
+
+
+def test_back_to_back_pastes_restore_the_original_clipboard():
+    backend = _clipboard_backend("user text")
+    backend.inject("first")
+    backend.inject("second")  # Before the first restore: "first" must not be saved as the user's
+    assert wait_until(lambda: backend._pyperclip.paste() == "user text", 1.0)
+
+
+def test_newer_copy_is_not_overwritten():
+    backend = _clipboard_backend("user text")
+    backend.inject("dictated")
+    backend._pyperclip.copy("copied meanwhile")
+    time.sleep(backend.RESTORE_DELAY + 0.1)
+    assert backend._restore_timer is None
+    assert backend._pyperclip.paste() == "copied meanwhile"
+
+
+def main():
+    print("🧪 Testing text injection")
+    print("=" * 60)
+    for test in (test_backends_are_ranked_by_measured_cost,
+                 test_preferred_backend_goes_first_and_unavailable_ones_are_skipped,
+                 test_failing_backend_falls_back_to_the_next, test_all_backends_failing_raises,
+                 test_clipboard_is_restored_after_paste, test_back_to_back_pastes_restore_the_original_clipboard,
+                 test_newer_copy_is_not_overwritten):
+        test()
+        print(f"✅ {test.__name__}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Test script for silence trimming
+Builds clips from low-level noise and a tone and checks what trim_silence
+keeps: the tone plus a short hangover, nothing for pure silence, and the
+whole clip when it is all speech.
+"""
+
+import numpy as np
+
+from vad import trim_silence
+
+RATE = 16000
+
+
+def _silence(seconds, seed=0):
+    return np.random.default_rng(seed).normal(0, 1e-4, int(seconds * RATE)).astype(np.float32)
+
+
+def _tone(seconds, freq=220.0):
+    t = np.arange(int(seconds * RATE)) / RATE
+    return (0.3 * np.sin(2 * np.pi * freq * t)).astype(np.float32)
+
+
+def test_silence_around_a_tone_is_trimmed():
+    audio = np.concatenate((_silence(2.0), _tone(1.0), _silence(2.0, seed=1)))
+    speech, trimmed = trim_silence(audio, RATE)
+    # The tone survives, plus at most the 300 ms hangover (and a frame) on each side
+    assert 1.0 <= len(speech) / RATE <= 1.0 + 2 * 0.33
+    assert abs(trimmed - (len(audio) - len(speech)) / RATE) < 1e-9
+    assert np.max(np.abs(speech)) > 0.29
+
+
+def test_long_pause_between_tones_is_cut():
+    audio = np.concatenate((_tone(1.0), _silence(3.0), _tone(1.0, freq=330.0)))
+    speech, trimmed = trim_silence(audio, RATE)
+    assert trimmed > 2.0
+    assert 2.0 <= len(speech) / RATE < 3.0
+
+
+def test_silence_only_gives_empty_audio():
+    audio = _silence(3.0)
+    speech, trimmed = trim_silence(audio, RATE)
+    assert len(speech) == 0
+    assert trimmed == 3.0
+
+
+def test_speech_only_is_unchanged():
+    audio = _tone(2.0)
+    speech, trimmed = trim_silence(audio, RATE)
+    assert speech is audio
+    assert trimmed == 0.0
+
+
+def main():
+    print("🧪 Testing silence trimming")
+    print("=" * 60)
+    for test in (test_silence_around_a_tone_is_trimmed, test_long_pause_between_tones_is_cut,
+                 test_silence_only_gives_empty_audio, test_speech_only_is_unchanged):
+        test()
+        print(f"✅ {test.__name__}")
+
+
+if __name__ == "__main__":
+    main()
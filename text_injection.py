@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+Text injection backends for the Whisper Dictation Tool
+Each backend types (or pastes) text into the focused window and can replace
+the span it typed last. Steps are confirmed by polling for the expected state
+(clipboard contents, command exit status) instead of sleeping for a fixed
+time. TextInjector picks a backend by measured success rate and latency and
+falls back to the next one when a backend fails.
+"""
+
+import os
+import shutil
+import subprocess
+import threading
+import time
+
+
+class InjectionError(Exception):
+    """A backend could not deliver the text"""
+
+
+def wait_until(condition, timeout, interval=0.005):
+    """Poll condition() until it is true; returns False on timeout"""
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() >= deadline:
+            return False
+        time.sleep(interval)
+    return True
+
+
+class InjectionBackend:
+    """Base class for injection backends"""
+
+    name = "base"
+    expected_latency = 0.1  # Prior (seconds) until the backend has been measured
+
+    def available(self):
+        return True
+
+    def load(self):
+        """Import/connect whatever the backend needs (may be called early to warm up)"""
+
+    def inject(self, text, replace=None):
+        """Type text at the cursor; with replace, overwrite that just-typed span"""
+        raise NotImplementedError
+
+
+class ClipboardBackend(InjectionBackend):
+    """Paste via the clipboard and Ctrl+V (handles any Unicode text).
+
+    The user's clipboard is restored in the background once the target has
+    had time to read the paste, and only if nothing else replaced it.
+    """
+
+    name = "clipboard"
+    expected_latency = 0.05
+    CONFIRM_TIMEOUT = 0.5
+    RESTORE_DELAY = 1.0
+    MAX_RESTORE_LENGTH = 100  # Only small clipboards are restored (same as original)
+
+    def __init__(self):
+        self._pyperclip = None
+        self._pyautogui = None
+        self._restore_timer = None
+        self._saved_clipboard = None
+        self._lock = threading.Lock()
+
+    def available(self):
+        return bool(os.environ.get("DISPLAY") or os.environ.get("WAYLAND_DISPLAY"))
+
+    def load(self):
+        if self._pyautogui is None:
+            import pyperclip
+            import pyautogui  # Connects to the display
+            pyautogui.FAILSAFE = True
+            pyautogui.PAUSE = 0  # No fixed sleep after every call
+            self._pyperclip, self._pyautogui = pyperclip, pyautogui
+
+    def inject(self, text, replace=None):
+        self.load()
+        pyperclip, pyautogui = self._pyperclip, self._pyautogui
+        with self._lock:
+            # A pending restore means the clipboard still holds our last paste,
+            # and the user's own content is already saved
+            if self._restore_timer:
+                self._restore_timer.cancel()
+            else:
+                self._saved_clipboard = pyperclip.paste()
+            self._restore_timer = None
+
+        pyperclip.copy(text)
+        if not wait_until(lambda: pyperclip.paste() == text, self.CONFIRM_TIMEOUT):
+            raise InjectionError("Clipboard content mismatch")
+        if replace is not None:
+            _select_with_pyautogui(pyautogui, len(replace))
+        pyautogui.hotkey('ctrl', 'v')
+
+        with self._lock:
+            self._restore_timer = threading.Timer(self.RESTORE_DELAY, self._restore, args=(text,))
+            self._restore_timer.daemon = True
+            self._restore_timer.start()
+
+    def _restore(self, pasted):
+        with self._lock:
+            self._restore_timer = None
+            saved, self._saved_clipboard = self._saved_clipboard, None
+            try:
+                if (saved and len(saved) < self.MAX_RESTORE_LENGTH
+                        and self._pyperclip.paste() == pasted):
+                    self._pyperclip.copy(saved)
+            except Exception as e:
+                print(f"⚠️  Could not restore clipboard: {e}")
+
+
+class PyAutoGUIBackend(InjectionBackend):
+    """Type key by key with pyautogui (fallback; ASCII only on most platforms)"""
+
+    name = "pyautogui"
+    expected_latency = 0.3
+
+    def __init__(self):
+        self._pyautogui = None
+
+    def available(self):
+        return bool(os.environ.get("DISPLAY") or os.environ.get("WAYLAND_DISPLAY"))
+
+    def load(self):
+        if self._pyautogui is None:
+            import pyautogui
+            pyautogui.FAILSAFE = True
+            pyautogui.PAUSE = 0
+            self._pyautogui = pyautogui
+
+    def inject(self, text, replace=None):
+        self.load()
+        if replace is not None:
+            # Only the draft is selected; typing overwrites it
+            _select_with_pyautogui(self._pyautogui, len(replace))
+        self._pyautogui.write(text)
+
+
+class CommandBackend(InjectionBackend):
+    """Synthesize key events with an external tool; its exit status confirms delivery"""
+
+    executable = None
+    display_variable = None
+    TIMEOUT = 10.0
+
+    def available(self):
+        return bool(shutil.which(self.executable) and os.environ.get(self.display_variable))
+
+    def _type_command(self, text):
+        raise NotImplementedError
+
+    def _select_command(self, count):
+        raise NotImplementedError
+
+    def _run(self, command):
+        try:
+            result = subprocess.run(command, capture_output=True, text=True, timeout=self.TIMEOUT)
+        except (OSError, subprocess.TimeoutExpired) as e:
+            raise InjectionError(f"{self.executable} failed: {e}")
+        if result.returncode != 0:
+            raise InjectionError(f"{self.executable} exited with {result.returncode}: {result.stderr.strip()}")
+
+    def inject(self, text, replace=None):
+        if replace:
+            self._run(self._select_command(len(replace)))
+        self._run(self._type_command(text))
+
+
+class XdotoolBackend(CommandBackend):
+    """X11 key events via xdotool (no clipboard involved)"""
+
+    name = "xdotool"
+    executable = "xdotool"
+    display_variable = "DISPLAY"
+
+    def _type_command(self, text):
+        return ["xdotool", "type", "--clearmodifiers", "--delay", "0", "--", text]
+
+    def _select_command(self, count):
+        return ["xdotool", "key", "--clearmodifiers", "--delay", "0", "--repeat", str(count), "shift+Left"]
+
+
+class WtypeBackend(CommandBackend):
+    """Wayland key events via wtype's virtual-keyboard protocol"""
+
+    name = "wtype"
+    executable = "wtype"
+    display_variable = "WAYLAND_DISPLAY"
+
+    def _type_command(self, text):
+        return ["wtype", "--", text]
+
+    def _select_command(self, count):
+        return ["wtype", "-M", "shift"] + ["-k", "Left"] * count + ["-m", "shift"]
+
+
+class StubBackend(InjectionBackend):
+    """Records text instead of typing it (tests, benchmarks, no display)"""
+
+    name = "stub"
+    expected_latency = 0.0
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.typed = []  # (text, replace) in injection order
+
+    def inject(self, text, replace=None):
+        if self.latency:
+            time.sleep(self.latency)
+        self.typed.append((text, replace))
+
+
+def _select_with_pyautogui(pyautogui, count):
+    """Select the count characters before the cursor"""
+    pyautogui.keyDown('shift')
+    try:
+        pyautogui.press('left', presses=count)
+    finally:
+        pyautogui.keyUp('shift')
+
+
+BACKENDS = {
+    ClipboardBackend.name: ClipboardBackend,
+    XdotoolBackend.name: XdotoolBackend,
+    WtypeBackend.name: WtypeBackend,
+    PyAutoGUIBackend.name: PyAutoGUIBackend,
+    StubBackend.name: StubBackend,
+}
+
+
+class BackendStats:
+    """Success count and smoothed latency of one backend"""
+
+    def __init__(self, prior_latency):
+        self.successes = 0
+        self.failures = 0
+        self.latency = prior_latency
+
+    def update(self, ok, seconds):
+        if ok:
+            # Latency only counts for successful injections
+            self.latency = seconds if self.successes == 0 else 0.8 * self.latency + 0.2 * seconds
+            self.successes += 1
+        else:
+            self.failures += 1
+
+    @property
+    def success_rate(self):
+        return (self.successes + 1) / (self.successes + self.failures + 2)
+
+    def cost(self, failure_penalty=1.0):
+        """Expected seconds per injection, charging each likely failure a fallback penalty"""
+        return self.latency + (1.0 - self.success_rate) * failure_penalty
+
+
+class TextInjector:
+    """Injects text through the best available backend, falling back on failure.
+
+    preferred is a backend name to always try first, or "auto" to rank
+    backends by measured latency and success rate.
+    """
+
+    def __init__(self, backends=None, preferred="auto"):
+        if backends is None:
+            backends = [BACKENDS[name]() for name in ("clipboard", "xdotool", "wtype", "pyautogui")]
+        self.backends = list(backends)
+        self.preferred = preferred
+        self.stats = {backend.name: BackendStats(backend.expected_latency) for backend in self.backends}
+        self.last_backend = None
+
+    def load(self):
+        """Warm up available backends so the first utterance doesn't pay for imports"""
+        for backend in self.candidates():
+            try:
+                backend.load()
+            except Exception as e:
+                print(f"⚠️  Text injection backend '{backend.name}' failed to load: {e}")
+
+    def candidates(self):
+        """Available backends in the order they will be tried"""
+        available = [backend for backend in self.backends if backend.available()]
+        ranked = sorted(available, key=lambda backend: self.stats[backend.name].cost())
+        if self.preferred != "auto":
+            ranked.sort(key=lambda backend: backend.name != self.preferred)
+        return ranked
+
+    def inject(self, text, replace=None):
+        """Deliver text (replacing a just-typed span if given); returns the backend name"""
+        errors = []
+        for backend in self.candidates():
+            start = time.perf_counter()
+            try:
+                backend.inject(text, replace=replace)
+            except Exception as e:
+                self.stats[backend.name].update(False, time.perf_counter() - start)
+                print(f"❌ {backend.name} injection failed: {e}")
+                errors.append(f"{backend.name}: {e}")
+                continue
+            self.stats[backend.name].update(True, time.perf_counter() - start)
+            self.last_backend = backend.name
+            return backend.name
+        raise InjectionError("; ".join(errors) or "No text injection backend available")
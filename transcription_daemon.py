@@ -0,0 +1,376 @@
+#!/usr/bin/env python3
+"""
+Persistent transcription daemon for the Whisper Dictation Tool
+Holds a warm Whisper model and answers transcription requests over a Unix
+domain socket, so the model is loaded once per login instead of per launch.
+
+Protocol (one request per connection):
+    client -> daemon: one JSON header line, then `num_bytes` of raw audio
+                      ({"cmd": "transcribe", "format": "f32le"|"s16le",
+                        "num_bytes": N, "options": {...}})
+                      or {"cmd": "transcribe_file", "path": ..., "options": {...}}
+                      or {"cmd": "detect_language", "format": ..., "num_bytes": N}
+                      or {"cmd": "ping"} / {"cmd": "shutdown"}
+    daemon -> client: one JSON line ({"ok": true, "text": ..., "segments": [...],
+                      "language": ..., "timings": {...}, "model": ...})
+"""
+
+import argparse
+import fcntl
+import json
+import os
+import socket
+import socketserver
+import subprocess
+import sys
+import threading
+import time
+
+import numpy as np
+
+from engines import ENGINES, create_engine
+from resource_policy import POLICIES, ResourceScheduler
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_MODEL = "small"
+DEFAULT_ENGINE = "whisper"
+SEGMENT_FIELDS = ("id", "start", "end", "text", "avg_logprob", "compression_ratio",
+                  "no_speech_prob", "temperature")
+
+
+def default_socket_path(variant=None):
+    """Per-user socket path (prefers XDG_RUNTIME_DIR, which is private and tmpfs).
+
+    variant names an additional daemon (e.g. "refine" for the second model
+    of the draft-then-refine mode).
+    """
+    name = f"whisper-dictation-{variant}" if variant else "whisper-dictation"
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir and os.path.isdir(runtime_dir):
+        return os.path.join(runtime_dir, f"{name}.sock")
+    return f"/tmp/{name}-{os.getuid()}.sock"
+
+
+def _recv_line(sock_file):
+    line = sock_file.readline()
+    if not line:
+        raise ConnectionError("Connection closed before header was received")
+    return json.loads(line.decode("utf-8"))
+
+
+def _send_json(sock_file, payload):
+    sock_file.write(json.dumps(payload, ensure_ascii=False).encode("utf-8") + b"\n")
+    sock_file.flush()
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        try:
+            request = _recv_line(self.rfile)
+            response = self.server.daemon.handle_request(request, self.rfile)
+        except Exception as e:
+            response = {"ok": False, "error": str(e)}
+        try:
+            _send_json(self.wfile, response)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+
+class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class TranscriptionDaemon:
+    """Headless service that owns the Whisper model"""
+
+    def __init__(self, model_size="small", socket_path=None, engine="whisper", resource_policy="default",
+                 threads=None, reserve_cores=None, short_clip_buckets=None):
+        self.model_size = model_size
+        self.engine_name = engine
+        self.socket_path = socket_path or default_socket_path()
+        # No recording happens here, so the policy's recording nice doesn't apply
+        self.scheduler = ResourceScheduler(resource_policy, intra_threads=threads, reserve_cores=reserve_cores,
+                                           recording_nice=0)
+        self.short_clip_buckets = short_clip_buckets
+        self.engine = None
+        self.load_seconds = 0.0
+        self._inference_lock = threading.Lock()  # One decode at a time
+        self._server = None
+        self._lock_file = None
+
+    def load_model(self):
+        self.engine = create_engine(self.engine_name, self.model_size).load()
+        self.engine.short_clip_buckets = self.short_clip_buckets
+        self.load_seconds = self.engine.load_seconds
+        self.scheduler.configure_torch()
+        print(f"Whisper model loaded in {self.load_seconds:.2f}s "
+              f"(Model: {self.model_size}, engine: {self.engine_name})")
+        if self.scheduler.policy != "default":
+            print(f"⚙️  CPU scheduling: {self.scheduler.describe()}")
+
+    def acquire(self):
+        """Lock the socket path for this daemon's lifetime; False if another daemon holds it.
+
+        Taken before the model loads, so daemons spawned by racing
+        ensure_daemon() calls exit instead of replacing each other's socket.
+        """
+        lock_file = open(self.socket_path + ".lock", "a")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        self._lock_file = lock_file  # Released by the kernel when this process exits
+        return True
+
+    def serve_forever(self):
+        if not self.acquire():
+            print(f"Another transcription daemon is already running on {self.socket_path}")
+            return
+        if os.path.exists(self.socket_path):
+            if TranscriptionClient(self.socket_path, timeout=2.0).ping():
+                print(f"Another transcription daemon is already answering on {self.socket_path}")
+                return
+            os.unlink(self.socket_path)  # Stale socket from a previous run
+        self.load_model()
+        old_umask = os.umask(0o177)  # Created 0600: no window where other users can connect
+        try:
+            self._server = _UnixServer(self.socket_path, _RequestHandler)
+        finally:
+            os.umask(old_umask)
+        self._server.daemon = self
+        print(f"🎧 Transcription daemon listening on {self.socket_path}")
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+            try:
+                os.unlink(self.socket_path)
+            except OSError:
+                pass
+
+    def handle_request(self, request, rfile):
+        cmd = request.get("cmd")
+        if cmd == "ping":
+            return {"ok": True, "model": self.model_size, "engine": self.engine_name,
+                    "resource_policy": self.scheduler.policy, "load_seconds": self.load_seconds}
+        if cmd == "shutdown":
+            threading.Thread(target=self._server.shutdown, daemon=True).start()
+            return {"ok": True}
+        if cmd == "transcribe":
+            start = time.perf_counter()
+            audio = self._read_audio(request, rfile)
+            receive_seconds = time.perf_counter() - start
+            return self._transcribe(audio, request.get("options", {}),
+                                    {"receive": receive_seconds}, len(audio) / 16000)
+        if cmd == "detect_language":
+            audio = self._read_audio(request, rfile)
+            with self._inference_lock:
+                self.scheduler.inference_started()
+                probabilities = self.engine.detect_language(audio)
+            return {"ok": True, "probabilities": probabilities}
+        if cmd == "transcribe_file":
+            import whisper
+            start = time.perf_counter()
+            audio = whisper.load_audio(request["path"])
+            load_audio_seconds = time.perf_counter() - start
+            return self._transcribe(audio, request.get("options", {}),
+                                    {"load_audio": load_audio_seconds}, len(audio) / 16000)
+        return {"ok": False, "error": f"Unknown command: {cmd}"}
+
+    def _read_audio(self, request, rfile):
+        num_bytes = int(request["num_bytes"])
+        payload = rfile.read(num_bytes)
+        if len(payload) != num_bytes:
+            raise ConnectionError("Connection closed before audio was received")
+        if request.get("format", "f32le") == "s16le":
+            return np.frombuffer(payload, dtype=np.int16).astype(np.float32) / 32768.0
+        return np.frombuffer(payload, dtype=np.float32)
+
+    def _transcribe(self, audio, options, timings, audio_seconds):
+        with self._inference_lock:
+            self.scheduler.inference_started()  # Keeps new torch threads off the GUI's reserved core
+            result = self.engine.transcribe(audio, **options)
+        timings.update(result["timings"])
+        return {
+            "ok": True,
+            "text": result["text"],
+            "language": result.get("language"),
+            "segments": [{k: seg.get(k) for k in SEGMENT_FIELDS} for seg in result.get("segments", [])],
+            "timings": timings,
+            "audio_seconds": audio_seconds,
+            "rtf": result["rtf"],
+            "model": self.model_size,
+            "engine": self.engine_name,
+        }
+
+
+class TranscriptionClient:
+    """Thin client for the daemon with the same transcribe() call as a Whisper model"""
+
+    def __init__(self, socket_path=None, timeout=None):
+        self.socket_path = socket_path or default_socket_path()
+        self.timeout = timeout
+
+    def _request(self, header, payload=b""):
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(self.timeout)
+            sock.connect(self.socket_path)
+            with sock.makefile("rwb") as sock_file:
+                sock_file.write(json.dumps(header).encode("utf-8") + b"\n")
+                if payload:
+                    sock_file.write(payload)
+                sock_file.flush()
+                response = _recv_line(sock_file)
+        if not response.get("ok"):
+            raise RuntimeError(f"Transcription daemon error: {response.get('error')}")
+        return response
+
+    def ping(self):
+        """Return the daemon's status, or None if it is not reachable"""
+        try:
+            return self._request({"cmd": "ping"})
+        except (OSError, RuntimeError, ValueError):
+            return None
+
+    def transcribe(self, audio, **options):
+        """Transcribe float32 16 kHz audio (or a file path) on the daemon"""
+        if isinstance(audio, str):
+            return self._request({"cmd": "transcribe_file", "path": os.path.abspath(audio),
+                                  "options": options})
+        audio = np.ascontiguousarray(audio, dtype=np.float32)
+        header = {"cmd": "transcribe", "format": "f32le", "num_bytes": audio.nbytes,
+                  "options": options}
+        return self._request(header, memoryview(audio).cast("B"))
+
+    def detect_language(self, audio):
+        """{language: probability} for float32 16 kHz audio, detected on the daemon"""
+        audio = np.ascontiguousarray(audio, dtype=np.float32)
+        header = {"cmd": "detect_language", "format": "f32le", "num_bytes": audio.nbytes}
+        return self._request(header, memoryview(audio).cast("B"))["probabilities"]
+
+    def shutdown(self):
+        return self._request({"cmd": "shutdown"})
+
+
+def ensure_daemon(model_size="small", socket_path=None, timeout=300.0, engine="whisper",
+                  resource_policy="default", threads=None, reserve_cores=None, short_clip_buckets=None):
+    """Connect to the daemon, starting it in the background if needed.
+
+    resource_policy, threads and reserve_cores (see resource_policy.py) and
+    short_clip_buckets (see short_clip.py) configure a daemon started here;
+    a running daemon keeps its own. Raises RuntimeError if the running
+    daemon serves another model or engine.
+    """
+    client = TranscriptionClient(socket_path)
+
+    def connected(status):
+        if (status.get("model"), status.get("engine")) != (model_size, engine):
+            raise RuntimeError(f"daemon on {client.socket_path} is serving '{status.get('model')}' "
+                               f"({status.get('engine')}), not '{model_size}' ({engine}); "
+                               f"stop it with transcription_daemon.py --stop")
+        return client
+
+    status = client.ping()
+    if status:
+        return connected(status)
+
+    print("🚀 Starting transcription daemon...")
+    log_path = os.path.join(os.path.dirname(client.socket_path) or "/tmp", "whisper-dictation-daemon.log")
+    command = [sys.executable, os.path.join(SCRIPT_DIR, "transcription_daemon.py"),
+               "--model", model_size, "--engine", engine, "--socket", client.socket_path,
+               "--resource-policy", resource_policy]
+    if threads is not None:
+        command += ["--threads", str(threads)]
+    if reserve_cores is not None:
+        command += ["--reserve-cores", str(reserve_cores)]
+    if short_clip_buckets:
+        command += ["--short-clip-buckets", ",".join(f"{seconds:g}" for seconds in short_clip_buckets)]
+    with open(log_path, "ab") as log:
+        subprocess.Popen(
+            command,
+            cwd=SCRIPT_DIR, stdin=subprocess.DEVNULL, stdout=log, stderr=log,
+            start_new_session=True,  # Outlive the GUI that started it
+        )
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        status = client.ping()  # Possibly a daemon another caller started at the same time
+        if status:
+            return connected(status)
+        time.sleep(0.2)
+    raise TimeoutError(f"Transcription daemon did not start within {timeout:.0f}s (see {log_path})")
+
+
+def _seconds_list(value):
+    """argparse type: "5,10,15,20" -> (5.0, 10.0, 15.0, 20.0)"""
+    try:
+        return tuple(float(seconds) for seconds in value.split(","))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected comma-separated seconds, got '{value}'")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Whisper transcription daemon")
+    parser.add_argument("--model", default=None,
+                        help=f"Whisper model size to keep loaded (default: {DEFAULT_MODEL}; "
+                             f"with --transcribe, whatever a running daemon serves)")
+    parser.add_argument("--engine", default=None, choices=sorted(ENGINES),
+                        help=f"Inference engine (default: {DEFAULT_ENGINE}; with --transcribe, as --model)")
+    parser.add_argument("--socket", default=None, help="Unix socket path")
+    parser.add_argument("--resource-policy", default="default", choices=sorted(POLICIES),
+                        help="CPU resource policy for inference (see resource_policy.py)")
+    parser.add_argument("--threads", type=int, default=None, help="Torch intra-op threads (overrides the policy)")
+    parser.add_argument("--reserve-cores", type=int, default=None,
+                        help="Cores kept free of inference for the GUI's capture/UI threads (Linux)")
+    parser.add_argument("--short-clip-buckets", type=_seconds_list, default=None, metavar="SECONDS",
+                        help="Encoder windows for short clips, e.g. 5,10,15,20 (see short_clip.py)")
+    parser.add_argument("--transcribe", nargs="+", metavar="FILE",
+                        help="Transcribe files using the daemon (starting it if needed)")
+    parser.add_argument("--stop", action="store_true", help="Stop a running daemon")
+    args = parser.parse_args()
+
+    if args.stop:
+        client = TranscriptionClient(args.socket)
+        if client.ping():
+            client.shutdown()
+            print("👋 Transcription daemon stopped")
+        else:
+            print("Transcription daemon is not running")
+        return
+
+    if args.transcribe:
+        from chinese_converter import convert_to_simplified
+        client = TranscriptionClient(args.socket)
+        status = client.ping()
+        # A running daemon serves files with its warm model unless another one was asked for
+        if not (status and args.model in (None, status.get("model"))
+                and args.engine in (None, status.get("engine"))):
+            try:
+                client = ensure_daemon(args.model or DEFAULT_MODEL, args.socket,
+                                       engine=args.engine or DEFAULT_ENGINE, resource_policy=args.resource_policy,
+                                       threads=args.threads, reserve_cores=args.reserve_cores,
+                                       short_clip_buckets=args.short_clip_buckets)
+            except (RuntimeError, TimeoutError) as e:
+                print(f"❌ {e}")
+                sys.exit(1)
+        for path in args.transcribe:
+            try:
+                result = client.transcribe(path, task="transcribe", condition_on_previous_text=False)
+            except (OSError, RuntimeError, ValueError) as e:
+                print(f"❌ {path}: {e}")
+                continue
+            timings = result["timings"]
+            rtf = f"{result['rtf']:.2f}" if result["rtf"] is not None else "n/a"
+            print(f"📝 {path} ({result['audio_seconds']:.1f}s audio, "
+                  f"{timings['transcribe']:.2f}s decode, RTF {rtf}):")
+            print(convert_to_simplified(result["text"].strip()))
+        return
+
+    TranscriptionDaemon(args.model or DEFAULT_MODEL, args.socket, args.engine or DEFAULT_ENGINE,
+                        args.resource_policy, args.threads, args.reserve_cores,
+                        args.short_clip_buckets).serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Voice activity detection for the Whisper Dictation Tool
+Vectorized frame-energy + zero-crossing-rate VAD used to cut silence before
+the audio is handed to Whisper.
+"""
+
+import numpy as np
+
+
+def frame_features(audio, rate=16000, frame_ms=30):
+    """Return per-frame energy (dBFS) and zero-crossing rate for float32 audio"""
+    frame_len = int(rate * frame_ms / 1000)
+    num_frames = len(audio) // frame_len
+    if num_frames == 0:
+        return np.zeros(0, dtype=np.float32), np.zeros(0, dtype=np.float32), frame_len
+
+    frames = audio[:num_frames * frame_len].reshape(num_frames, frame_len)
+    rms = np.sqrt(np.mean(frames * frames, axis=1) + 1e-12)
+    energy_db = 20.0 * np.log10(rms)
+    signs = np.signbit(frames)
+    zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / frame_len
+    return energy_db, zcr, frame_len
+
+
+def speech_mask(audio, rate=16000, frame_ms=30, min_energy_db=-50.0,
+                margin_db=10.0, zcr_threshold=0.25, hangover_ms=300):
+    """Return a boolean speech/non-speech decision per frame.
+
+    A frame is speech if its energy is well above the estimated noise floor,
+    or if it is only slightly above it but has a high zero-crossing rate
+    (unvoiced consonants such as "s" and "f"). Decisions are then extended by
+    a hangover on both sides so word onsets and trailing syllables survive.
+    """
+    energy_db, zcr, frame_len = frame_features(audio, rate, frame_ms)
+    if len(energy_db) == 0:
+        return np.zeros(0, dtype=bool), frame_len
+
+    # Adaptive threshold: above the noise floor, but never so high that a
+    # clip containing nothing but speech loses its quieter syllables
+    noise_floor = np.percentile(energy_db, 10)
+    threshold = max(min(noise_floor + margin_db, energy_db.max() - 20.0), min_energy_db)
+    voiced = energy_db > threshold
+    unvoiced = (energy_db > threshold - margin_db / 2) & (zcr > zcr_threshold)
+    mask = voiced | unvoiced
+
+    hangover = max(1, int(hangover_ms / frame_ms))
+    if mask.any():
+        kernel = np.ones(2 * hangover + 1, dtype=np.int32)
+        mask = np.convolve(mask.astype(np.int32), kernel, mode='same') > 0
+    return mask, frame_len
+
+
+def speech_segments(audio, rate=16000, **kwargs):
+    """Return (start, end) sample ranges of detected speech"""
+    mask, frame_len = speech_mask(audio, rate, **kwargs)
+    if not mask.any():
+        return []
+    edges = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+    starts = np.flatnonzero(edges == 1) * frame_len
+    ends = np.flatnonzero(edges == -1) * frame_len
+    if mask[-1]:
+        ends[-1] = len(audio)  # Keep the partial frame at the end
+    return list(zip(starts.tolist(), ends.tolist()))
+
+
+def silence_boundary(audio, rate=16000, frame_ms=30, **kwargs):
+    """Return a sample index in the middle of the longest pause.
+
+    Falls back to the quietest frame when the audio has no pause at all, so
+    callers that must cut somewhere always get the least damaging point.
+    """
+    mask, frame_len = speech_mask(audio, rate, frame_ms=frame_ms, **kwargs)
+    if len(mask) == 0:
+        return len(audio)
+    if mask.all():
+        energy_db, _, _ = frame_features(audio, rate, frame_ms)
+        return int(np.argmin(energy_db)) * frame_len + frame_len // 2
+    edges = np.diff(np.concatenate(([1], mask.astype(np.int8), [1])))
+    starts = np.flatnonzero(edges == -1)
+    ends = np.flatnonzero(edges == 1)
+    longest = np.argmax(ends - starts)
+    return int(starts[longest] + ends[longest]) // 2 * frame_len
+
+
+def split_at_silence(audio, rate=16000, max_seconds=28.0, search_seconds=8.0, **kwargs):
+    """Cut audio into (start, end) chunks of at most max_seconds.
+
+    Each cut is placed in the longest pause within the last search_seconds
+    of a chunk, so no word is split across two chunks.
+    """
+    max_len = int(max_seconds * rate)
+    search_len = min(int(search_seconds * rate), max_len - 1)
+    chunks = []
+    start = 0
+    while len(audio) - start > max_len:
+        window_start = start + max_len - search_len
+        cut = window_start + silence_boundary(audio[window_start:start + max_len], rate, **kwargs)
+        chunks.append((start, cut))
+        start = cut
+    if start < len(audio):
+        chunks.append((start, len(audio)))
+    return chunks
+
+
+def trim_silence(audio, rate=16000, **kwargs):
+    """Drop silent spans from the audio.
+
+    Returns (speech_audio, trimmed_seconds). speech_audio is empty when no
+    speech was found, so callers can skip transcription entirely.
+    """
+    segments = speech_segments(audio, rate, **kwargs)
+    if not segments:
+        return audio[:0], len(audio) / rate
+    if len(segments) == 1 and segments[0] == (0, len(audio)):
+        return audio, 0.0
+    speech = np.concatenate([audio[start:end] for start, end in segments])
+    return speech, (len(audio) - len(speech)) / rate